@@ -1,15 +1,142 @@
-from flask import Flask, request, jsonify, send_file
-from datetime import datetime
+from flask import Flask, Response, request, jsonify, send_file
+from datetime import datetime, timedelta
+from queue import Queue, Full
 import os
+import io
+import csv
+import json
 import logging
 import tempfile
-import pandas as pd
-from seace_scraper import SeaceScraperCompleto
+import threading
+from time import monotonic
+from itertools import chain
+from seace_cache import CacheFichas
+from seace_jobs import GestorJobs
+from seace_store import AlmacenProcesos
+from seace_export import COLUMNAS_ORDEN, FORMATOS, exportar, formato_desde_solicitud
+from seace_metricas import exponer
+from seace_coalescencia import Coalescedor
+from seace_admision import ControlAdmision, Saturado, PRIORIDADES
+from seace_memoria import memoria_total, rss_navegador
+from seace_sync import sincronizar, delta_a_json
+
+# Selenium, requests/lxml y los motores se importan recién al usarse (arranque en frío más rápido):
+# seace_scraper, seace_pool, seace_shards, seace_http
 
 app = Flask(__name__)
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Pool de navegadores compartido entre solicitudes
+POOL_SIZE = int(os.environ.get('SEACE_POOL_SIZE', 2))
+POOL_MAX_USOS = int(os.environ.get('SEACE_POOL_MAX_USOS', 20))
+MAX_WORKERS_FICHAS = int(os.environ.get('SEACE_MAX_WORKERS_FICHAS', 4))
+MAX_PROCESOS = int(os.environ.get('SEACE_MAX_PROCESOS', os.cpu_count() or 1))
+MOTORES = ['navegador', 'http']
+FORMATOS_STREAM = ['ndjson', 'csv']
+
+# Cache de fichas en disco (por Nomenclatura)
+CACHE_FICHAS_RUTA = os.environ.get('SEACE_CACHE_FICHAS', os.path.join(tempfile.gettempdir(), 'seace_fichas.db'))
+CACHE_FICHAS_TTL = float(os.environ.get('SEACE_CACHE_TTL_HORAS', 24)) * 3600
+CACHE_FICHAS_MAX = int(os.environ.get('SEACE_CACHE_MAX', 50000))
+cache_fichas = CacheFichas(CACHE_FICHAS_RUTA, ttl_segundos=CACHE_FICHAS_TTL, max_entradas=CACHE_FICHAS_MAX)
+
+# Checkpoints para reanudar scrapings interrumpidos
+DIRECTORIO_CHECKPOINTS = os.environ.get('SEACE_CHECKPOINTS', os.path.join(tempfile.gettempdir(), 'seace_checkpoints'))
+
+# Almacén local de procesos extraídos (evita volver a scrapear días ya cubiertos)
+ALMACEN_RUTA = os.environ.get('SEACE_ALMACEN', os.path.join(tempfile.gettempdir(), 'seace_procesos.db'))
+almacen = AlmacenProcesos(ALMACEN_RUTA)
+# Registros que se juntan antes de escribirlos al almacén mientras se scrapea (/scrape)
+LOTE_ALMACEN = int(os.environ.get('SEACE_LOTE_ALMACEN', 100))
+
+# Jobs asíncronos en segundo plano
+JOBS_WORKERS = int(os.environ.get('SEACE_JOBS_WORKERS', 2))
+JOBS_RETENCION = float(os.environ.get('SEACE_JOBS_RETENCION_HORAS', 1)) * 3600
+gestor_jobs = GestorJobs(max_workers=JOBS_WORKERS, retencion_seg=JOBS_RETENCION)
+
+
+def borrar_archivo_resultado(resultado: tuple):
+    """Borra el archivo temporal de un resultado de /scrape que salió de la cache"""
+    ruta = resultado[0]
+    if ruta and os.path.exists(ruta):
+        os.remove(ruta)
+
+
+# /scrape idénticos y simultáneos comparten un solo scraping; el archivo se reutiliza unos segundos
+CACHE_RESULTADOS_SEG = float(os.environ.get('SEACE_CACHE_RESULTADOS_SEG', 60))
+coalescedor = Coalescedor(ttl_seg=CACHE_RESULTADOS_SEG, al_expirar=borrar_archivo_resultado)
+
+# Control de admisión: cuántos scrapings corren a la vez según la memoria (el resto espera o recibe 429)
+MEMORIA_RESERVA_MB = float(os.environ.get('SEACE_MEMORIA_RESERVA_MB', 400))  # Flask, Python y cachés
+MEMORIA_MB = float(os.environ.get('SEACE_MEMORIA_MB') or (memoria_total() or 2048 * 1024 * 1024) / 1024 / 1024)
+# Con varios workers de gunicorn cada proceso administra su parte del presupuesto
+PROCESOS_WEB = max(1, int(os.environ.get('WEB_CONCURRENCY', 1)))
+admision = ControlAdmision(
+    presupuesto_mb=max(0, MEMORIA_MB - MEMORIA_RESERVA_MB) / PROCESOS_WEB,
+    mb_por_navegador=float(os.environ.get('SEACE_MB_POR_NAVEGADOR', 350)),
+    max_cola=int(os.environ.get('SEACE_MAX_COLA', 10))
+)
+ESPERA_MAX_SEG = float(os.environ.get('SEACE_ESPERA_MAX_SEG', 120))
+
+# Pre-calentamiento al arrancar: /health responde 503 hasta que el pool de navegadores está listo
+PRECALENTAR = os.environ.get('SEACE_PRECALENTAR', '1').lower() not in ('0', 'false', 'no')
+_listo = threading.Event()
+_listo.set()  # Sin pre-calentamiento el proceso está listo apenas importa
+_arranque = {"inicio": monotonic(), "listo_seg": None, "error": None}
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def obtener_pool():
+    """Crea el pool la primera vez que se necesita"""
+    from seace_pool import PoolDrivers
+    
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = PoolDrivers(tamano=POOL_SIZE, max_usos=POOL_MAX_USOS, headless=True)
+        return _pool
+
+
+def precargar_modulos():
+    """Importa los módulos pesados sin iniciar nada (gunicorn lo hace en el master, antes del fork)"""
+    import seace_scraper
+    import seace_pool
+    import seace_shards
+    import seace_http
+
+
+def precalentar():
+    """Importa los módulos pesados e inicia los navegadores del pool; al terminar el proceso queda listo"""
+    try:
+        precargar_modulos()
+        obtener_pool().iniciar()
+    except Exception as e:
+        # Listo igual: las solicitudes crearán los navegadores que falten
+        _arranque["error"] = str(e)
+        logger.warning(f"⚠️  Pre-calentamiento incompleto: {e}")
+    finally:
+        _arranque["listo_seg"] = round(monotonic() - _arranque["inicio"], 2)
+        logger.info(f"🔥 Proceso listo en {_arranque['listo_seg']}s")
+        _listo.set()
+
+
+def iniciar_precalentamiento():
+    """Lanza el pre-calentamiento en segundo plano (si SEACE_PRECALENTAR está activo)"""
+    if not PRECALENTAR:
+        return
+    _listo.clear()
+    threading.Thread(target=precalentar, daemon=True).start()
+
+
+def reabrir_almacenes():
+    """Conexiones SQLite propias del proceso: no deben heredarse por fork desde el master de gunicorn"""
+    global cache_fichas, almacen
+    cache_fichas = CacheFichas(CACHE_FICHAS_RUTA, ttl_segundos=CACHE_FICHAS_TTL, max_entradas=CACHE_FICHAS_MAX)
+    almacen = AlmacenProcesos(ALMACEN_RUTA)
+
 @app.route('/')
 def home():
     return jsonify({
@@ -17,44 +144,337 @@ def home():
         "service": "SEACE Scraper API",
         "endpoints": {
             "/health": "GET - Health check",
-            "/scrape": "POST - Ejecutar scraping (params: fecha_inicio, fecha_fin)"
+            "/metrics": "GET - Métricas Prometheus (tiempos por fase, filas, fichas, fallbacks, errores)",
+            "/scrape": "POST - Ejecutar scraping (params: fecha_inicio, fecha_fin; opcionales: motor, workers, dias_por_shard, refrescar, prioridad=alta|normal|baja, format=xlsx|csv|parquet o header Accept; 429 + Retry-After si está saturado)",
+            "/scrape/stream": "POST - Scraping en streaming, un registro a la vez (?format=ndjson|csv)",
+            "/jobs": "POST - Encolar scraping en segundo plano (mismos params que /scrape)",
+            "/jobs/<id>": "GET - Estado y avance del job",
+            "/jobs/<id>/result": "GET - Descargar el archivo del job",
+            "/sync": "POST - Sync incremental (fecha_inicio y fecha_fin, o dias=N hasta hoy): solo los procesos nuevos, cambiados o eliminados desde la última vez"
         }
     })
 
 @app.route('/health')
 def health():
-    return jsonify({"status": "healthy"})
+    # Readiness: mientras se calientan los navegadores el balanceador no debe mandar tráfico
+    if not _listo.is_set():
+        return jsonify({
+            "status": "starting",
+            "segundos": round(monotonic() - _arranque["inicio"], 1)
+        }), 503
+    
+    respuesta = {"status": "healthy", "arranque": _arranque}
+    if _pool is not None:
+        respuesta["pool"] = _pool.estado()
+    respuesta["cache_fichas"] = cache_fichas.estado()
+    respuesta["almacen"] = almacen.estado()
+    respuesta["coalescencia"] = coalescedor.estado()
+    respuesta["admision"] = admision.estado()
+    return jsonify(respuesta)
 
-@app.route('/scrape', methods=['POST'])
-def scrape():
-    scraper = None
-    archivo_temporal = None
+@app.route('/metrics')
+def metrics():
+    contenido, content_type = exponer()
+    return Response(contenido, content_type=content_type)
+
+def parsear_parametros(data) -> dict:
+    """Valida el JSON de una solicitud de scraping. Lanza ValueError con el mensaje para el cliente"""
+    if not data:
+        raise ValueError("No se envió JSON en el body")
+    
+    if 'fecha_inicio' not in data or 'fecha_fin' not in data:
+        raise ValueError("Faltan parámetros: fecha_inicio y fecha_fin")
     
+    # Parsear fechas
     try:
-        logger.info("📥 Recibida solicitud de scraping")
-        data = request.json
+        fecha_inicio = datetime.strptime(data['fecha_inicio'], '%Y-%m-%d')
+        fecha_fin = datetime.strptime(data['fecha_fin'], '%Y-%m-%d')
+    except ValueError:
+        raise ValueError("Formato de fecha inválido. Use YYYY-MM-DD")
+    
+    # Workers para visitar fichas en paralelo (acotado por configuración)
+    try:
+        workers = int(data.get('workers', 1))
+    except (TypeError, ValueError):
+        raise ValueError("El parámetro workers debe ser un entero")
+    workers = max(1, min(workers, MAX_WORKERS_FICHAS))
+    
+    # Sub-rangos de N días en procesos separados (opcional)
+    dias_por_shard = data.get('dias_por_shard')
+    if dias_por_shard is not None:
+        try:
+            dias_por_shard = int(dias_por_shard)
+        except (TypeError, ValueError):
+            raise ValueError("El parámetro dias_por_shard debe ser un entero")
+    
+    # Motor: 'navegador' (Chrome) o 'http' (sin navegador)
+    motor = data.get('motor', 'navegador')
+    if motor not in MOTORES:
+        raise ValueError(f"Motor inválido. Use uno de: {', '.join(MOTORES)}")
+    
+    # Prioridad en la cola de admisión cuando no hay memoria para correr de inmediato
+    prioridad = data.get('prioridad', 'normal')
+    if prioridad not in PRIORIDADES:
+        raise ValueError(f"Prioridad inválida. Use una de: {', '.join(PRIORIDADES)}")
+    
+    return {
+        'fecha_inicio': fecha_inicio,
+        'fecha_fin': fecha_fin,
+        'workers': workers,
+        'dias_por_shard': dias_por_shard,
+        'motor': motor,
+        # refrescar=true vuelve a scrapear aunque el almacén ya tenga esos días
+        'refrescar': bool(data.get('refrescar', False)),
+        'prioridad': prioridad
+    }
+
+
+def clave_solicitud(params: dict, formato: str) -> tuple:
+    """Parámetros que cambian el resultado (workers y dias_por_shard solo cambian cómo se obtiene)"""
+    return (params['fecha_inicio'].strftime('%Y-%m-%d'), params['fecha_fin'].strftime('%Y-%m-%d'),
+            params['motor'], params['refrescar'], formato)
+
+
+def navegadores_necesarios(params: dict) -> int:
+    """Navegadores que abriría el scraping (0 si todo sale del almacén o es el motor http)"""
+    fecha_inicio, fecha_fin = params['fecha_inicio'], params['fecha_fin']
+    if not params['refrescar'] and all(cubierto for _, _, cubierto in almacen.segmentos(fecha_inicio, fecha_fin)):
+        return 0
+    if params['motor'] == 'http':
+        return 0
+    from seace_shards import MAX_ANIOS_PARALELO, dividir_por_anio, dividir_rango
+    if params['dias_por_shard']:
+        return min(MAX_PROCESOS, len(dividir_rango(fecha_inicio, fecha_fin, params['dias_por_shard'])))
+    # El navegador principal más uno por worker de fichas y uno por cada año extra (todos salen del pool)
+    anios_extra = min(MAX_ANIOS_PARALELO, len(dividir_por_anio(fecha_inicio, fecha_fin)) - 1)
+    return min(POOL_SIZE, 1 + anios_extra + (params['workers'] if params['workers'] > 1 else 0))
+
+
+def respuesta_saturado(error: Saturado):
+    """429 con Retry-After: mejor rechazar rápido que aceptar trabajo que no se podrá terminar"""
+    logger.warning(f"🚦 {error} (reintentar en {error.reintentar_en}s)")
+    respuesta = jsonify({"error": str(error), "reintentar_en_seg": error.reintentar_en})
+    respuesta.headers['Retry-After'] = str(error.reintentar_en)
+    return respuesta, 429
+
+
+def tramos_del_rango(params: dict) -> list:
+    """Tramos [(inicio, fin, cubierto), ...]: lo cubierto se sirve del almacén, el resto se scrapea"""
+    fecha_inicio, fecha_fin = params['fecha_inicio'], params['fecha_fin']
+    if params['refrescar']:
+        tramos = [(fecha_inicio, fecha_fin, False)]
+    else:
+        tramos = almacen.segmentos(fecha_inicio, fecha_fin)
+    
+    cubiertos = sum((fin - inicio).days + 1 for inicio, fin, cubierto in tramos if cubierto)
+    logger.info(f"🗄️  {cubiertos} de {(fecha_fin - fecha_inicio).days + 1} días ya están en el almacén")
+    return tramos
+
+
+def marcar_si_completo(inicio: datetime, fin: datetime, completo: bool, rechazados: int):
+    """Da el tramo por cubierto solo si el listado fue completo y todo entró al almacén"""
+    rango = f"{inicio.strftime('%Y-%m-%d')} → {fin.strftime('%Y-%m-%d')}"
+    if rechazados:
+        logger.warning(f"⚠️  {rechazados} registros sin Nomenclatura o sin Fecha legible no entran al almacén ({rango}): "
+                       f"se entregan igual y el tramo no se marca cubierto")
+    if not completo:
+        logger.warning(f"⚠️  Listado incompleto ({rango}): el tramo no se marca cubierto")
+    if completo and not rechazados:
+        almacen.marcar_cubiertos(inicio, fin)
+
+
+def completar_almacen(params: dict, progreso: dict = None) -> list:
+    """Scrapea al almacén los días que le faltan (o todo el rango con refrescar).
+    
+    Los registros se guardan por lotes de LOTE_ALMACEN a medida que llegan: en memoria solo quedan
+    el lote en curso y los que el almacén no pudo guardar, que se retornan para exportarlos aparte.
+    """
+    rechazados = []
+    for inicio, fin, cubierto in tramos_del_rango(params):
+        if cubierto:
+            continue
         
-        if not data:
-            return jsonify({"error": "No se envió JSON en el body"}), 400
+        lote = []
+        rechazados_tramo = []
         
-        if 'fecha_inicio' not in data or 'fecha_fin' not in data:
-            return jsonify({"error": "Faltan parámetros: fecha_inicio y fecha_fin"}), 400
+        def guardar_por_lotes(registro):
+            lote.append(registro)
+            if len(lote) >= LOTE_ALMACEN:
+                rechazados_tramo.extend(almacen.guardar(lote))
+                lote.clear()
         
-        # Parsear fechas
+        sub_params = {**params, 'fecha_inicio': inicio, 'fecha_fin': fin}
         try:
-            fecha_inicio = datetime.strptime(data['fecha_inicio'], '%Y-%m-%d')
-            fecha_fin = datetime.strptime(data['fecha_fin'], '%Y-%m-%d')
-        except ValueError:
-            return jsonify({"error": "Formato de fecha inválido. Use YYYY-MM-DD"}), 400
+            _, completo = ejecutar_scraping(sub_params, progreso, on_registro=guardar_por_lotes)
+        finally:
+            # Lo ya extraído se guarda aunque el scraping falle (el tramo no se marca cubierto)
+            rechazados_tramo.extend(almacen.guardar(lote))
+        rechazados.extend(rechazados_tramo)
+        marcar_si_completo(inicio, fin, completo, len(rechazados_tramo))
+    return rechazados
+
+
+def registros_del_almacen(params: dict, rechazados: list = ()):
+    """Registros del rango leídos del almacén por lotes, con N° correlativo; los rechazados por el almacén van al final"""
+    registros = chain(almacen.iterar(params['fecha_inicio'], params['fecha_fin']), rechazados)
+    for numero, registro in enumerate(registros, 1):
+        registro.numero = numero
+        yield registro
+
+
+def obtener_registros(params: dict, on_registro, progreso: dict = None, cancelar: threading.Event = None):
+    """Entrega registro por registro: los días cubiertos desde el almacén y los demás mientras se scrapean"""
+    numero = 0
+    
+    def entregar(registro: dict):
+        # N° correlativo en todo el rango (cada búsqueda numera desde 1)
+        nonlocal numero
+        numero += 1
+        registro.numero = numero
+        on_registro(registro)
+    
+    for inicio, fin, cubierto in tramos_del_rango(params):
+        if cancelar is not None and cancelar.is_set():
+            break
+        
+        if cubierto:
+            # Por lotes, como registros_del_almacen: la memoria no crece con el tramo
+            for registro in almacen.iterar(inicio, fin):
+                entregar(registro)
+            continue
         
-        logger.info(f"📅 Fechas: {fecha_inicio.strftime('%Y-%m-%d')} → {fecha_fin.strftime('%Y-%m-%d')}")
+        rechazados = 0
         
-        # Crear y ejecutar scraper
-        scraper = SeaceScraperCompleto(headless=True)
+        def guardar_y_entregar(registro: dict):
+            # Los que el almacén rechaza igual salen en el stream
+            nonlocal rechazados
+            rechazados += len(almacen.guardar([registro]))
+            entregar(registro)
+        
+        sub_params = {**params, 'fecha_inicio': inicio, 'fecha_fin': fin}
+        _, completo = ejecutar_scraping(sub_params, progreso, on_registro=guardar_y_entregar, cancelar=cancelar)
+        marcar_si_completo(inicio, fin, completo, rechazados)
+
+
+def ejecutar_scraping(params: dict, progreso: dict = None, on_registro=None, cancelar: threading.Event = None,
+                      fichas=None) -> tuple:
+    """Ejecuta el scraping con el motor pedido y retorna (registros, completo).
+    
+    completo es True solo si el listado del rango se recorrió entero (sin cancelar ni páginas perdidas).
+    Con on_registro cada registro se entrega apenas está listo y no se acumula (registros = []).
+    fichas reemplaza a la cache de fichas (el sync entrega las de procesos ya conocidos).
+    """
+    guardar_resultados = on_registro is None
+    fuente_fichas = fichas if fichas is not None else cache_fichas
+    fecha_inicio, fecha_fin = params['fecha_inicio'], params['fecha_fin']
+    logger.info(f"📅 Fechas: {fecha_inicio.strftime('%Y-%m-%d')} → {fecha_fin.strftime('%Y-%m-%d')}")
+    
+    if params['motor'] == 'http':
+        from seace_http import SeaceHttpCompleto
+        motor_http = SeaceHttpCompleto(cache_fichas=fuente_fichas, progreso=progreso, on_registro=on_registro,
+                                       guardar_resultados=guardar_resultados, cancelar=cancelar)
+        try:
+            motor_http.iniciar()
+            completo = motor_http.buscar_y_extraer(fecha_inicio, fecha_fin)
+        finally:
+            motor_http.cerrar()
+        return motor_http.resultados, completo
+    
+    if params['dias_por_shard']:
+        # Cada proceso inicia su propio navegador; los registros llegan al final de los shards
+        from seace_shards import buscar_por_shards
+        resultados, completo = buscar_por_shards(fecha_inicio, fecha_fin, params['dias_por_shard'],
+                                                 procesos=MAX_PROCESOS, ruta_cache=CACHE_FICHAS_RUTA)
+        if on_registro is None:
+            return resultados, completo
+        for registro in resultados:
+            on_registro(registro)
+        return [], completo
+    
+    # Crear y ejecutar scraper con un navegador ya iniciado del pool
+    from seace_scraper import SeaceScraperCompleto
+    pool = obtener_pool()
+    driver = pool.obtener()
+    error_scraping = False
+    scraper = None
+    try:
+        scraper = SeaceScraperCompleto(headless=True, driver=driver, workers_fichas=params['workers'], pool=pool,
+                                       cache_fichas=fuente_fichas, directorio_checkpoints=DIRECTORIO_CHECKPOINTS,
+                                       progreso=progreso, on_registro=on_registro,
+                                       guardar_resultados=guardar_resultados, cancelar=cancelar)
         scraper.iniciar()
-        exito = scraper.buscar_y_extraer(fecha_inicio, fecha_fin)
+        completo = scraper.buscar_y_extraer(fecha_inicio, fecha_fin)
+        # RSS real del navegador al terminar: afina cuántos scrapings caben en memoria
+        admision.observar_navegador(rss_navegador(scraper.driver))
+        return scraper.resultados, completo
+    except Exception:
+        error_scraping = True
+        raise
+    finally:
+        # Devolver navegador al pool siempre (el scraper puede haberlo reciclado por uno nuevo)
+        try:
+            pool.devolver(scraper.driver if scraper is not None else driver, descartar=error_scraping)
+            logger.info("🔒 Navegador devuelto al pool")
+        except:
+            pass
+
+
+def generar_archivo(params: dict, formato: str, progreso: dict = None):
+    """Completa el almacén y exporta el rango a un archivo temporal.
+    
+    Los registros se leen del almacén por lotes y se escriben fila por fila, así la memoria
+    no crece con el tamaño del rango. Retorna (ruta, nombre_archivo, total); ruta es None si no hay registros.
+    """
+    rechazados = completar_almacen(params, progreso)
+    
+    extension = FORMATOS[formato][1]
+    fecha_formato = params['fecha_inicio'].strftime('%y%m%d')  # AAMMDD
+    nombre_archivo = f"LICIT_PROD2_{fecha_formato}.{extension}"
+    logger.info(f"💾 Generando archivo: {nombre_archivo}")
+    
+    with tempfile.NamedTemporaryFile(mode='wb', delete=False, suffix=f'.{extension}') as tmp_file:
+        archivo_temporal = tmp_file.name
+    
+    try:
+        total = exportar(registros_del_almacen(params, rechazados), archivo_temporal, formato)
+    except Exception:
+        os.remove(archivo_temporal)
+        raise
+    
+    if not total:
+        os.remove(archivo_temporal)
+        return None, None, 0
+    return archivo_temporal, nombre_archivo, total
+
+
+@app.route('/scrape', methods=['POST'])
+def scrape():
+    try:
+        logger.info("📥 Recibida solicitud de scraping")
+        data = request.json
+        
+        try:
+            params = parsear_parametros(data)
+            formato = formato_desde_solicitud(request.args.get('format') or data.get('format'),
+                                              request.headers.get('Accept'))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        def generar_con_turno():
+            with admision.reservar(navegadores_necesarios(params), params['prioridad'], ESPERA_MAX_SEG):
+                return generar_archivo(params, formato)
         
-        if not exito or not scraper.resultados:
+        # Solicitudes idénticas en curso se unen a la misma ejecución; refrescar no usa la cache
+        try:
+            archivo_temporal, nombre_archivo, total = coalescedor.ejecutar(
+                clave_solicitud(params, formato),
+                generar_con_turno,
+                usar_cache=not params['refrescar']
+            )
+        except Saturado as e:
+            return respuesta_saturado(e)
+        
+        if not total:
             logger.warning("⚠️ No se encontraron resultados")
             return jsonify({
                 "error": "No se encontraron resultados",
@@ -62,47 +482,13 @@ def scrape():
                 "fecha_fin": data['fecha_fin']
             }), 404
         
-        # Generar nombre de archivo
-        fecha_formato = fecha_inicio.strftime('%y%m%d')  # AAMMDD
-        nombre_archivo = f"LICIT_PROD2_{fecha_formato}.xlsx"
-        
-        logger.info(f"✅ Scraping exitoso: {len(scraper.resultados)} registros")
-        logger.info(f"💾 Generando archivo: {nombre_archivo}")
-        
-        # Crear archivo temporal
-        with tempfile.NamedTemporaryFile(mode='wb', delete=False, suffix='.xlsx') as tmp_file:
-            archivo_temporal = tmp_file.name
-        
-        # Guardar Excel en archivo temporal
-        df = pd.DataFrame(scraper.resultados)
-        
-        # Ordenar columnas
-        columnas_orden = [
-            'N°',
-            'Fecha',
-            'Entidad Solicitante',
-            'Descripción del Requerimiento',
-            'Nomenclatura',
-            'Objeto',
-            'Region',
-            'Valor Referencial',
-            'Moneda',
-            'CUBSO',
-            'Fecha de Inicio',
-            'Fecha de Fin'
-        ]
-        
-        columnas_existentes = [col for col in columnas_orden if col in df.columns]
-        df = df[columnas_existentes]
-        
-        df.to_excel(archivo_temporal, index=False, engine='openpyxl')
-        
+        logger.info(f"✅ Scraping exitoso: {total} registros")
         logger.info(f"📤 Enviando archivo: {nombre_archivo}")
         
         # Enviar archivo
         return send_file(
             archivo_temporal,
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+            mimetype=FORMATOS[formato][0],
             as_attachment=True,
             download_name=nombre_archivo
         )
@@ -112,20 +498,194 @@ def scrape():
         import traceback
         traceback.print_exc()
         return jsonify({"error": str(e)}), 500
-        
-    finally:
-        # Cerrar navegador siempre
-        if scraper:
+
+
+@app.route('/scrape/stream', methods=['POST'])
+def scrape_stream():
+    """Envía cada registro apenas se extrae, como NDJSON o CSV (?format=ndjson|csv)"""
+    logger.info("📥 Recibida solicitud de scraping en streaming")
+    data = request.json
+    
+    try:
+        params = parsear_parametros(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    formato = request.args.get('format') or data.get('format', 'ndjson')
+    if formato not in FORMATOS_STREAM:
+        return jsonify({"error": f"Formato inválido. Use uno de: {', '.join(FORMATOS_STREAM)}"}), 400
+    
+    # El turno se pide antes de empezar a responder, para poder contestar 429
+    try:
+        turno = admision.reservar(navegadores_necesarios(params), params['prioridad'], ESPERA_MAX_SEG)
+    except Saturado as e:
+        return respuesta_saturado(e)
+    
+    # Cola acotada: si el cliente lee lento, el scraper espera (no se acumula en memoria)
+    cola = Queue(maxsize=500)
+    cancelar = threading.Event()
+    fin = object()
+    
+    def encolar(item):
+        while not cancelar.is_set():
             try:
-                scraper.cerrar()
-                logger.info("🔒 Navegador cerrado")
-            except:
-                pass
-        
-        # Limpiar archivo temporal después de enviarlo
-        # (Flask se encarga de esto automáticamente con send_file)
+                cola.put(item, timeout=1)
+                return
+            except Full:
+                continue
+    
+    def producir():
+        try:
+            obtener_registros(params, encolar, cancelar=cancelar)
+        except Exception as e:
+            logger.error(f"❌ Error en streaming: {e}")
+            encolar({"error": str(e)})
+        finally:
+            turno.liberar()
+            encolar(fin)
+    
+    threading.Thread(target=producir, daemon=True).start()
+    
+    def generar():
+        try:
+            if formato == 'csv':
+                yield linea_csv(COLUMNAS_ORDEN)
+            while True:
+                item = cola.get()
+                if item is fin:
+                    break
+                # Los errores llegan como dict; los registros como Registro
+                datos = item if isinstance(item, dict) else item.a_dict(con_cronograma=formato != 'csv')
+                if formato == 'csv':
+                    if 'error' not in datos:
+                        yield linea_csv(list(datos.values()))
+                else:
+                    yield json.dumps(datos, ensure_ascii=False) + '\n'
+        finally:
+            # Cliente desconectado o fin: detener el scraper
+            cancelar.set()
+    
+    if formato == 'csv':
+        nombre_archivo = f"LICIT_PROD2_{params['fecha_inicio'].strftime('%y%m%d')}.csv"
+        return Response(generar(), mimetype='text/csv',
+                        headers={'Content-Disposition': f'attachment; filename={nombre_archivo}'})
+    return Response(generar(), mimetype='application/x-ndjson')
+
+
+def linea_csv(valores: list) -> str:
+    """Una fila CSV como texto"""
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(valores)
+    return buffer.getvalue()
+
+
+def ejecutar_job(job):
+    """Trabajo en segundo plano: scraping + archivo, avanzando job.progreso"""
+    params = parsear_parametros(job.parametros)
+    formato = formato_desde_solicitud(job.parametros.get('format'))
+    # Los jobs ya se aceptaron (crear_job revisó la cola): esperan su turno sin límite de tiempo
+    # y entran a la cola aunque se haya llenado mientras esperaban un worker
+    with admision.reservar(navegadores_necesarios(params), params['prioridad'], espera_max=None, aceptado=True):
+        job.archivo, job.nombre_archivo, job.registros = generar_archivo(params, formato, progreso=job.progreso)
+
+
+@app.route('/jobs', methods=['POST'])
+def crear_job():
+    data = request.json
+    try:
+        parsear_parametros(data)
+        # El formato del archivo se fija al crear el job (param format o header Accept)
+        formato = formato_desde_solicitud(request.args.get('format') or data.get('format'),
+                                          request.headers.get('Accept'))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    if admision.saturado():
+        return respuesta_saturado(Saturado("Servicio saturado: cola de scrapings llena", admision.reintentar_en()))
+    
+    # Los jobs van por defecto con prioridad baja: las solicitudes síncronas tienen a alguien esperando
+    job = gestor_jobs.enviar(ejecutar_job, {**data, 'format': formato, 'prioridad': data.get('prioridad', 'baja')})
+    return jsonify({
+        "id": job.id,
+        "estado": job.estado,
+        "estado_url": f"/jobs/{job.id}",
+        "resultado_url": f"/jobs/{job.id}/result"
+    }), 202
+
+
+@app.route('/jobs/<job_id>')
+def estado_job(job_id):
+    job = gestor_jobs.obtener(job_id)
+    if job is None:
+        return jsonify({"error": "Job no encontrado"}), 404
+    return jsonify(job.a_dict())
+
+
+@app.route('/jobs/<job_id>/result')
+def resultado_job(job_id):
+    job = gestor_jobs.obtener(job_id)
+    if job is None:
+        return jsonify({"error": "Job no encontrado"}), 404
+    
+    if job.estado in ('en_cola', 'ejecutando'):
+        return jsonify({"error": "El job aún no termina", "estado": job.estado}), 409
+    if job.estado == 'error':
+        return jsonify({"error": job.error, "estado": job.estado}), 500
+    if not job.archivo:
+        return jsonify({"error": "No se encontraron resultados", "estado": job.estado}), 404
+    
+    return send_file(
+        job.archivo,
+        mimetype=FORMATOS[job.parametros['format']][0],
+        as_attachment=True,
+        download_name=job.nombre_archivo
+    )
+
+# Un sync a la vez por proceso: dos syncs solapados calcularían el delta contra el mismo estado
+_lock_sync = threading.Lock()
+SYNC_DIAS = int(os.environ.get('SEACE_SYNC_DIAS', 3))
+
+
+@app.route('/sync', methods=['POST'])
+def sync():
+    data = request.get_json(silent=True) or {}
+    # Sin fechas: los últimos N días hasta hoy (lo que el scheduler revisa cada mañana)
+    if 'fecha_inicio' not in data and 'fecha_fin' not in data:
+        try:
+            dias = max(1, int(data.get('dias', SYNC_DIAS)))
+        except (TypeError, ValueError):
+            return jsonify({"error": "El parámetro dias debe ser un entero"}), 400
+        hoy = datetime.now()
+        data = {**data, 'fecha_inicio': (hoy - timedelta(days=dias - 1)).strftime('%Y-%m-%d'),
+                'fecha_fin': hoy.strftime('%Y-%m-%d')}
+    try:
+        # El listado siempre se vuelve a leer; los sub-rangos en procesos aparte no comparten la fuente de fichas
+        params = {**parsear_parametros(data), 'refrescar': True, 'dias_por_shard': None}
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    def extraer(fuente_fichas):
+        return ejecutar_scraping(params, fichas=fuente_fichas)
+    
+    # El lock va antes que el turno: un sync que espera a otro no debe retener memoria de la admisión
+    if not _lock_sync.acquire(blocking=False):
+        return jsonify({"error": "Ya hay un sync en curso"}), 409
+    try:
+        with admision.reservar(navegadores_necesarios(params), params['prioridad'], ESPERA_MAX_SEG):
+            resultado = sincronizar(almacen, params['fecha_inicio'], params['fecha_fin'], extraer, cache_fichas)
+    except Saturado as e:
+        return respuesta_saturado(e)
+    except Exception as e:
+        logger.error(f"❌ Error en sync: {e}")
+        return jsonify({"error": str(e)}), 500
+    finally:
+        _lock_sync.release()
+    return jsonify(delta_a_json(resultado))
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 8080))
     logger.info(f"🚀 Iniciando servidor en puerto {port}")
+    # Servidor de desarrollo; en producción: gunicorn -c gunicorn.conf.py app:app
+    # Pre-iniciar navegadores para que la primera solicitud no espere a Chrome
+    iniciar_precalentamiento()
     app.run(host='0.0.0.0', port=port)
@@ -0,0 +1,44 @@
+
+import os
+import tempfile
+
+# Arranque de producción (Cloud Run):
+#   gunicorn -c gunicorn.conf.py app:app
+# El app se importa una vez en el master y los workers nacen por fork ya con todo cargado.
+
+bind = f"0.0.0.0:{os.environ.get('PORT', 8080)}"
+workers = int(os.environ.get('WEB_CONCURRENCY', min(2, os.cpu_count() or 1)))
+# Hilos por worker: los scrapings pasan casi todo el tiempo esperando al navegador o a la red
+worker_class = 'gthread'
+threads = int(os.environ.get('SEACE_THREADS', 8))
+# Scrapings largos y streaming: sin timeout del worker (Cloud Run corta la solicitud por su cuenta)
+timeout = 0
+graceful_timeout = 30
+preload_app = True
+accesslog = '-'
+
+# El app reparte el presupuesto de memoria entre los workers
+os.environ['WEB_CONCURRENCY'] = str(workers)
+
+# Con varios workers las métricas de Prometheus se suman desde un directorio compartido
+if workers > 1 and not os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+    os.environ['PROMETHEUS_MULTIPROC_DIR'] = tempfile.mkdtemp(prefix='seace_metricas_')
+
+
+def when_ready(server):
+    """Master: importa Selenium, requests y lxml antes de crear los workers (se comparten por fork)"""
+    import app
+    app.precargar_modulos()
+
+
+def post_fork(server, worker):
+    """Worker: conexiones SQLite propias y pre-calentamiento del pool de navegadores"""
+    import app
+    app.reabrir_almacenes()
+    app.iniciar_precalentamiento()
+
+
+def child_exit(server, worker):
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
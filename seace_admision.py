@@ -0,0 +1,165 @@
+
+import heapq
+import logging
+import threading
+from itertools import count
+from time import monotonic
+
+from seace_memoria import memoria_libre
+from seace_metricas import ESPERA_ADMISION, RECHAZOS
+
+logger = logging.getLogger(__name__)
+
+PRIORIDADES = {'alta': 0, 'normal': 1, 'baja': 2}
+MB = 1024 * 1024
+
+
+class Saturado(Exception):
+    """No hay memoria para otro scraping y la cola está llena (o se agotó la espera)"""
+
+    def __init__(self, mensaje: str, reintentar_en: int):
+        super().__init__(mensaje)
+        self.reintentar_en = reintentar_en
+
+
+class Turno:
+    """Memoria reservada para un scraping; liberar() (o salir del with) la devuelve"""
+
+    def __init__(self, control, costo: float):
+        self._control = control
+        self.costo = costo
+        self.inicio = monotonic()
+        self._liberado = False
+
+    def liberar(self):
+        if not self._liberado:
+            self._liberado = True
+            self._control._liberar(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.liberar()
+
+
+class ControlAdmision:
+    """Limita los scrapings simultáneos según el presupuesto de memoria y el RSS medido de cada navegador.
+
+    Lo que no cabe espera en una cola por prioridad (y orden de llegada) de profundidad acotada.
+    """
+
+    def __init__(self, presupuesto_mb: float, mb_por_navegador: float = 350, mb_sin_navegador: float = 50,
+                 max_cola: int = 10, duracion_estimada_seg: float = 60):
+        self.presupuesto = presupuesto_mb * MB
+        self.mb_sin_navegador = mb_sin_navegador
+        self.max_cola = max_cola
+        # Estimaciones que se ajustan con lo observado (promedio móvil exponencial)
+        self.bytes_por_navegador = mb_por_navegador * MB
+        self.duracion_media = duracion_estimada_seg
+
+        self._reservado = 0
+        self._activos = 0
+        self._cola = []  # heap de (prioridad, orden, evento)
+        self._orden = count()
+        self._cond = threading.Condition()
+
+    def costo(self, navegadores: int) -> float:
+        """Bytes que se reservan para un scraping que usa esa cantidad de navegadores"""
+        if navegadores <= 0:
+            return self.mb_sin_navegador * MB
+        return navegadores * self.bytes_por_navegador
+
+    def reservar(self, navegadores: int, prioridad: str = 'normal', espera_max: float = 120,
+                 aceptado: bool = False) -> Turno:
+        """Espera su turno y reserva memoria. Lanza Saturado si la cola está llena o se agota espera_max.
+
+        aceptado=True es para trabajo que ya se aceptó (jobs): entra a la cola aunque esté llena.
+        """
+        costo = self.costo(navegadores)
+        clave = (PRIORIDADES.get(prioridad, PRIORIDADES['normal']), next(self._orden))
+        inicio = monotonic()
+
+        with self._cond:
+            if self._cabe(costo) and not self._cola:
+                return self._admitir(costo, inicio)
+
+            if not aceptado and len(self._cola) >= self.max_cola:
+                RECHAZOS.labels('cola_llena').inc()
+                raise Saturado("Servicio saturado: cola de scrapings llena", self._reintentar_en())
+
+            heapq.heappush(self._cola, clave)
+            logger.info(f"⏳ Scraping en cola (prioridad {prioridad}, {len(self._cola)} esperando)")
+            try:
+                while not (self._cola[0] == clave and self._cabe(costo)):
+                    restante = None if espera_max is None else espera_max - (monotonic() - inicio)
+                    if restante is not None and restante <= 0:
+                        RECHAZOS.labels('espera_agotada').inc()
+                        raise Saturado("Servicio saturado: se agotó la espera en cola", self._reintentar_en())
+                    # Con timeout también se revisa la memoria libre aunque nadie libere
+                    self._cond.wait(timeout=min(restante, 5) if restante is not None else 5)
+            except BaseException:
+                self._cola.remove(clave)
+                heapq.heapify(self._cola)
+                self._cond.notify_all()
+                raise
+
+            heapq.heappop(self._cola)
+            turno = self._admitir(costo, inicio)
+            # El siguiente de la cola puede caber también
+            self._cond.notify_all()
+            return turno
+
+    def observar_navegador(self, rss_bytes: int):
+        """Ajusta el costo por navegador con el RSS medido de uno (chromedriver + Chrome)"""
+        if rss_bytes <= 0:
+            return
+        with self._cond:
+            self.bytes_por_navegador = 0.8 * self.bytes_por_navegador + 0.2 * rss_bytes
+
+    def saturado(self) -> bool:
+        with self._cond:
+            return len(self._cola) >= self.max_cola
+
+    def reintentar_en(self) -> int:
+        with self._cond:
+            return self._reintentar_en()
+
+    def estado(self) -> dict:
+        with self._cond:
+            return {
+                "activos": self._activos,
+                "en_cola": len(self._cola),
+                "max_cola": self.max_cola,
+                "reservado_mb": round(self._reservado / MB),
+                "presupuesto_mb": round(self.presupuesto / MB),
+                "mb_por_navegador": round(self.bytes_por_navegador / MB),
+                "duracion_media_seg": round(self.duracion_media, 1)
+            }
+
+    def _cabe(self, costo: float) -> bool:
+        # Sin nada corriendo siempre se admite uno (si no, un scraping grande nunca correría)
+        if self._activos == 0:
+            return True
+        if self._reservado + costo > self.presupuesto:
+            return False
+        libre = memoria_libre()
+        return libre is None or libre >= costo
+
+    def _admitir(self, costo: float, inicio: float) -> Turno:
+        self._reservado += costo
+        self._activos += 1
+        ESPERA_ADMISION.observe(monotonic() - inicio)
+        return Turno(self, costo)
+
+    def _liberar(self, turno: Turno):
+        with self._cond:
+            self._reservado -= turno.costo
+            self._activos -= 1
+            self.duracion_media = 0.8 * self.duracion_media + 0.2 * (monotonic() - turno.inicio)
+            self._cond.notify_all()
+
+    def _reintentar_en(self) -> int:
+        """Segundos sugeridos para Retry-After: lo que tardaría en vaciarse la cola actual"""
+        tandas = (len(self._cola) + 1) / max(1, self._activos)
+        return max(1, round(self.duracion_media * tandas))
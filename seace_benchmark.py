@@ -0,0 +1,258 @@
+
+import os
+import sys
+import json
+import logging
+import socket
+import resource
+import tempfile
+import threading
+import subprocess
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from time import monotonic, sleep
+from urllib.error import URLError
+from urllib.request import Request, urlopen
+
+from seace_memoria import rss_arbol
+from seace_mock import ServidorMock
+
+logger = logging.getLogger(__name__)
+
+# Benchmark offline: corre el scraper contra seace_mock y reporta filas/seg,
+# llamadas a WebDriver por fila y RSS pico (Python y navegador).
+#   python seace_benchmark.py [--motor=navegador|http] [--filas-por-dia=30] [--dias=1] [--latencia=0.05]
+#                             [--workers=1] [--modo-fichas=fetch|navegacion] [--visible] [--json]
+#                             [--min-filas-seg=N] [--max-llamadas-fila=N]
+# Arranque en frío: segundos desde que se lanza el servidor web hasta /health listo y hasta el primer registro
+#   python seace_benchmark.py --arranque [--servidor=gunicorn|flask] [--motor=...] [--max-primer-registro-seg=N]
+
+FECHA_INICIO = datetime(2026, 1, 5)
+
+
+@contextmanager
+def contar_llamadas_webdriver():
+    """Cuenta cada comando WebDriver (de todos los navegadores) mientras dure el bloque"""
+    from selenium.webdriver.remote.webdriver import WebDriver
+
+    conteo = Counter()
+    original = WebDriver.execute
+
+    def execute(self, comando, params=None):
+        conteo[comando] += 1
+        return original(self, comando, params)
+
+    WebDriver.execute = execute
+    try:
+        yield conteo
+    finally:
+        WebDriver.execute = original
+
+
+class MuestreoRss(threading.Thread):
+    """Muestrea el RSS del proceso y de sus hijos (chromedriver + Chrome) y guarda el pico"""
+
+    def __init__(self, intervalo: float = 0.2):
+        super().__init__(daemon=True)
+        self.intervalo = intervalo
+        self.pico_navegador = 0
+        self._detener = threading.Event()
+
+    def run(self):
+        while not self._detener.is_set():
+            muestra = rss_arbol(os.getpid())
+            if muestra is None:
+                return
+            self.pico_navegador = max(self.pico_navegador, muestra[1])
+            self._detener.wait(self.intervalo)
+
+    def detener(self):
+        self._detener.set()
+        self.join()
+
+
+def ejecutar_benchmark(motor: str = 'navegador', filas_por_dia: int = 30, dias: int = 1,
+                       latencia: float = 0.05, workers: int = 1, headless: bool = True,
+                       modo_fichas: str = None) -> dict:
+    """Levanta el mock, corre un scraping completo y retorna las métricas"""
+    servidor = ServidorMock(filas_por_dia=filas_por_dia, latencia=latencia)
+    url = servidor.iniciar()
+    fecha_fin = FECHA_INICIO + timedelta(days=dias - 1)
+    muestreo = MuestreoRss()
+    muestreo.start()
+    conteo = Counter()
+
+    try:
+        inicio = monotonic()
+        if motor == 'http':
+            from seace_http import SeaceHttpCompleto
+            scraper = SeaceHttpCompleto(url_buscador=url)
+            try:
+                scraper.iniciar()
+                scraper.buscar_y_extraer(FECHA_INICIO, fecha_fin)
+            finally:
+                scraper.cerrar()
+        else:
+            from seace_scraper import SeaceScraperCompleto
+            with contar_llamadas_webdriver() as conteo:
+                scraper = SeaceScraperCompleto(headless=headless, url_buscador=url, workers_fichas=workers,
+                                               modo_fichas=modo_fichas)
+                try:
+                    scraper.iniciar()
+                    scraper.buscar_y_extraer(FECHA_INICIO, fecha_fin)
+                finally:
+                    scraper.cerrar()
+        segundos = monotonic() - inicio
+    finally:
+        muestreo.detener()
+        servidor.cerrar()
+
+    filas = scraper.total_registros
+    llamadas = sum(conteo.values())
+    return {
+        "motor": motor,
+        "workers": workers,
+        "modo_fichas": modo_fichas or 'por defecto',
+        "filas_esperadas": filas_por_dia * dias,
+        "filas": filas,
+        "segundos": round(segundos, 2),
+        "filas_por_seg": round(filas / segundos, 2) if segundos else 0,
+        "llamadas_webdriver": llamadas,
+        "llamadas_por_fila": round(llamadas / filas, 1) if filas else None,
+        "comandos_frecuentes": dict(conteo.most_common(5)),
+        "solicitudes_mock": servidor.solicitudes,
+        # ru_maxrss viene en KB en Linux
+        "rss_pico_python_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "rss_pico_navegador_mb": round(muestreo.pico_navegador / 1024 / 1024, 1),
+        "bloqueo": scraper.progreso.get('bloqueo')
+    }
+
+
+def puerto_libre() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def ejecutar_arranque(servidor: str = 'gunicorn', motor: str = 'navegador', filas_por_dia: int = 30,
+                      latencia: float = 0.05, timeout: float = 300) -> dict:
+    """Lanza el servicio como en el contenedor (almacén y caches vacíos) y mide el arranque en frío"""
+    mock = ServidorMock(filas_por_dia=filas_por_dia, latencia=latencia)
+    url_mock = mock.iniciar()
+    directorio = tempfile.mkdtemp(prefix='seace_arranque_')
+    puerto = puerto_libre()
+    base = f'http://127.0.0.1:{puerto}'
+    entorno = {
+        **os.environ,
+        'PORT': str(puerto),
+        'SEACE_URL': url_mock,
+        'SEACE_ALMACEN': os.path.join(directorio, 'procesos.db'),
+        'SEACE_CACHE_FICHAS': os.path.join(directorio, 'fichas.db'),
+        'SEACE_CHECKPOINTS': os.path.join(directorio, 'checkpoints')
+    }
+    if servidor == 'gunicorn':
+        comando = ['gunicorn', '-c', 'gunicorn.conf.py', 'app:app']
+    else:
+        comando = [sys.executable, 'app.py']
+
+    resultado = {"servidor": servidor, "motor": motor, "escuchando_seg": None, "listo_seg": None,
+                 "primer_registro_seg": None, "registros": 0}
+    inicio = monotonic()
+    proceso = subprocess.Popen(comando, cwd=os.path.dirname(os.path.abspath(__file__)), env=entorno,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        # /health: 503 mientras se calienta, 200 cuando está listo
+        while monotonic() - inicio < timeout:
+            if proceso.poll() is not None:
+                raise RuntimeError(f"el servidor terminó con código {proceso.returncode}")
+            try:
+                with urlopen(f'{base}/health', timeout=2):
+                    resultado["listo_seg"] = round(monotonic() - inicio, 2)
+                    break
+            except URLError as e:
+                if getattr(e, 'code', None) == 503 and resultado["escuchando_seg"] is None:
+                    resultado["escuchando_seg"] = round(monotonic() - inicio, 2)
+            except OSError:
+                pass
+            sleep(0.05)
+        if resultado["escuchando_seg"] is None:
+            resultado["escuchando_seg"] = resultado["listo_seg"]
+
+        cuerpo = json.dumps({'fecha_inicio': FECHA_INICIO.strftime('%Y-%m-%d'),
+                             'fecha_fin': FECHA_INICIO.strftime('%Y-%m-%d'), 'motor': motor}).encode()
+        solicitud = Request(f'{base}/scrape/stream', data=cuerpo, headers={'Content-Type': 'application/json'})
+        with urlopen(solicitud, timeout=timeout) as respuesta:
+            for linea in respuesta:
+                if not linea.strip():
+                    continue
+                if resultado["primer_registro_seg"] is None:
+                    resultado["primer_registro_seg"] = round(monotonic() - inicio, 2)
+                resultado["registros"] += 1
+        resultado["total_seg"] = round(monotonic() - inicio, 2)
+    finally:
+        proceso.terminate()
+        try:
+            proceso.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proceso.kill()
+        mock.cerrar()
+    return resultado
+
+
+def main():
+    opciones = {'motor': 'navegador', 'filas-por-dia': 30, 'dias': 1, 'latencia': 0.05, 'workers': 1,
+                'modo-fichas': '',
+                'min-filas-seg': 0.0, 'max-llamadas-fila': 0.0,
+                'servidor': 'gunicorn', 'max-primer-registro-seg': 0.0}
+    for arg in sys.argv[1:]:
+        nombre, _, valor = arg.lstrip('-').partition('=')
+        if nombre in opciones:
+            opciones[nombre] = type(opciones[nombre])(valor)
+
+    if '--json' in sys.argv:
+        logging.getLogger().setLevel(logging.WARNING)
+
+    if '--arranque' in sys.argv:
+        resultado = ejecutar_arranque(servidor=opciones['servidor'], motor=opciones['motor'],
+                                      filas_por_dia=opciones['filas-por-dia'], latencia=opciones['latencia'])
+        print(json.dumps(resultado, ensure_ascii=False) if '--json' in sys.argv else
+              "\n".join(f"   {clave}: {valor}" for clave, valor in resultado.items()))
+        limite = opciones['max-primer-registro-seg']
+        if resultado['primer_registro_seg'] is None or (limite and resultado['primer_registro_seg'] > limite):
+            logger.error(f"❌ Regresión: primer registro en {resultado['primer_registro_seg']}s (máximo {limite or '-'})")
+            sys.exit(1)
+        sys.exit(0)
+
+    resultado = ejecutar_benchmark(motor=opciones['motor'], filas_por_dia=opciones['filas-por-dia'],
+                                   dias=opciones['dias'], latencia=opciones['latencia'],
+                                   workers=opciones['workers'], headless='--visible' not in sys.argv,
+                                   modo_fichas=opciones['modo-fichas'] or None)
+
+    if '--json' in sys.argv:
+        print(json.dumps(resultado, ensure_ascii=False))
+    else:
+        print("\n" + "=" * 70)
+        print("📈 BENCHMARK (mock de SEACE)")
+        print("=" * 70)
+        for clave, valor in resultado.items():
+            print(f"   {clave}: {valor}")
+        print("=" * 70 + "\n")
+
+    # Umbrales opcionales para CI: código de salida 1 si hay regresión
+    regresiones = []
+    if resultado['filas'] < resultado['filas_esperadas']:
+        regresiones.append(f"faltan filas ({resultado['filas']}/{resultado['filas_esperadas']})")
+    if opciones['min-filas-seg'] and resultado['filas_por_seg'] < opciones['min-filas-seg']:
+        regresiones.append(f"filas/seg {resultado['filas_por_seg']} < {opciones['min-filas-seg']}")
+    if (opciones['max-llamadas-fila'] and resultado['llamadas_por_fila'] is not None
+            and resultado['llamadas_por_fila'] > opciones['max-llamadas-fila']):
+        regresiones.append(f"llamadas/fila {resultado['llamadas_por_fila']} > {opciones['max-llamadas-fila']}")
+
+    for regresion in regresiones:
+        logger.error(f"❌ Regresión: {regresion}")
+    sys.exit(1 if regresiones else 0)
+
+
+if __name__ == '__main__':
+    main()
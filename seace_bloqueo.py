@@ -0,0 +1,156 @@
+
+import os
+import json
+import logging
+import threading
+
+from seace_metricas import SOLICITUDES_BLOQUEADAS, BYTES_AHORRADOS
+
+logger = logging.getLogger(__name__)
+
+# Recursos que el extractor no necesita: estilos, fuentes, imágenes y analítica de terceros.
+# Los scripts propios (jQuery/PrimeFaces) NO se bloquean: de ellos dependen el AJAX y las esperas.
+PATRONES_POR_DEFECTO = [
+    '*.css', '*.css?*',
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot',
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.svg', '*.ico', '*.webp',
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*',
+    '*facebook.net*', '*hotjar.com*', '*clarity.ms*'
+]
+
+# Bytes típicos de cada tipo de recurso (ResourceType de CDP) para estimar lo ahorrado sin pedir nada a la red.
+# Se recalibra con SEACE_TAMANOS_BLOQUEO (JSON {tipo: bytes}) usando el 'promedio_por_tipo' del resumen
+# de un scraping sin bloqueo (SEACE_BLOQUEO=ninguno).
+TAMANOS_POR_TIPO = {
+    'Stylesheet': 25_000,
+    'Font': 45_000,
+    'Image': 10_000,
+    'Media': 100_000,
+    'Script': 50_000,
+    'Other': 2_000
+}
+
+
+def patrones_configurados() -> list:
+    """Patrones de SEACE_BLOQUEO (separados por coma); 'ninguno' desactiva el bloqueo"""
+    valor = os.environ.get('SEACE_BLOQUEO')
+    if valor is None:
+        return list(PATRONES_POR_DEFECTO)
+    if valor.strip().lower() in ('', 'ninguno', '0', 'false'):
+        return []
+    return [patron.strip() for patron in valor.split(',') if patron.strip()]
+
+
+def configurar_opciones(options, patrones: list):
+    """Activa el log de red de Chrome, de donde se sacan las estadísticas de bloqueo"""
+    if patrones:
+        options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+        options.add_experimental_option('perfLoggingPrefs', {'enableNetwork': True, 'enablePage': False})
+
+
+def activar_bloqueo(driver, patrones: list):
+    """Bloquea por CDP las URLs que calzan con los patrones (vale para todas las navegaciones del tab)"""
+    if not patrones:
+        return
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patrones})
+        logger.info(f"🚫 Bloqueando {len(patrones)} patrones de recursos")
+    except Exception as e:
+        logger.warning(f"⚠️  No se pudo activar el bloqueo de recursos: {e}")
+
+
+def tamanos_configurados() -> dict:
+    """Tabla de bytes por tipo de recurso, con los valores calibrados de SEACE_TAMANOS_BLOQUEO encima"""
+    tamanos = dict(TAMANOS_POR_TIPO)
+    valor = os.environ.get('SEACE_TAMANOS_BLOQUEO')
+    if valor:
+        try:
+            tamanos.update({tipo: int(bytes_tipo) for tipo, bytes_tipo in json.loads(valor).items()})
+        except (ValueError, TypeError, AttributeError) as e:
+            logger.warning(f"⚠️  SEACE_TAMANOS_BLOQUEO inválido, se usa la tabla por defecto: {e}")
+    return tamanos
+
+
+TAMANOS = tamanos_configurados()
+
+
+def tamano_estimado(tipo: str) -> int:
+    """Bytes que pesaría un recurso de ese tipo (los tipos sin tamaño propio cuentan como 'Other')"""
+    return TAMANOS.get(tipo, TAMANOS.get('Other', 0))
+
+
+class EstadisticasBloqueo:
+    """Cuenta, por job, lo descargado y lo bloqueado leyendo el log de red de los navegadores"""
+
+    def __init__(self):
+        self.solicitudes_bloqueadas = 0
+        self.solicitudes_descargadas = 0
+        self.bytes_descargados = 0
+        self._bloqueadas_por_tipo = {}   # tipo -> veces
+        self._descargadas_por_tipo = {}  # tipo -> [solicitudes, bytes] (sirve para calibrar TAMANOS_POR_TIPO)
+        self._tipos_en_curso = {}        # requestId -> tipo
+        self._bytes_contados = 0    # ya sumados a la métrica (resumen() se puede llamar varias veces)
+        self._lock = threading.Lock()
+
+    def descartar(self, driver):
+        """Vacía el log pendiente (p. ej. de un job anterior en un driver del pool)"""
+        try:
+            driver.get_log('performance')
+        except Exception:
+            pass
+
+    def recolectar(self, driver):
+        """Lee el log de red acumulado desde la última lectura (una llamada a WebDriver)"""
+        try:
+            entradas = driver.get_log('performance')
+        except Exception:
+            return
+
+        with self._lock:
+            for entrada in entradas:
+                try:
+                    mensaje = json.loads(entrada['message'])['message']
+                except (KeyError, ValueError):
+                    continue
+                metodo, params = mensaje.get('method'), mensaje.get('params', {})
+
+                if metodo in ('Network.requestWillBeSent', 'Network.responseReceived'):
+                    if params.get('type'):
+                        self._tipos_en_curso[params.get('requestId')] = params['type']
+                elif metodo == 'Network.loadingFinished':
+                    tipo = self._tipos_en_curso.pop(params.get('requestId'), 'Other')
+                    tamano = int(params.get('encodedDataLength') or 0)
+                    self.solicitudes_descargadas += 1
+                    self.bytes_descargados += tamano
+                    descargadas = self._descargadas_por_tipo.setdefault(tipo, [0, 0])
+                    descargadas[0] += 1
+                    descargadas[1] += tamano
+                elif metodo == 'Network.loadingFailed':
+                    tipo = params.get('type') or self._tipos_en_curso.get(params.get('requestId'), 'Other')
+                    self._tipos_en_curso.pop(params.get('requestId'), None)
+                    if params.get('blockedReason'):
+                        self.solicitudes_bloqueadas += 1
+                        self._bloqueadas_por_tipo[tipo] = self._bloqueadas_por_tipo.get(tipo, 0) + 1
+                        SOLICITUDES_BLOQUEADAS.inc()
+
+    def resumen(self) -> dict:
+        """Solicitudes y bytes ahorrados, estimados con el tamaño típico del tipo de cada recurso bloqueado.
+
+        No hace solicitudes de red. promedio_por_tipo (bytes por solicitud descargada) es lo que se
+        usa para calibrar SEACE_TAMANOS_BLOQUEO con un scraping sin bloqueo.
+        """
+        with self._lock:
+            bytes_ahorrados = sum(tamano_estimado(tipo) * veces for tipo, veces in self._bloqueadas_por_tipo.items())
+            nuevos = max(0, bytes_ahorrados - self._bytes_contados)
+            self._bytes_contados = max(self._bytes_contados, bytes_ahorrados)
+            promedio_por_tipo = {tipo: total // solicitudes
+                                 for tipo, (solicitudes, total) in self._descargadas_por_tipo.items() if solicitudes}
+        BYTES_AHORRADOS.inc(nuevos)
+        return {
+            "solicitudes_bloqueadas": self.solicitudes_bloqueadas,
+            "bytes_ahorrados_estimados": bytes_ahorrados,
+            "solicitudes_descargadas": self.solicitudes_descargadas,
+            "bytes_descargados": self.bytes_descargados,
+            "promedio_por_tipo": promedio_por_tipo
+        }
@@ -0,0 +1,116 @@
+
+import json
+import logging
+import sqlite3
+import threading
+from time import time
+
+logger = logging.getLogger(__name__)
+
+CAMPOS_FICHA = ['Fecha de Inicio', 'Fecha de Fin', 'Region', 'CUBSO']
+
+
+class CacheFichas:
+    """Cache en disco (SQLite) de los datos de ficha, por Nomenclatura, con TTL y tamaño máximo"""
+
+    def __init__(self, ruta: str, ttl_segundos: float = 24 * 3600, max_entradas: int = 50000):
+        self.ruta = ruta
+        self.ttl_segundos = ttl_segundos
+        self.max_entradas = max_entradas
+        self.aciertos = 0
+        self.fallos = 0
+
+        self._lock = threading.Lock()
+        self._escrituras = 0
+        self._conexion = sqlite3.connect(ruta, timeout=30, check_same_thread=False)
+        self._conexion.execute("PRAGMA journal_mode=WAL")
+        self._conexion.execute("""
+            CREATE TABLE IF NOT EXISTS fichas (
+                nomenclatura TEXT PRIMARY KEY,
+                fecha_inicio TEXT,
+                fecha_fin TEXT,
+                region TEXT,
+                cubso TEXT,
+                creado REAL NOT NULL,
+                ultimo_acceso REAL NOT NULL,
+                cronograma TEXT
+            )
+        """)
+        # Caches creadas antes de guardar el cronograma completo
+        existentes = {fila[1] for fila in self._conexion.execute("PRAGMA table_info(fichas)")}
+        if 'cronograma' not in existentes:
+            self._conexion.execute("ALTER TABLE fichas ADD COLUMN cronograma TEXT")
+        self._conexion.execute("CREATE INDEX IF NOT EXISTS idx_fichas_acceso ON fichas (ultimo_acceso)")
+        self._conexion.commit()
+
+    def obtener(self, nomenclatura: str):
+        """Retorna los datos de ficha guardados, o None si no están o ya vencieron"""
+        if not nomenclatura:
+            return None
+
+        ahora = time()
+        with self._lock:
+            fila = self._conexion.execute(
+                "SELECT fecha_inicio, fecha_fin, region, cubso, creado, cronograma FROM fichas "
+                "WHERE nomenclatura = ?",
+                (nomenclatura,)
+            ).fetchone()
+
+            if fila is None or ahora - fila[4] > self.ttl_segundos:
+                self.fallos += 1
+                return None
+
+            self._conexion.execute(
+                "UPDATE fichas SET ultimo_acceso = ? WHERE nomenclatura = ?",
+                (ahora, nomenclatura)
+            )
+            self._conexion.commit()
+
+        self.aciertos += 1
+        return {**dict(zip(CAMPOS_FICHA, fila[:4])), 'Cronograma': json.loads(fila[5] or '[]')}
+
+    def guardar(self, nomenclatura: str, datos_ficha: dict):
+        """Guarda los datos de ficha (solo si se obtuvo algo de la ficha)"""
+        if not nomenclatura or not any(datos_ficha.get(campo) for campo in CAMPOS_FICHA):
+            return
+
+        ahora = time()
+        with self._lock:
+            self._conexion.execute(
+                "INSERT OR REPLACE INTO fichas VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (nomenclatura, *[datos_ficha.get(campo, '') for campo in CAMPOS_FICHA], ahora, ahora,
+                 json.dumps(datos_ficha.get('Cronograma') or [], ensure_ascii=False))
+            )
+            self._conexion.commit()
+
+            # Limpiar cada cierto número de escrituras para no pagarlo en cada fila
+            self._escrituras += 1
+            if self._escrituras % 100 == 0:
+                self._evictar(ahora)
+
+    def _evictar(self, ahora: float):
+        """Borra lo vencido y, si se pasa del máximo, lo menos usado recientemente"""
+        self._conexion.execute("DELETE FROM fichas WHERE creado < ?", (ahora - self.ttl_segundos,))
+        total = self._conexion.execute("SELECT COUNT(*) FROM fichas").fetchone()[0]
+        if total > self.max_entradas:
+            self._conexion.execute(
+                "DELETE FROM fichas WHERE nomenclatura IN "
+                "(SELECT nomenclatura FROM fichas ORDER BY ultimo_acceso LIMIT ?)",
+                (total - self.max_entradas,)
+            )
+        self._conexion.commit()
+
+    def estado(self) -> dict:
+        with self._lock:
+            total = self._conexion.execute("SELECT COUNT(*) FROM fichas").fetchone()[0]
+        return {
+            "entradas": total,
+            "aciertos": self.aciertos,
+            "fallos": self.fallos,
+            "ttl_segundos": self.ttl_segundos,
+            "max_entradas": self.max_entradas
+        }
+
+    def cerrar(self):
+        with self._lock:
+            self._conexion.close()
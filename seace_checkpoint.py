@@ -0,0 +1,167 @@
+
+import os
+import json
+import fcntl
+import logging
+from datetime import datetime
+
+from seace_registro import Registro
+
+logger = logging.getLogger(__name__)
+
+
+class Checkpoint:
+    """Guarda el avance de un scraping para poder reanudarlo.
+
+    Cada registro se agrega a un JSONL (no se reescribe lo ya guardado); la cabecera JSON
+    solo tiene página, fila y cuántos registros del JSONL son válidos.
+    """
+
+    def __init__(self, directorio: str, fecha_inicio: datetime, fecha_fin: datetime, cada_filas: int = 10):
+        self.fecha_inicio = fecha_inicio.strftime('%Y-%m-%d')
+        self.fecha_fin = fecha_fin.strftime('%Y-%m-%d')
+        self.cada_filas = max(1, cada_filas)
+        self._filas_sin_guardar = 0
+        self._ultimo = None
+        self._registros = 0
+        self._archivo = None
+        self._lock = None
+
+        os.makedirs(directorio, exist_ok=True)
+        base = os.path.join(directorio, f"checkpoint_{fecha_inicio.strftime('%Y%m%d')}_{fecha_fin.strftime('%Y%m%d')}")
+        self.ruta = f"{base}.json"
+        self.ruta_registros = f"{base}.jsonl"
+        self.ruta_lock = f"{base}.lock"
+
+    def tomar(self) -> bool:
+        """Reserva el checkpoint del rango para este scraping. False si otro (de cualquier proceso) lo está usando"""
+        while True:
+            self._lock = open(self.ruta_lock, 'w')
+            try:
+                fcntl.flock(self._lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                self._lock.close()
+                self._lock = None
+                return False
+            # borrar() elimina el .lock: si se tomó el de un archivo ya borrado, se vuelve a abrir
+            try:
+                if os.stat(self.ruta_lock).st_ino == os.fstat(self._lock.fileno()).st_ino:
+                    return True
+            except FileNotFoundError:
+                pass
+            self._lock.close()
+
+    def cargar(self):
+        """Retorna el último estado guardado para este rango ({pagina, fila, resultados}), o None.
+
+        Deja el JSONL listo para seguir agregando (sin las filas escritas después de la última cabecera).
+        """
+        estado = self._leer()
+        resultados = []
+        if estado is not None:
+            try:
+                with open(self.ruta_registros, encoding='utf-8') as archivo:
+                    for linea in archivo:
+                        if len(resultados) >= estado['registros']:
+                            break
+                        resultados.append(Registro.desde_dict(json.loads(linea)))
+            except (OSError, ValueError) as e:
+                logger.warning(f"⚠️  Registros del checkpoint ilegibles, se ignora: {e}")
+                estado = None
+            if estado is not None and len(resultados) < estado['registros']:
+                logger.warning("⚠️  Checkpoint incompleto, se ignora")
+                estado = None
+
+        if estado is None:
+            resultados = []
+        # Se reescribe una sola vez al reanudar; de ahí en adelante solo se agrega
+        with open(self.ruta_registros, 'w', encoding='utf-8') as archivo:
+            for registro in resultados:
+                archivo.write(json.dumps(registro.a_dict(con_cronograma=True), ensure_ascii=False) + '\n')
+        self._archivo = open(self.ruta_registros, 'a', encoding='utf-8')
+        self._registros = len(resultados)
+
+        if estado is None:
+            return None
+        estado['resultados'] = resultados
+        logger.info(f"⏮️  Checkpoint encontrado: página {estado['pagina']}, fila {estado['fila'] + 1}, "
+                    f"{len(resultados)} registros")
+        return estado
+
+    def _leer(self):
+        if not os.path.exists(self.ruta):
+            return None
+        try:
+            with open(self.ruta, encoding='utf-8') as archivo:
+                estado = json.load(archivo)
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️  Checkpoint ilegible, se ignora: {e}")
+            return None
+        if estado.get('fecha_inicio') != self.fecha_inicio or estado.get('fecha_fin') != self.fecha_fin:
+            return None
+        if not isinstance(estado.get('registros'), int):
+            return None
+        return estado
+
+    def guardar(self, pagina: int, fila: int):
+        """Escribe la cabecera de forma atómica (archivo temporal + rename), después de bajar los registros a disco"""
+        estado = {
+            'fecha_inicio': self.fecha_inicio,
+            'fecha_fin': self.fecha_fin,
+            'pagina': pagina,
+            'fila': fila,  # Próxima fila (índice) a procesar en la página
+            'registros': self._registros,
+            'actualizado': datetime.now().isoformat(timespec='seconds')
+        }
+        temporal = f"{self.ruta}.tmp"
+        try:
+            if self._archivo is not None:
+                self._archivo.flush()
+                os.fsync(self._archivo.fileno())
+            with open(temporal, 'w', encoding='utf-8') as archivo:
+                json.dump(estado, archivo, ensure_ascii=False)
+            os.replace(temporal, self.ruta)
+            self._filas_sin_guardar = 0
+        except OSError as e:
+            logger.warning(f"⚠️  No se pudo guardar el checkpoint: {e}")
+
+    def registrar(self, pagina: int, fila: int, registro: Registro):
+        """Agrega el registro de una fila procesada y guarda la cabecera cada N filas"""
+        try:
+            self._archivo.write(json.dumps(registro.a_dict(con_cronograma=True), ensure_ascii=False) + '\n')
+        except (OSError, AttributeError) as e:
+            logger.warning(f"⚠️  No se pudo guardar el registro en el checkpoint: {e}")
+            return
+        self._registros += 1
+        self._ultimo = (pagina, fila)
+        self._filas_sin_guardar += 1
+        if self._filas_sin_guardar >= self.cada_filas:
+            self.guardar(pagina, fila)
+
+    def guardar_pendiente(self):
+        """Guarda las filas anotadas que aún no llegaron a disco (p. ej. al interrumpirse)"""
+        if self._ultimo is not None and self._filas_sin_guardar:
+            self.guardar(*self._ultimo)
+
+    def cerrar(self):
+        """Cierra los archivos y libera el checkpoint (queda en disco para reanudar)"""
+        if self._archivo is not None:
+            self._archivo.close()
+            self._archivo = None
+        if self._lock is not None:
+            self._lock.close()
+            self._lock = None
+
+    def borrar(self):
+        """Elimina el checkpoint (y su .lock) cuando el scraping terminó completo"""
+        if self._archivo is not None:
+            self._archivo.close()
+            self._archivo = None
+        # El .lock se borra mientras aún se tiene tomado, así nadie lo reserva a medio borrar
+        rutas = [self.ruta, self.ruta_registros] + ([self.ruta_lock] if self._lock is not None else [])
+        for ruta in rutas:
+            try:
+                os.remove(ruta)
+            except FileNotFoundError:
+                pass
+        self.cerrar()
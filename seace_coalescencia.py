@@ -0,0 +1,96 @@
+
+import logging
+import threading
+from time import time
+
+from seace_metricas import COALESCENCIA
+
+logger = logging.getLogger(__name__)
+
+
+class _Vuelo:
+    """Una ejecución en curso a la que se pueden unir otras solicitudes idénticas"""
+
+    def __init__(self):
+        self.listo = threading.Event()
+        self.resultado = None
+        self.error = None
+
+
+class Coalescedor:
+    """Une solicitudes idénticas en curso en una sola ejecución y guarda su resultado unos segundos.
+
+    al_expirar(resultado) se llama cuando un resultado sale de la cache (p. ej. para borrar su archivo).
+    """
+
+    def __init__(self, ttl_seg: float = 60, al_expirar=None):
+        self.ttl_seg = ttl_seg
+        self.al_expirar = al_expirar
+        self._en_curso = {}  # clave -> _Vuelo
+        self._cache = {}     # clave -> (vence, resultado)
+        self._lock = threading.Lock()
+
+    def ejecutar(self, clave, funcion, usar_cache: bool = True):
+        """Resultado de funcion() para la clave: desde la cache, uniéndose a la ejecución en curso o ejecutándola"""
+        with self._lock:
+            vencidos = self._purgar()
+            en_cache = usar_cache and clave in self._cache
+            if en_cache:
+                resultado = self._cache[clave][1]
+            else:
+                vuelo = self._en_curso.get(clave)
+                lider = vuelo is None
+                if lider:
+                    vuelo = self._en_curso[clave] = _Vuelo()
+        self._expirar(vencidos)
+
+        if en_cache:
+            COALESCENCIA.labels('cache').inc()
+            logger.info("💾 Resultado reciente en cache, no se vuelve a scrapear")
+            return resultado
+
+        if not lider:
+            COALESCENCIA.labels('unida').inc()
+            logger.info("🔗 Solicitud idéntica en curso, esperando su resultado")
+            vuelo.listo.wait()
+            if vuelo.error is not None:
+                raise vuelo.error
+            return vuelo.resultado
+
+        COALESCENCIA.labels('lider').inc()
+        reemplazado = None
+        try:
+            vuelo.resultado = funcion()
+        except Exception as e:
+            vuelo.error = e
+            raise
+        finally:
+            with self._lock:
+                self._en_curso.pop(clave, None)
+                # Los errores no se guardan: la siguiente solicitud vuelve a intentar
+                if vuelo.error is None and self.ttl_seg > 0:
+                    reemplazado = self._cache.pop(clave, None)
+                    self._cache[clave] = (time() + self.ttl_seg, vuelo.resultado)
+            vuelo.listo.set()
+            if reemplazado is not None:
+                self._expirar([reemplazado[1]])
+        return vuelo.resultado
+
+    def estado(self) -> dict:
+        with self._lock:
+            return {"en_curso": len(self._en_curso), "en_cache": len(self._cache), "ttl_seg": self.ttl_seg}
+
+    def _purgar(self) -> list:
+        """Saca de la cache los resultados vencidos (llamar con el lock tomado)"""
+        ahora = time()
+        vencidas = [clave for clave, (vence, _) in self._cache.items() if vence <= ahora]
+        return [self._cache.pop(clave)[1] for clave in vencidas]
+
+    def _expirar(self, resultados: list):
+        if self.al_expirar is None:
+            return
+        for resultado in resultados:
+            try:
+                self.al_expirar(resultado)
+            except Exception as e:
+                logger.warning(f"⚠️  Error liberando un resultado vencido: {e}")
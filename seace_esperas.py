@@ -0,0 +1,113 @@
+
+import logging
+from collections import defaultdict, deque
+from time import monotonic, sleep
+
+from selenium.common.exceptions import WebDriverException
+
+logger = logging.getLogger(__name__)
+
+# Espera dentro del navegador (una sola llamada a WebDriver) hasta que la página esté quieta:
+# documento cargado, sin AJAX de jQuery/PrimeFaces pendiente y, si se pide, con el elemento presente.
+JS_ESPERAR_OCIOSO = """
+var xpath = arguments[0], limite = arguments[1], callback = arguments[arguments.length - 1];
+var inicio = Date.now(), estables = 0;
+function ocioso() {
+    if (document.readyState !== 'complete') { return false; }
+    if (window.jQuery && jQuery.active > 0) { return false; }
+    if (window.PrimeFaces && PrimeFaces.ajax && PrimeFaces.ajax.Queue &&
+        typeof PrimeFaces.ajax.Queue.isEmpty === 'function' && !PrimeFaces.ajax.Queue.isEmpty()) { return false; }
+    if (xpath && !document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue) {
+        return false;
+    }
+    return true;
+}
+(function revisar() {
+    // Dos lecturas seguidas en reposo para no ganarle a un AJAX que recién arranca
+    if (ocioso()) {
+        estables += 1;
+        if (estables >= 2) { callback(true); return; }
+    } else {
+        estables = 0;
+    }
+    if (Date.now() - inicio > limite) { callback(false); return; }
+    setTimeout(revisar, 50);
+})();
+"""
+
+
+class MotorEsperas:
+    """Esperas por eventos (AJAX ocioso / DOM listo) con timeouts adaptativos por fase"""
+
+    def __init__(self, obtener_driver, timeout_min: float = 2, timeout_max: float = 20,
+                 factor: float = 3, muestras: int = 50):
+        self.obtener_driver = obtener_driver  # callable: el driver puede cambiar (reinicios)
+        self.timeout_min = timeout_min
+        self.timeout_max = timeout_max
+        self.factor = factor  # timeout = factor × la latencia más alta observada en la fase
+
+        self._latencias = defaultdict(lambda: deque(maxlen=muestras))
+        self._espera_por_fase = defaultdict(float)
+        self._timeouts = defaultdict(int)
+        self._conteo = defaultdict(int)
+        self._inicio = None
+
+    def iniciar_medicion(self):
+        """Marca el inicio del trabajo para el reporte espera vs trabajo"""
+        self._inicio = monotonic()
+
+    def timeout_para(self, fase: str) -> float:
+        """Timeout adaptativo según las latencias recientes de la fase"""
+        latencias = self._latencias[fase]
+        if not latencias:
+            return self.timeout_max
+        return min(self.timeout_max, max(self.timeout_min, max(latencias) * self.factor))
+
+    def esperar(self, fase: str, xpath: str = None, timeout: float = None) -> bool:
+        """Espera a que la página quede quieta (y a que exista `xpath`). Retorna False si venció"""
+        timeout = timeout or self.timeout_para(fase)
+        driver = self.obtener_driver()
+        inicio = monotonic()
+        listo = False
+
+        while True:
+            restante = timeout - (monotonic() - inicio)
+            if restante <= 0:
+                break
+            try:
+                driver.set_script_timeout(restante + 2)
+                listo = bool(driver.execute_async_script(JS_ESPERAR_OCIOSO, xpath, int(restante * 1000)))
+                break
+            except WebDriverException:
+                # Una navegación completa descarta el script en curso: reintentar en el documento nuevo
+                sleep(0.05)
+
+        transcurrido = monotonic() - inicio
+        self._espera_por_fase[fase] += transcurrido
+        self._conteo[fase] += 1
+        if listo:
+            self._latencias[fase].append(transcurrido)
+        else:
+            self._timeouts[fase] += 1
+            logger.warning(f"         ⏱️  Espera '{fase}' venció a los {timeout:.1f}s")
+        return listo
+
+    def resumen(self) -> dict:
+        """Tiempo esperando vs trabajando, y detalle por fase"""
+        total = monotonic() - self._inicio if self._inicio else 0
+        espera = sum(self._espera_por_fase.values())
+        return {
+            "total_seg": round(total, 2),
+            "espera_seg": round(espera, 2),
+            "trabajo_seg": round(max(0, total - espera), 2),
+            "porcentaje_espera": round(100 * espera / total, 1) if total else 0,
+            "fases": {
+                fase: {
+                    "espera_seg": round(segundos, 2),
+                    "esperas": self._conteo[fase],
+                    "timeouts": self._timeouts[fase],
+                    "timeout_actual_seg": round(self.timeout_para(fase), 2)
+                }
+                for fase, segundos in self._espera_por_fase.items()
+            }
+        }
@@ -0,0 +1,125 @@
+
+import csv
+import logging
+
+from seace_registro import Registro
+
+logger = logging.getLogger(__name__)
+
+# Orden de las columnas en los archivos de salida
+COLUMNAS_ORDEN = list(Registro.COLUMNAS)
+
+# formato → (mimetype, extensión)
+FORMATOS = {
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', 'xlsx'),
+    'csv': ('text/csv', 'csv'),
+    'parquet': ('application/vnd.apache.parquet', 'parquet')
+}
+
+FILAS_POR_LOTE_PARQUET = 5000
+
+
+def formato_desde_solicitud(parametro: str = None, accept: str = None) -> str:
+    """Elige el formato: parámetro explícito, si no el header Accept, si no xlsx"""
+    if parametro:
+        if parametro not in FORMATOS:
+            raise ValueError(f"Formato inválido. Use uno de: {', '.join(FORMATOS)}")
+        return parametro
+
+    for formato, (mimetype, _) in FORMATOS.items():
+        if accept and mimetype in accept:
+            return formato
+    return 'xlsx'
+
+
+def exportar(registros, ruta: str, formato: str = 'xlsx') -> int:
+    """Escribe los registros (iterable de Registro, se consume una sola vez) fila por fila.
+
+    No arma DataFrames ni guarda el archivo completo en memoria. Retorna cuántos registros escribió.
+    """
+    if formato == 'xlsx':
+        total = _exportar_xlsx(registros, ruta)
+    elif formato == 'csv':
+        total = _exportar_csv(registros, ruta)
+    elif formato == 'parquet':
+        total = _exportar_parquet(registros, ruta)
+    else:
+        raise ValueError(f"Formato inválido: {formato}")
+
+    logger.info(f"💾 Archivo guardado: {ruta} ({total} registros)")
+    return total
+
+
+def _exportar_xlsx(registros, ruta: str) -> int:
+    from openpyxl import Workbook
+
+    # write_only: las filas se vuelcan a disco a medida que se agregan
+    libro = Workbook(write_only=True)
+    hoja = libro.create_sheet()
+    hoja.append(COLUMNAS_ORDEN)
+
+    total = 0
+    # Celdas tipadas: el monto queda como número y las fechas como fecha de Excel
+    for registro in registros:
+        hoja.append(registro.a_fila())
+        total += 1
+
+    libro.save(ruta)
+    return total
+
+
+def _exportar_csv(registros, ruta: str) -> int:
+    total = 0
+    with open(ruta, 'w', newline='', encoding='utf-8') as archivo:
+        escritor = csv.writer(archivo)
+        escritor.writerow(COLUMNAS_ORDEN)
+        for registro in registros:
+            escritor.writerow(registro.a_dict().values())
+            total += 1
+    return total
+
+
+def _exportar_parquet(registros, ruta: str) -> int:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("La exportación a Parquet requiere pyarrow (pip install pyarrow)")
+
+    esquema = esquema_parquet(pa)
+    total = 0
+    lote = []
+
+    # Se escribe por lotes (row groups) para no juntar todo en memoria
+    with pq.ParquetWriter(ruta, esquema) as escritor:
+        for registro in registros:
+            lote.append(registro)
+            if len(lote) >= FILAS_POR_LOTE_PARQUET:
+                escritor.write_table(_tabla_parquet(pa, esquema, lote))
+                total += len(lote)
+                lote = []
+        if lote or total == 0:
+            escritor.write_table(_tabla_parquet(pa, esquema, lote))
+            total += len(lote)
+
+    return total
+
+
+def esquema_parquet(pa):
+    """Columnas tipadas: N° entero, fechas timestamp, monto decimal y el resto texto"""
+    tipos = {
+        'N°': pa.int64(),
+        'Fecha': pa.timestamp('s'),
+        'Valor Referencial': pa.decimal128(18, 2),
+        'Fecha de Inicio': pa.timestamp('s'),
+        'Fecha de Fin': pa.timestamp('s')
+    }
+    return pa.schema([(columna, tipos.get(columna, pa.string())) for columna in COLUMNAS_ORDEN])
+
+
+def _tabla_parquet(pa, esquema, lote: list):
+    filas = [registro.a_fila() for registro in lote]
+    return pa.table(
+        {columna: [fila[indice] for fila in filas] for indice, columna in enumerate(COLUMNAS_ORDEN)},
+        schema=esquema
+    )
@@ -0,0 +1,332 @@
+
+import os
+import logging
+import threading
+from datetime import datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from lxml import etree, html
+
+from seace_parseo import (
+    URL_BUSCADOR,
+    datos_basicos_desde_celdas,
+    parsear_ficha,
+    registro_sin_ficha,
+    texto
+)
+from seace_registro import Registro
+from seace_metricas import medir, FILAS, FICHAS, FALLBACKS
+
+logger = logging.getLogger(__name__)
+
+FORM = 'tbBuscador:idFormBuscarProceso'
+TABLA = f'{FORM}:dtProcesos'
+VIEW_STATE = 'javax.faces.ViewState'
+
+HEADERS_AJAX = {
+    'Faces-Request': 'partial/ajax',
+    'X-Requested-With': 'XMLHttpRequest',
+    'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8'
+}
+
+
+def parsear_respuesta_parcial(contenido: bytes) -> dict:
+    """Convierte un <partial-response> de JSF en {id_update: html}.
+
+    Lanza RuntimeError si JSF respondió con <error> (p. ej. ViewExpiredException) o <redirect>:
+    esa respuesta no trae updates y no debe confundirse con una tabla vacía.
+    """
+    raiz = etree.fromstring(contenido)
+    error = raiz.find('.//error')
+    if error is not None:
+        nombre = (error.findtext('error-name') or '').strip()
+        mensaje = (error.findtext('error-message') or '').strip()
+        raise RuntimeError(f"Error JSF en respuesta parcial: {nombre or 'desconocido'}: {mensaje}")
+    redireccion = raiz.find('.//redirect')
+    if redireccion is not None:
+        raise RuntimeError(f"JSF redirigió la respuesta parcial a {redireccion.get('url')} (¿sesión o vista expirada?)")
+    updates = {}
+    for update in raiz.iter('update'):
+        updates[update.get('id')] = update.text or ''
+    return updates
+
+
+def parsear_filas(fragmento: str) -> list:
+    """Lee las filas de la tabla de resultados desde HTML (página completa o solo <tr>)"""
+    if not fragmento.strip():
+        return []
+
+    if fragmento.lstrip().startswith('<tr'):
+        # La paginación de PrimeFaces devuelve solo las filas
+        fragmento = f'<table><tbody id="{TABLA}_data">{fragmento}</tbody></table>'
+
+    doc = html.fromstring(fragmento)
+    filas = []
+    for tr in doc.xpath(f'//tbody[@id="{TABLA}_data"]/tr'):
+        if 'ui-datatable-empty-message' in (tr.get('class') or ''):
+            continue
+        celdas = [texto(td) for td in tr.xpath('./td')]
+        if len(celdas) < 11:
+            continue
+
+        # El botón de ficha es un <img> dentro del enlace (commandLink) que hace el postback
+        enlace = tr.xpath('.//img[contains(@id, "grafichaSel")]/ancestor::a[1]')
+        filas.append({
+            'celdas': celdas,
+            'ficha_id': enlace[0].get('id') if enlace else None
+        })
+    return filas
+
+
+class SeaceHttpCompleto:
+    """Mismo trabajo que SeaceScraperCompleto pero sin navegador: reproduce los POST de JSF/PrimeFaces"""
+
+    def __init__(self, url_buscador: str = None, timeout: float = 30, session: requests.Session = None,
+                 cache_fichas=None, progreso: dict = None, on_registro=None, guardar_resultados: bool = True,
+                 cancelar: threading.Event = None):
+        self.url_buscador = url_buscador or os.environ.get('SEACE_URL', URL_BUSCADOR)
+        self.timeout = timeout
+        self.session = session
+        self._session_propia = session is None
+        self.view_state = None
+        self.campos_formulario = {}
+        self.resultados = []
+        self.cache_fichas = cache_fichas
+        self.progreso = progreso if progreso is not None else {}
+        # Streaming (igual que en SeaceScraperCompleto)
+        self.on_registro = on_registro
+        self.guardar_resultados = guardar_resultados
+        self.total_registros = 0
+        self.cancelar = cancelar
+
+    def iniciar(self):
+        """Crea la sesión HTTP con pool de conexiones y reintentos"""
+        if self.session is not None:
+            return
+
+        self.session = requests.Session()
+        reintentos = Retry(total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504],
+                           allowed_methods=['GET'])
+        adaptador = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=reintentos)
+        self.session.mount('https://', adaptador)
+        self.session.mount('http://', adaptador)
+        self.session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36',
+            'Accept-Language': 'es-PE,es;q=0.9'
+        })
+        logger.info("✅ Sesión HTTP iniciada\n")
+
+    def cerrar(self):
+        """Cierra la sesión (solo si la creó este motor)"""
+        if self.session is not None and self._session_propia:
+            self.session.close()
+
+    def _post_ajax(self, source: str, extra: dict, execute: str = '@all', render: str = FORM) -> dict:
+        """POST parcial de PrimeFaces; actualiza el ViewState y retorna los updates"""
+        datos = {
+            **self.campos_formulario,
+            'javax.faces.partial.ajax': 'true',
+            'javax.faces.source': source,
+            'javax.faces.partial.execute': execute,
+            'javax.faces.partial.render': render,
+            source: source,
+            FORM: FORM,
+            VIEW_STATE: self.view_state,
+            **extra
+        }
+        respuesta = self.session.post(self.url_buscador, data=datos, headers=HEADERS_AJAX, timeout=self.timeout)
+        respuesta.raise_for_status()
+
+        updates = parsear_respuesta_parcial(respuesta.content)
+        for id_update, contenido in updates.items():
+            if VIEW_STATE in (id_update or ''):
+                self.view_state = contenido.strip()
+        return updates
+
+    def cargar_buscador(self):
+        """GET inicial: obtiene cookies de sesión, ViewState y los campos del formulario"""
+        respuesta = self.session.get(self.url_buscador, timeout=self.timeout)
+        respuesta.raise_for_status()
+        doc = html.fromstring(respuesta.content)
+
+        formulario = doc.xpath(f'//form[@id="{FORM}"]')
+        if not formulario:
+            raise RuntimeError("No se encontró el formulario de búsqueda")
+
+        # Valores por defecto de todos los campos del formulario, como los enviaría el navegador
+        # (los selectOneMenu de PrimeFaces postean su valor desde un <select name="..._input">)
+        self.campos_formulario = {}
+        for campo in formulario[0].xpath('.//input[@name] | .//select[@name] | .//textarea[@name]'):
+            if campo.tag == 'select':
+                opciones = campo.xpath('.//option[@selected]') or campo.xpath('.//option')
+                if opciones:
+                    self.campos_formulario[campo.get('name')] = opciones[0].get('value', opciones[0].text_content())
+            elif campo.tag == 'textarea':
+                self.campos_formulario[campo.get('name')] = campo.text_content()
+            elif campo.get('type') in ('submit', 'button', 'image', 'file'):
+                continue
+            elif campo.get('type') in ('checkbox', 'radio'):
+                if campo.get('checked') is not None:
+                    self.campos_formulario[campo.get('name')] = campo.get('value', 'on')
+            else:
+                self.campos_formulario[campo.get('name')] = campo.get('value', '')
+
+        view_state = doc.xpath(f'//input[@name="{VIEW_STATE}"]/@value')
+        if not view_state:
+            raise RuntimeError("No se encontró javax.faces.ViewState")
+        self.view_state = view_state[0]
+        self.campos_formulario.pop(VIEW_STATE, None)
+
+    def buscar_y_extraer(self, fecha_inicio: datetime, fecha_fin: datetime) -> bool:
+        """Ejecuta la búsqueda y extrae los datos (una búsqueda por año si el rango cruza años).
+
+        Retorna True si el listado del rango se recorrió completo (una búsqueda sin resultados también lo es).
+        """
+        from seace_shards import dividir_por_anio, extraer_por_anios
+
+        tramos = dividir_por_anio(fecha_inicio, fecha_fin)
+        if len(tramos) > 1:
+            return extraer_por_anios(self, tramos, self._buscar_anio_aparte)
+
+        logger.info(f"📅 Rango: {fecha_inicio.strftime('%d/%m/%Y')} → {fecha_fin.strftime('%d/%m/%Y')}")
+
+        with medir('carga', 'http'):
+            self.cargar_buscador()
+        logger.info("📄 Buscador cargado")
+
+        # Buscar
+        logger.info("🔎 Buscando...")
+        self.campos_formulario.update({
+            f'{FORM}:anioConvocatoria_input': str(fecha_inicio.year),
+            f'{FORM}:dfechaInicio_input': fecha_inicio.strftime('%d/%m/%Y'),
+            f'{FORM}:dfechaFin_input': fecha_fin.strftime('%d/%m/%Y')
+        })
+        with medir('resultados', 'http'):
+            updates = self._post_ajax(f'{FORM}:btnBuscarSelToken', {})
+
+        tabla = next((contenido for contenido in updates.values() if f'{TABLA}_data' in contenido), None)
+        if tabla is None:
+            raise RuntimeError("La búsqueda no devolvió la tabla de resultados")
+        filas = parsear_filas(tabla)
+
+        if not filas:
+            # Solo el mensaje explícito de SEACE cuenta como búsqueda vacía (y por lo tanto completa)
+            if 'No se encontraron' not in tabla:
+                raise RuntimeError("La tabla de resultados vino sin filas y sin el mensaje de 'No se encontraron'")
+            logger.info("ℹ️  No hay datos para estas fechas")
+            return True
+
+        # Recorrer páginas con la paginación AJAX de la tabla
+        filas_por_pagina = len(filas)
+        pagina_actual = 1
+        while filas and not self.cancelado():
+            logger.info(f"📄 Procesando página {pagina_actual} ({len(filas)} filas)...")
+            self.progreso['pagina'] = pagina_actual
+            self.extraer_filas(filas)
+            self.progreso['filas'] = self.total_registros
+
+            if len(filas) < filas_por_pagina:
+                break
+
+            with medir('paginacion', 'http'):
+                filas = self.pedir_pagina(pagina_actual * filas_por_pagina, filas_por_pagina)
+            pagina_actual += 1
+
+        if self.total_registros:
+            logger.info(f"✅ Se extrajeron {self.total_registros} registros en total")
+        else:
+            logger.info("⚠️  No se encontraron datos")
+        # Un error de red corta con excepción; sin ella, solo la cancelación deja el listado a medias
+        completo = not self.cancelado()
+        if not completo:
+            logger.warning("⚠️  El listado quedó incompleto: el rango no se da por cubierto")
+        return completo
+
+    def _buscar_anio_aparte(self, fecha_inicio: datetime, fecha_fin: datetime):
+        """Busca un año con su propia sesión (en otro hilo). Retorna (registros, completo), o None si falló"""
+        anio = SeaceHttpCompleto(url_buscador=self.url_buscador, timeout=self.timeout,
+                                 cache_fichas=self.cache_fichas, cancelar=self.cancelar)
+        try:
+            anio.iniciar()
+            completo = anio.buscar_y_extraer(fecha_inicio, fecha_fin)
+            return anio.resultados, completo
+        except Exception as e:
+            logger.warning(f"⚠️  Falló la búsqueda del año {fecha_inicio.year}: {e}")
+            return None
+        finally:
+            anio.cerrar()
+
+    def agregar_registro(self, datos: dict):
+        """Tipa un registro terminado y lo entrega"""
+        FILAS.labels('http').inc()
+        self.entregar(Registro.desde_dict(datos))
+
+    def entregar(self, registro: Registro):
+        """Entrega un registro al callback de streaming y/o a self.resultados"""
+        self.total_registros += 1
+        if self.guardar_resultados:
+            self.resultados.append(registro)
+        if self.on_registro is not None:
+            self.on_registro(registro)
+
+    def cancelado(self) -> bool:
+        return self.cancelar is not None and self.cancelar.is_set()
+
+    def pedir_pagina(self, primera_fila: int, filas_por_pagina: int) -> list:
+        """Pide una página de la tabla (desde primera_fila) y retorna sus filas"""
+        updates = self._post_ajax(TABLA, {
+            f'{TABLA}_pagination': 'true',
+            f'{TABLA}_first': str(primera_fila),
+            f'{TABLA}_rows': str(filas_por_pagina),
+            f'{TABLA}_encodeFeature': 'true'
+        }, execute=TABLA, render=TABLA)
+        return parsear_filas(updates.get(TABLA, ''))
+
+    def extraer_filas(self, filas: list):
+        """Arma los registros de una página visitando la ficha de cada fila"""
+        for fila in filas:
+            if self.cancelado():
+                return
+
+            datos_basicos = datos_basicos_desde_celdas(fila['celdas'])
+            if not datos_basicos['Entidad Solicitante']:
+                continue
+
+            logger.info(f"      → N°{datos_basicos['N°']} - {datos_basicos['Nomenclatura']}")
+
+            if self.cache_fichas is not None:
+                datos_ficha = self.cache_fichas.obtener(datos_basicos['Nomenclatura'])
+                if datos_ficha is not None:
+                    FICHAS.labels('cache').inc()
+                    self.agregar_registro({**datos_basicos, **datos_ficha})
+                    continue
+
+            try:
+                datos_ficha = self.obtener_ficha(fila['ficha_id'])
+                FICHAS.labels('http').inc()
+                if self.cache_fichas is not None:
+                    self.cache_fichas.guardar(datos_basicos['Nomenclatura'], datos_ficha)
+                self.agregar_registro({**datos_basicos, **datos_ficha})
+            except Exception as e:
+                logger.warning(f"         ⚠️  No se pudo obtener la ficha: {e}")
+                FALLBACKS.labels('http').inc()
+                self.agregar_registro(registro_sin_ficha(datos_basicos))
+
+    def obtener_ficha(self, enlace_id: str) -> dict:
+        """Postback del enlace de ficha con el ViewState del listado (no cambia de página en el servidor)"""
+        if not enlace_id:
+            raise ValueError("fila sin enlace de ficha")
+
+        datos = {
+            **self.campos_formulario,
+            FORM: FORM,
+            enlace_id: enlace_id,
+            VIEW_STATE: self.view_state
+        }
+        with medir('ficha_abrir', 'http'):
+            respuesta = self.session.post(self.url_buscador, data=datos, timeout=self.timeout)
+            respuesta.raise_for_status()
+        with medir('ficha_extraer', 'http'):
+            return parsear_ficha(respuesta.text)
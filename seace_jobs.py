@@ -0,0 +1,117 @@
+
+import os
+import uuid
+import logging
+import threading
+from time import time
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class Job:
+    """Un scraping en segundo plano con su avance y su archivo resultante"""
+
+    def __init__(self, parametros: dict):
+        self.id = uuid.uuid4().hex
+        self.parametros = parametros
+        self.estado = 'en_cola'  # en_cola → ejecutando → completado | sin_resultados | error
+        self.creado = time()
+        self.iniciado = None
+        self.terminado = None
+        self.error = None
+        self.registros = 0
+        self.archivo = None
+        self.nombre_archivo = None
+        # El scraper actualiza este dict: pagina, total_paginas, filas, total_filas
+        self.progreso = {}
+
+    def a_dict(self) -> dict:
+        """Estado del job con velocidad (filas/seg) y ETA estimada"""
+        filas = self.progreso.get('filas', 0)
+        fin = self.terminado or time()
+        transcurrido = fin - self.iniciado if self.iniciado else 0
+        filas_por_seg = filas / transcurrido if transcurrido > 0 else 0
+
+        # Total estimado: exacto si el scraper lo sabe, si no por páginas vistas
+        total_filas = self.progreso.get('total_filas')
+        pagina = self.progreso.get('pagina', 0)
+        total_paginas = self.progreso.get('total_paginas', 0)
+        if not total_filas and pagina and total_paginas:
+            total_filas = round(filas / pagina * total_paginas) if filas else None
+
+        eta = None
+        if self.estado == 'ejecutando' and total_filas and filas_por_seg > 0:
+            eta = max(0, round((total_filas - filas) / filas_por_seg))
+
+        return {
+            "id": self.id,
+            "estado": self.estado,
+            "parametros": self.parametros,
+            "progreso": {
+                "pagina": pagina,
+                "total_paginas": total_paginas,
+                "filas": filas,
+                "total_filas_estimado": total_filas,
+                "filas_por_seg": round(filas_por_seg, 2),
+                "eta_seg": eta
+            },
+            "transcurrido_seg": round(transcurrido, 1),
+            "registros": self.registros,
+            # Solicitudes y bytes ahorrados por el bloqueo de recursos del navegador
+            "bloqueo": self.progreso.get('bloqueo'),
+            "error": self.error
+        }
+
+
+class GestorJobs:
+    """Pool de workers en segundo plano para scrapings largos"""
+
+    def __init__(self, max_workers: int = 2, retencion_seg: float = 3600):
+        self.retencion_seg = retencion_seg  # Cuánto se guardan los jobs terminados
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def enviar(self, funcion, parametros: dict) -> Job:
+        """Encola funcion(job) y retorna el job de inmediato"""
+        self.purgar()
+        job = Job(parametros)
+        with self._lock:
+            self._jobs[job.id] = job
+        self._executor.submit(self._ejecutar, funcion, job)
+        logger.info(f"🆕 Job {job.id} encolado")
+        return job
+
+    def _ejecutar(self, funcion, job: Job):
+        job.estado = 'ejecutando'
+        job.iniciado = time()
+        try:
+            funcion(job)
+            job.estado = 'completado' if job.archivo else 'sin_resultados'
+            logger.info(f"✅ Job {job.id} {job.estado} ({job.registros} registros)")
+        except Exception as e:
+            job.estado = 'error'
+            job.error = str(e)
+            logger.error(f"❌ Job {job.id} falló: {e}")
+        finally:
+            job.terminado = time()
+
+    def obtener(self, job_id: str):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def purgar(self):
+        """Elimina jobs terminados hace más de retencion_seg junto con sus archivos"""
+        limite = time() - self.retencion_seg
+        with self._lock:
+            vencidos = [job for job in self._jobs.values() if job.terminado and job.terminado < limite]
+            for job in vencidos:
+                del self._jobs[job.id]
+
+        for job in vencidos:
+            if job.archivo:
+                try:
+                    os.remove(job.archivo)
+                except OSError:
+                    pass
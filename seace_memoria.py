@@ -0,0 +1,139 @@
+
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Límites de memoria del contenedor: cgroup v2 y, si no, cgroup v1
+ARCHIVOS_LIMITE = ['/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory/memory.limit_in_bytes']
+ARCHIVOS_USO = ['/sys/fs/cgroup/memory.current', '/sys/fs/cgroup/memory/memory.usage_in_bytes']
+
+
+def rss_arbol(raiz: int):
+    """(RSS del proceso, RSS de sus descendientes) en bytes, leyendo /proc. None si no hay /proc"""
+    if not os.path.isdir('/proc'):
+        return None
+    pagina = os.sysconf('SC_PAGE_SIZE')
+    hijos, rss = {}, {}
+    for entrada in os.listdir('/proc'):
+        if not entrada.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entrada}/stat') as archivo:
+                campos = archivo.read().rsplit(')', 1)[1].split()
+        except (OSError, IndexError):
+            continue
+        pid = int(entrada)
+        hijos.setdefault(int(campos[1]), []).append(pid)
+        rss[pid] = int(campos[21]) * pagina
+
+    descendientes = 0
+    pendientes = list(hijos.get(raiz, []))
+    while pendientes:
+        pid = pendientes.pop()
+        descendientes += rss.get(pid, 0)
+        pendientes.extend(hijos.get(pid, []))
+    return rss.get(raiz, 0), descendientes
+
+
+def rss_navegador(driver) -> int:
+    """RSS en bytes de chromedriver y todos los procesos de Chrome que cuelgan de él (0 si no se puede medir)"""
+    try:
+        muestra = rss_arbol(driver.service.process.pid)
+    except Exception:
+        return 0
+    return sum(muestra) if muestra else 0
+
+
+def _leer_entero(rutas: list):
+    for ruta in rutas:
+        try:
+            with open(ruta) as archivo:
+                valor = archivo.read().strip()
+        except OSError:
+            continue
+        if valor.isdigit():
+            return int(valor)
+    return None
+
+
+def _meminfo(campo: str):
+    try:
+        with open('/proc/meminfo') as archivo:
+            for linea in archivo:
+                if linea.startswith(campo + ':'):
+                    return int(linea.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def memoria_total() -> int:
+    """Memoria que puede usar el contenedor, en bytes (límite del cgroup o RAM de la máquina); None si no se sabe"""
+    limite = _leer_entero(ARCHIVOS_LIMITE)
+    total = _meminfo('MemTotal')
+    # cgroup v1 sin límite reporta un número enorme; 'max' en v2 no es entero
+    if limite is not None and (total is None or limite < total):
+        return limite
+    return total
+
+
+def memoria_libre() -> int:
+    """Memoria disponible ahora mismo en bytes; None si no se sabe"""
+    limite = _leer_entero(ARCHIVOS_LIMITE)
+    uso = _leer_entero(ARCHIVOS_USO)
+    disponible = _meminfo('MemAvailable')
+    if limite is not None and uso is not None and (disponible is None or limite - uso < disponible):
+        return max(0, limite - uso)
+    return disponible
+
+
+# Heap de JS de la página (solo Chrome expone performance.memory)
+JS_HEAP = "return (window.performance && performance.memory) ? performance.memory.usedJSHeapSize : 0;"
+
+
+class VigilanteNavegador:
+    """Decide cuándo reciclar un navegador: por RSS de su árbol de procesos, heap de JS o fichas visitadas.
+
+    Medir cuesta (un barrido de /proc y una llamada a WebDriver), así que se muestrea cada `cada` fichas.
+    """
+
+    def __init__(self, max_rss_mb: float = None, max_heap_mb: float = None, max_fichas: int = None,
+                 cada: int = None):
+        self.max_rss = (max_rss_mb or float(os.environ.get('SEACE_MAX_RSS_NAVEGADOR_MB', 1500))) * 1024 * 1024
+        self.max_heap = (max_heap_mb or float(os.environ.get('SEACE_MAX_HEAP_MB', 512))) * 1024 * 1024
+        self.max_fichas = max_fichas or int(os.environ.get('SEACE_MAX_FICHAS_NAVEGADOR', 400))
+        self.cada = max(1, cada or int(os.environ.get('SEACE_VIGILANCIA_CADA', 10)))
+        self.fichas = 0
+        self._muestreado = 0  # fichas a las que se tomó la última muestra
+        self.ultima_muestra = {}
+
+    def contar_ficha(self):
+        self.fichas += 1
+
+    def revisar(self, driver):
+        """Motivo para reciclar ('fichas', 'rss' o 'heap'), o None si el navegador sigue sano"""
+        if self.fichas >= self.max_fichas:
+            return 'fichas'
+        if self.fichas - self._muestreado < self.cada:
+            return None
+        self._muestreado = self.fichas
+
+        rss = rss_navegador(driver)
+        try:
+            heap = int(driver.execute_script(JS_HEAP) or 0)
+        except Exception:
+            heap = 0
+        self.ultima_muestra = {"fichas": self.fichas, "rss_mb": round(rss / 1024 / 1024),
+                               "heap_mb": round(heap / 1024 / 1024)}
+        if rss > self.max_rss:
+            return 'rss'
+        if heap > self.max_heap:
+            return 'heap'
+        return None
+
+    def reiniciar(self):
+        """Contadores a cero para el navegador nuevo"""
+        self.fichas = 0
+        self._muestreado = 0
+        self.ultima_muestra = {}
@@ -0,0 +1,65 @@
+
+import os
+from contextlib import contextmanager
+from time import monotonic
+
+from prometheus_client import CollectorRegistry, Counter, Histogram, CONTENT_TYPE_LATEST, generate_latest
+from prometheus_client import multiprocess
+
+# Fases medidas: carga de la página, llenado del formulario, espera de resultados,
+# apertura y extracción de fichas, vuelta a la lista y paginación
+FASES = ['carga', 'busqueda', 'resultados', 'ficha_abrir', 'ficha_extraer', 'volver', 'paginacion']
+# El motor HTTP no llena el formulario en pantalla ni vuelve a la lista
+FASES_POR_MOTOR = {
+    'navegador': FASES,
+    'http': [fase for fase in FASES if fase not in ('busqueda', 'volver')]
+}
+
+DURACION_FASE = Histogram(
+    'seace_fase_segundos', 'Duración de cada fase del scraping', ['motor', 'fase'],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60)
+)
+# Series creadas de antemano: cada fase aparece en /metrics (en 0) antes del primer scraping
+for motor, fases in FASES_POR_MOTOR.items():
+    for fase in fases:
+        DURACION_FASE.labels(motor, fase)
+FILAS = Counter('seace_filas', 'Registros extraídos', ['motor'])
+FICHAS = Counter('seace_fichas', 'Fichas resueltas, por origen (navegador, http o cache)', ['origen'])
+FALLBACKS = Counter('seace_fallbacks', 'Registros que quedaron solo con datos básicos', ['motor'])
+ERRORES = Counter('seace_errores', 'Errores durante el scraping, por fase', ['motor', 'fase'])
+SOLICITUDES_BLOQUEADAS = Counter('seace_solicitudes_bloqueadas', 'Solicitudes de red bloqueadas en el navegador')
+BYTES_AHORRADOS = Counter('seace_bytes_ahorrados', 'Bytes no descargados por el bloqueo de recursos (estimado)')
+COALESCENCIA = Counter('seace_coalescencia', 'Solicitudes /scrape por cómo se resolvieron (lider, unida o cache)',
+                       ['resultado'])
+RECICLAJES = Counter('seace_reciclajes_navegador', 'Navegadores reiniciados a mitad de un scraping, por motivo',
+                     ['motivo'])
+RECHAZOS = Counter('seace_rechazos', 'Scrapings rechazados por saturación (429), por motivo', ['motivo'])
+ESPERA_ADMISION = Histogram(
+    'seace_espera_admision_segundos', 'Tiempo en cola hasta que hay memoria para el scraping',
+    buckets=(0.01, 0.5, 1, 5, 15, 30, 60, 120, 300)
+)
+
+
+@contextmanager
+def medir(fase: str, motor: str = 'navegador'):
+    """Observa la duración del bloque en el histograma de la fase (y cuenta el error si falla)"""
+    inicio = monotonic()
+    try:
+        yield
+    except Exception:
+        ERRORES.labels(motor, fase).inc()
+        raise
+    finally:
+        DURACION_FASE.labels(motor, fase).observe(monotonic() - inicio)
+
+
+def exponer() -> tuple:
+    """Métricas en formato texto de Prometheus: (contenido, content_type).
+
+    Con PROMETHEUS_MULTIPROC_DIR definido se suman las de todos los procesos (shards, workers de gunicorn).
+    """
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registro = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registro)
+        return generate_latest(registro), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
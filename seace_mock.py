@@ -0,0 +1,415 @@
+
+import sys
+import random
+import logging
+import threading
+from datetime import datetime, timedelta
+from html import escape
+from time import sleep
+from urllib.parse import parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Servidor local que imita buscadorPublico.xhtml (JSF/PrimeFaces) para medir el scraper sin tocar SEACE.
+# Sirve a los dos motores: el navegador (pestaña, fieldset, combo de año, tabla, paginador, fichas)
+# y el motor HTTP (partial-response de PrimeFaces y postback de la ficha).
+
+RUTA = '/seacebus-uiwd-pub/buscadorPublico/buscadorPublico.xhtml'
+FORM = 'tbBuscador:idFormBuscarProceso'
+TABLA = f'{FORM}:dtProcesos'
+VIEW_STATE = 'javax.faces.ViewState'
+VIEW_STATE_ID = 'j_id1:javax.faces.ViewState:0'
+VIEW_STATE_VALOR = '-1234567890123456789:9876543210987654321'
+
+ENTIDADES = ['MUNICIPALIDAD PROVINCIAL DE HUANCAYO', 'GOBIERNO REGIONAL DE CUSCO', 'ESSALUD',
+             'MINISTERIO DE SALUD', 'UNIVERSIDAD NACIONAL DE PIURA', 'PROVIAS NACIONAL']
+OBJETOS = ['Bien', 'Servicio', 'Obra', 'Consultoría de Obra']
+REGIONES = ['LIMA', 'CUSCO', 'AREQUIPA', 'PIURA', 'JUNIN', 'LORETO']
+MONEDAS = ['Soles', 'Soles', 'Soles', 'Dólares Americanos']
+OPCIONES_FILAS = [15, 30, 50, 100]  # filas por página que ofrece el paginador
+SELECCIONADO = ' selected="selected"'  # atributo de la <option> del año actual en el selector de año
+ETAPAS = ['Registro de participantes', 'Presentación de propuestas', 'Presentación de ofertas']
+
+JS_PAGINA = """
+window.jQuery = {active: 0};  // el motor de esperas mira jQuery.active, como en PrimeFaces
+var FORM = '%(form)s', TABLA = '%(tabla)s';
+function toggle(id) {
+    var e = document.getElementById(id);
+    e.style.display = e.style.display === 'none' ? '' : 'none';
+}
+function elegirAnio(anio) {
+    document.getElementById(FORM + ':anioConvocatoria_input').value = anio;
+    document.getElementById(FORM + ':anioConvocatoria_label').textContent = anio;
+    toggle(FORM + ':anioConvocatoria_panel');
+}
+function ajax(extra, alTerminar) {
+    var form = document.getElementById(FORM);
+    var datos = new URLSearchParams(new FormData(form));
+    for (var clave in extra) { datos.set(clave, extra[clave]); }
+    datos.set('javax.faces.partial.ajax', 'true');
+    jQuery.active++;
+    fetch(form.action, {method: 'POST', headers: {'Faces-Request': 'partial/ajax'}, body: datos})
+        .then(function (r) { return r.text(); })
+        .then(function (texto) {
+            var xml = new DOMParser().parseFromString(texto, 'text/xml');
+            var updates = {};
+            xml.querySelectorAll('update').forEach(function (u) { updates[u.getAttribute('id')] = u.textContent; });
+            alTerminar(updates);
+        })
+        .finally(function () { jQuery.active--; });
+}
+function buscar() {
+    ajax({'javax.faces.source': FORM + ':btnBuscarSelToken'}, function (u) {
+        document.getElementById('resultados').innerHTML = u[FORM];
+        document.getElementById(TABLA + '_first').value = '0';
+    });
+}
+function irPagina(pagina) {
+    var filas = parseInt(document.getElementById(TABLA + '_rows').value, 10);
+    var primera = (pagina - 1) * filas, extra = {'javax.faces.source': TABLA};
+    extra[TABLA + '_pagination'] = 'true';
+    extra[TABLA + '_first'] = primera;
+    extra[TABLA + '_rows'] = filas;
+    ajax(extra, function (u) {
+        document.getElementById(TABLA + '_data').innerHTML = u[TABLA];
+        document.getElementById(TABLA + '_paginator').innerHTML = u[TABLA + '_paginator'];
+        document.getElementById(TABLA + '_first').value = primera;
+    });
+}
+// Widget del paginador con la API de PrimeFaces que usa el scraper (setPage, setRowsPerPage...)
+var paginadorMock = {
+    cfg: {
+        get rows() { return parseInt(document.getElementById(TABLA + '_rows').value, 10); },
+        get rowCount() {
+            var reporte = document.querySelector('.ui-paginator-current');
+            return reporte ? parseInt(reporte.getAttribute('data-registros'), 10) : 0;
+        }
+    },
+    getPageCount: function () { return Math.max(1, Math.ceil(this.cfg.rowCount / this.cfg.rows)); },
+    getCurrentPage: function () {
+        return Math.floor(parseInt(document.getElementById(TABLA + '_first').value, 10) / this.cfg.rows);
+    },
+    setPage: function (pagina) { irPagina(pagina + 1); },
+    setRowsPerPage: function (filas) {
+        document.getElementById(TABLA + '_rows').value = filas;
+        irPagina(1);
+    }
+};
+window.PrimeFaces = {widgets: {widget_dtProcesos: {id: TABLA, paginator: paginadorMock}}};
+function abrirFicha(id) {
+    // commandLink: postback completo del formulario con el id del enlace
+    var form = document.getElementById(FORM), campo = document.createElement('input');
+    campo.type = 'hidden';
+    campo.name = id;
+    campo.value = id;
+    form.appendChild(campo);
+    form.submit();
+    return false;
+}
+""" % {'form': FORM, 'tabla': TABLA}
+
+
+class DatosMock:
+    """Procesos ficticios pero deterministas: los mismos para la misma fecha e índice"""
+
+    def __init__(self, filas_por_dia: int = 30):
+        self.filas_por_dia = filas_por_dia
+
+    def total(self, fecha_inicio: datetime, fecha_fin: datetime) -> int:
+        if fecha_inicio is None or fecha_fin is None or fecha_fin < fecha_inicio:
+            return 0
+        return ((fecha_fin - fecha_inicio).days + 1) * self.filas_por_dia
+
+    def proceso(self, fecha_inicio: datetime, indice: int) -> dict:
+        dia = fecha_inicio + timedelta(days=indice // self.filas_por_dia)
+        k = indice % self.filas_por_dia
+        rnd = random.Random(dia.toordinal() * 100000 + k)
+        region = rnd.choice(REGIONES)
+        inicio_etapa = dia + timedelta(days=rnd.randint(1, 5))
+        return {
+            'numero': indice + 1,
+            'entidad': rnd.choice(ENTIDADES),
+            'fecha': f"{dia.strftime('%d/%m/%Y')} {rnd.randint(8, 18):02d}:{rnd.randint(0, 59):02d}",
+            'nomenclatura': f"AS-SM-{k + 1}-{dia.strftime('%Y%m%d')}-MOCK-1",
+            'objeto': rnd.choice(OBJETOS),
+            'descripcion': f"ADQUISICION DE INSUMOS LOTE {k + 1}",
+            'valor': f"{rnd.randint(1000, 9999999):,}.{rnd.randint(0, 99):02d}",
+            'moneda': rnd.choice(MONEDAS),
+            'etapa': ETAPAS[k % len(ETAPAS)],
+            'etapa_inicio': inicio_etapa.strftime('%d/%m/%Y 00:01'),
+            'etapa_fin': (inicio_etapa + timedelta(days=7)).strftime('%d/%m/%Y 23:59'),
+            'direccion': f"AV. PRINCIPAL {rnd.randint(100, 999)} ({region} - {region} - CENTRO)",
+            'cubso': str(rnd.randint(10000000, 99999999))
+        }
+
+
+def parsear_fecha(texto: str):
+    try:
+        return datetime.strptime(texto, '%d/%m/%Y')
+    except (TypeError, ValueError):
+        return None
+
+
+def html_filas(datos: DatosMock, fecha_inicio, fecha_fin, primera: int, filas: int) -> str:
+    total = datos.total(fecha_inicio, fecha_fin)
+    if not total:
+        return '<tr class="ui-datatable-empty-message"><td colspan="13">No se encontraron Datos</td></tr>'
+
+    partes = []
+    for indice in range(primera, min(total, primera + filas)):
+        p = datos.proceso(fecha_inicio, indice)
+        celdas = [str(p['numero']), p['entidad'], p['fecha'], p['nomenclatura'], '', p['objeto'],
+                  p['descripcion'], '', '', p['valor'], p['moneda'], 'Seace 3']
+        partes.append(
+            f'<tr data-ri="{indice}" class="ui-widget-content">'
+            + ''.join(f'<td>{escape(celda)}</td>' for celda in celdas)
+            + f'<td><a id="{TABLA}:{indice}:lnkFicha" href="#" onclick="return abrirFicha(this.id)">'
+              f'<img id="{TABLA}:{indice}:grafichaSel" src="data:," alt="Ficha"/></a></td></tr>'
+        )
+    return ''.join(partes)
+
+
+def html_paginador(total: int, primera: int, filas: int, enlaces: int = 10) -> str:
+    """Paginador de PrimeFaces: ventana de `enlaces` páginas alrededor de la actual y filas por página"""
+    paginas = max(1, -(-total // filas))
+    actual = primera // filas
+    inicio = max(0, min(actual - enlaces // 2, paginas - enlaces))
+    fin = min(paginas, inicio + enlaces)
+
+    partes = [f'<span class="ui-paginator-current" data-registros="{total}">Página {actual + 1} de {paginas}</span>',
+              f'<a class="ui-paginator-prev ui-state-default ui-corner-all'
+              f'{" ui-state-disabled" if actual == 0 else ""}" onclick="irPagina({actual})">&lt;</a>',
+              '<span class="ui-paginator-pages">']
+    for pagina in range(inicio, fin):
+        clase = 'ui-paginator-page ui-state-default ui-state-active ui-corner-all' if pagina == actual \
+            else 'ui-paginator-page ui-state-default ui-corner-all'
+        partes.append(f'<span class="{clase}" onclick="irPagina({pagina + 1})">{pagina + 1}</span>')
+    partes.append('</span>')
+    partes.append(f'<a class="ui-paginator-next ui-state-default ui-corner-all'
+                  f'{" ui-state-disabled" if actual >= paginas - 1 else ""}" onclick="irPagina({actual + 2})">&gt;</a>')
+    partes.append('<select class="ui-paginator-rpp-options" onchange="paginadorMock.setRowsPerPage(parseInt(this.value, 10))">')
+    for opcion in sorted({*OPCIONES_FILAS, filas}):
+        partes.append(f'<option value="{opcion}"{" selected" if opcion == filas else ""}>{opcion}</option>')
+    partes.append('</select>')
+    return ''.join(partes)
+
+
+def html_resultados(datos: DatosMock, fecha_inicio, fecha_fin, primera: int, filas: int) -> str:
+    total = datos.total(fecha_inicio, fecha_fin)
+    return (
+        f'<div id="{TABLA}" class="ui-datatable"><table><thead><tr>'
+        '<th>N°</th><th>Nombre o Sigla de la Entidad</th><th>Fecha y Hora de Publicacion</th>'
+        '<th>Nomenclatura</th><th>Reiniciado Desde</th><th>Objeto de Contratación</th>'
+        '<th>Descripción de Objeto</th><th>Código SNIP</th><th>Código Unico de Inversion</th>'
+        '<th>VR / VE / Cuantía de la contratación</th><th>Moneda</th><th>Versión SEACE</th><th>Acciones</th>'
+        f'</tr></thead><tbody id="{TABLA}_data" class="ui-datatable-data">'
+        f'{html_filas(datos, fecha_inicio, fecha_fin, primera, filas)}</tbody></table>'
+        f'<div id="{TABLA}_paginator" class="ui-paginator">{html_paginador(total, primera, filas)}</div></div>'
+    )
+
+
+def campos_ocultos(campos: dict) -> str:
+    return ''.join(
+        f'<input type="hidden" id="{escape(nombre)}" name="{escape(nombre)}" value="{escape(valor)}"/>'
+        for nombre, valor in campos.items()
+    )
+
+
+class ServidorMock:
+    """Servidor HTTP local con latencia configurable por respuesta"""
+
+    def __init__(self, puerto: int = 0, filas_por_dia: int = 30, latencia: float = 0.05,
+                 filas_por_pagina: int = 15):
+        self.datos = DatosMock(filas_por_dia)
+        self.latencia = latencia
+        self.filas_por_pagina = filas_por_pagina
+        self.solicitudes = 0
+        self._servidor = ThreadingHTTPServer(('127.0.0.1', puerto), self._manejador())
+        self._servidor.daemon_threads = True
+        self._hilo = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._servidor.server_port}{RUTA}"
+
+    def iniciar(self) -> str:
+        """Atiende en un hilo aparte y retorna la URL del buscador"""
+        self._hilo = threading.Thread(target=self._servidor.serve_forever, daemon=True)
+        self._hilo.start()
+        logger.info(f"🧪 Mock de SEACE en {self.url} ({self.datos.filas_por_dia} filas/día, "
+                    f"latencia {self.latencia}s)")
+        return self.url
+
+    def cerrar(self):
+        self._servidor.shutdown()
+        self._servidor.server_close()
+
+    def _manejador(self):
+        mock = self
+
+        class Manejador(BaseHTTPRequestHandler):
+            def log_message(self, formato, *args):
+                pass
+
+            def do_GET(self):
+                mock._esperar()
+                if self.path.split('?')[0] != RUTA:
+                    self.send_error(404)
+                    return
+                self._responder(mock.pagina_buscador({}), 'text/html')
+
+            def do_POST(self):
+                mock._esperar()
+                largo = int(self.headers.get('Content-Length') or 0)
+                campos = {clave: valores[0] for clave, valores in
+                          parse_qs(self.rfile.read(largo).decode('utf-8'), keep_blank_values=True).items()}
+
+                if self.headers.get('Faces-Request') == 'partial/ajax':
+                    self._responder(mock.respuesta_ajax(campos), 'text/xml')
+                    return
+
+                enlace = next((clave for clave in campos if clave.endswith(':lnkFicha')), None)
+                if enlace:
+                    self._responder(mock.pagina_ficha(campos, int(enlace.split(':')[-2])), 'text/html')
+                else:
+                    # Volver (u otro postback): el listado tal como estaba
+                    self._responder(mock.pagina_buscador(campos, con_resultados=True), 'text/html')
+
+            def _responder(self, contenido: str, tipo: str):
+                cuerpo = contenido.encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', f'{tipo}; charset=UTF-8')
+                self.send_header('Content-Length', str(len(cuerpo)))
+                self.end_headers()
+                self.wfile.write(cuerpo)
+
+        return Manejador
+
+    def _esperar(self):
+        self.solicitudes += 1
+        if self.latencia:
+            sleep(self.latencia)
+
+    def _busqueda(self, campos: dict) -> tuple:
+        fecha_inicio = parsear_fecha(campos.get(f'{FORM}:dfechaInicio_input'))
+        fecha_fin = parsear_fecha(campos.get(f'{FORM}:dfechaFin_input'))
+        primera = int(campos.get(f'{TABLA}_first') or 0)
+        filas = int(campos.get(f'{TABLA}_rows') or self.filas_por_pagina)
+        return fecha_inicio, fecha_fin, primera, filas
+
+    def respuesta_ajax(self, campos: dict) -> str:
+        """partial-response de PrimeFaces para la búsqueda o la paginación"""
+        fecha_inicio, fecha_fin, primera, filas = self._busqueda(campos)
+        if campos.get(f'{TABLA}_pagination') == 'true':
+            updates = {
+                TABLA: html_filas(self.datos, fecha_inicio, fecha_fin, primera, filas),
+                f'{TABLA}_paginator': html_paginador(self.datos.total(fecha_inicio, fecha_fin), primera, filas)
+            }
+        else:
+            updates = {FORM: html_resultados(self.datos, fecha_inicio, fecha_fin, 0, filas)}
+        updates[VIEW_STATE_ID] = VIEW_STATE_VALOR
+
+        return (
+            "<?xml version='1.0' encoding='UTF-8'?><partial-response><changes>"
+            + ''.join(f'<update id="{escape(id_update)}"><![CDATA[{contenido}]]></update>'
+                      for id_update, contenido in updates.items())
+            + '</changes></partial-response>'
+        )
+
+    def pagina_buscador(self, campos: dict, con_resultados: bool = False) -> str:
+        fecha_inicio, fecha_fin, primera, filas = self._busqueda(campos)
+        anio = campos.get(f'{FORM}:anioConvocatoria_input') or str(datetime.now().year)
+        anios = ''.join(
+            f'<li data-label="{a}" onclick="elegirAnio(\'{a}\')">{a}</li>'
+            for a in range(2018, datetime.now().year + 2)
+        )
+        # selectOneMenu de PrimeFaces: el valor viaja en un <select> oculto, no en un <input>
+        opciones_anio = ''.join(
+            f'<option value="{a}"{SELECCIONADO if str(a) == anio else ""}>{a}</option>'
+            for a in range(2018, datetime.now().year + 2)
+        )
+        resultados = html_resultados(self.datos, fecha_inicio, fecha_fin, primera, filas) if con_resultados else ''
+
+        return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"/><title>Buscador Público (mock)</title><script>{JS_PAGINA}</script></head>
+<body><div id="tbBuscador"><ul>
+<li><a href="#tbBuscador:tab0">Buscador de Procedimientos de Selección</a></li>
+<li><a href="#tbBuscador:tab1">Buscador de Procedimientos de Selección (Versión 3)</a></li></ul>
+<form id="{FORM}" name="{FORM}" method="post" action="{RUTA}">
+<input type="hidden" name="{FORM}" value="{FORM}"/>
+<fieldset><legend onclick="toggle('avanzada')">Búsqueda Avanzada</legend><div id="avanzada" style="display:none">
+<div id="{FORM}:anioConvocatoria" class="ui-selectonemenu"><div class="ui-helper-hidden-accessible">
+<select id="{FORM}:anioConvocatoria_input" name="{FORM}:anioConvocatoria_input" tabindex="-1">{opciones_anio}</select></div>
+<label id="{FORM}:anioConvocatoria_label" onclick="toggle('{FORM}:anioConvocatoria_panel')">{escape(anio)}</label></div>
+<div id="{FORM}:anioConvocatoria_panel" style="display:none"><div><ul>{anios}</ul></div></div>
+<input type="text" id="{FORM}:dfechaInicio_input" name="{FORM}:dfechaInicio_input"
+ value="{escape(campos.get(f'{FORM}:dfechaInicio_input', ''))}"/>
+<input type="text" id="{FORM}:dfechaFin_input" name="{FORM}:dfechaFin_input"
+ value="{escape(campos.get(f'{FORM}:dfechaFin_input', ''))}"/>
+</div></fieldset>
+<button type="button" id="{FORM}:btnBuscarSelToken" name="{FORM}:btnBuscarSelToken" onclick="buscar()">Buscar</button>
+<input type="hidden" id="{TABLA}_first" name="{TABLA}_first" value="{primera}"/>
+<input type="hidden" id="{TABLA}_rows" name="{TABLA}_rows" value="{filas}"/>
+<div id="resultados">{resultados}</div>
+<input type="hidden" id="{VIEW_STATE_ID}" name="{VIEW_STATE}" value="{VIEW_STATE_VALOR}"/>
+</form></div></body></html>"""
+
+    def pagina_ficha(self, campos: dict, indice: int) -> str:
+        fecha_inicio, fecha_fin, primera, filas = self._busqueda(campos)
+        if indice >= self.datos.total(fecha_inicio, fecha_fin):
+            return '<html><body><p>Ficha no encontrada</p></body></html>'
+        p = self.datos.proceso(fecha_inicio, indice)
+
+        # El formulario conserva la búsqueda para que "Volver" regrese al mismo listado
+        estado = {
+            FORM: FORM,
+            f'{FORM}:anioConvocatoria_input': campos.get(f'{FORM}:anioConvocatoria_input', ''),
+            f'{FORM}:dfechaInicio_input': campos.get(f'{FORM}:dfechaInicio_input', ''),
+            f'{FORM}:dfechaFin_input': campos.get(f'{FORM}:dfechaFin_input', ''),
+            f'{TABLA}_first': str(primera),
+            f'{TABLA}_rows': str(filas),
+            VIEW_STATE: VIEW_STATE_VALOR
+        }
+        return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"/><title>Ficha de Selección (mock)</title><script>{JS_PAGINA}</script></head>
+<body><form id="{FORM}" name="{FORM}" method="post" action="{RUTA}">{campos_ocultos(estado)}
+<fieldset><legend>Información general</legend><table>
+<tr><td><span>Nomenclatura:</span></td><td>{escape(p['nomenclatura'])}</td></tr>
+<tr><td><span>Entidad:</span></td><td>{escape(p['entidad'])}</td></tr>
+<tr><td><span>Direccion Legal:</span></td><td>{escape(p['direccion'])}</td></tr>
+</table></fieldset>
+<fieldset><legend>Cronograma</legend><table>
+<thead><tr><th>Etapa</th><th>Fecha Inicio</th><th>Fecha Fin</th></tr></thead><tbody>
+<tr><td>Convocatoria</td><td>{p['fecha'][:10]}</td><td>{p['fecha'][:10]}</td></tr>
+<tr><td>{escape(p['etapa'])}</td><td>{p['etapa_inicio']}</td><td>{p['etapa_fin']}</td></tr>
+<tr><td>Otorgamiento de la Buena Pro</td><td>{p['etapa_fin'][:10]}</td><td>{p['etapa_fin'][:10]}</td></tr>
+</tbody></table></fieldset>
+<fieldset><legend onclick="toggle('items')">Ver listado de ítem</legend><div id="items" style="display:none">
+<table><tr><td><span>Codigo CUBSO:</span></td><td>{p['cubso']}</td></tr>
+<tr><td><span>Descripcion:</span></td><td>{escape(p['descripcion'])}</td></tr></table></div></fieldset>
+<button type="submit" id="{FORM}:btnVolver" name="{FORM}:btnVolver" value="Volver">Volver</button>
+</form></body></html>"""
+
+
+def main():
+    # python seace_mock.py [--puerto=8090] [--filas-por-dia=30] [--latencia=0.05] [--filas-por-pagina=15]
+    opciones = {'puerto': 8090, 'filas-por-dia': 30, 'latencia': 0.05, 'filas-por-pagina': 15}
+    for arg in sys.argv[1:]:
+        nombre, _, valor = arg.lstrip('-').partition('=')
+        if nombre in opciones:
+            opciones[nombre] = type(opciones[nombre])(valor)
+
+    servidor = ServidorMock(puerto=opciones['puerto'], filas_por_dia=opciones['filas-por-dia'],
+                            latencia=opciones['latencia'], filas_por_pagina=opciones['filas-por-pagina'])
+    servidor.iniciar()
+    print(f"\n   SEACE_URL={servidor.url}\n")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        servidor.cerrar()
+
+
+if __name__ == '__main__':
+    main()
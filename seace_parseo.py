@@ -0,0 +1,115 @@
+
+import re
+
+from lxml import html
+
+# Parseo de lo que devuelve SEACE (listado y ficha), compartido por el motor con navegador y el HTTP.
+# No importa Selenium ni requests: cada motor lo carga sin arrastrar las dependencias del otro.
+
+URL_BUSCADOR = "https://prod2.seace.gob.pe/seacebus-uiwd-pub/buscadorPublico/buscadorPublico.xhtml"
+FECHA = re.compile(r'\d{2}/\d{2}/\d{4}')
+
+
+# Etapas del cronograma de donde salen Fecha de Inicio/Fin, en orden de preferencia
+ETAPAS_CRONOGRAMA = [
+    "Registro de participantes",
+    "Presentación de propuestas",
+    "Presentación de ofertas"
+]
+
+
+def datos_basicos_desde_celdas(texto_celdas: list) -> dict:
+    """Arma los datos básicos de un proceso a partir del texto de las celdas de la tabla"""
+    return {
+        'N°': texto_celdas[0] if len(texto_celdas) > 0 else '',
+        'Entidad Solicitante': texto_celdas[1] if len(texto_celdas) > 1 else '',
+        'Fecha': texto_celdas[2] if len(texto_celdas) > 2 else '',
+        'Nomenclatura': texto_celdas[3] if len(texto_celdas) > 3 else '',
+        'Objeto': texto_celdas[5] if len(texto_celdas) > 5 else '',
+        'Descripción del Requerimiento': texto_celdas[6] if len(texto_celdas) > 6 else '',
+        'Valor Referencial': texto_celdas[9] if len(texto_celdas) > 9 else '',
+        'Moneda': texto_celdas[10] if len(texto_celdas) > 10 else ''
+    }
+
+
+def extraer_region(direccion_text: str) -> str:
+    """Saca la región de la Dirección Legal, p. ej. "AV. X 123 (LIMA - LIMA - MIRAFLORES)" → LIMA"""
+    match = re.search(r'\(([^-]+)-', direccion_text)
+    if match:
+        return match.group(1).strip().upper()
+    return ''
+
+
+def elegir_etapa(cronograma: list) -> dict:
+    """Primera etapa de ETAPAS_CRONOGRAMA presente en el cronograma ({etapa, inicio, fin}), o {} si no hay"""
+    for etapa in ETAPAS_CRONOGRAMA:
+        for fila in cronograma:
+            if etapa in fila.get('etapa', ''):
+                return fila
+    return {}
+
+
+def datos_desde_ficha(ficha: dict) -> dict:
+    """Datos de ficha del registro a partir de lo leído en la ficha (cronograma, dirección e ítems)"""
+    cronograma = ficha.get('cronograma') or []
+    etapa = elegir_etapa(cronograma)
+    cubsos = [item['Codigo CUBSO'] for item in ficha.get('items') or [] if item.get('Codigo CUBSO')]
+    return {
+        'Fecha de Inicio': etapa.get('inicio', ''),
+        'Fecha de Fin': etapa.get('fin', ''),
+        'Region': extraer_region(ficha.get('direccion') or ''),
+        'CUBSO': cubsos[0] if cubsos else '',
+        'Cronograma': cronograma
+    }
+
+
+def registro_sin_ficha(datos_basicos: dict) -> dict:
+    """Registro con solo datos básicos (cuando no se pudo entrar a la ficha)"""
+    return {
+        **datos_basicos,
+        'Fecha de Inicio': '',
+        'Fecha de Fin': '',
+        'Region': '',
+        'CUBSO': ''
+    }
+
+
+def texto(nodo) -> str:
+    """Texto de un nodo lxml con los espacios normalizados"""
+    return ' '.join(nodo.text_content().split())
+
+
+def leer_ficha(contenido: str) -> dict:
+    """Lo mismo que JS_EXTRAER_FICHA pero sobre el HTML: {cronograma, direccion, items}"""
+    doc = html.fromstring(contenido)
+
+    # 1. Cronograma completo: filas con fecha en la tabla de etapas
+    tablas = doc.xpath('//table[.//th[normalize-space()="Etapa"]]') or [doc]
+    cronograma = []
+    for tabla in tablas:
+        for fila in tabla.xpath('.//tr'):
+            celdas = fila.xpath('./td')
+            if len(celdas) >= 3 and (FECHA.search(texto(celdas[1])) or FECHA.search(texto(celdas[2]))):
+                cronograma.append({'etapa': texto(celdas[0]), 'inicio': texto(celdas[1]), 'fin': texto(celdas[2])})
+
+    # 2. Dirección Legal
+    direccion = doc.xpath('//span[starts-with(normalize-space(), "Direccion Legal:")]'
+                          '/ancestor::td[1]/following-sibling::td[1]')
+
+    # 3. Ítems (el listado viene en el HTML aunque esté colapsado)
+    items = []
+    for tabla in doc.xpath('//span[starts-with(normalize-space(), "Codigo CUBSO:")]/ancestor::table[1]'):
+        item = {}
+        for fila in tabla.xpath('.//tr'):
+            celdas = fila.xpath('./td')
+            nombre = texto(celdas[0].xpath('.//span')[0]) if len(celdas) >= 2 and celdas[0].xpath('.//span') else ''
+            if nombre.endswith(':'):
+                item[nombre[:-1]] = texto(celdas[1])
+        items.append(item)
+
+    return {'cronograma': cronograma, 'direccion': texto(direccion[0]) if direccion else '', 'items': items}
+
+
+def parsear_ficha(contenido: str) -> dict:
+    """Extrae cronograma, región y CUBSO del HTML de una ficha de selección"""
+    return datos_desde_ficha(leer_ficha(contenido))
@@ -0,0 +1,165 @@
+
+import logging
+import threading
+from contextlib import contextmanager
+from queue import Queue, Empty
+
+from seace_scraper import crear_driver
+
+logger = logging.getLogger(__name__)
+
+
+class PoolDrivers:
+    """Pool de navegadores Chrome ya iniciados, compartido entre solicitudes"""
+
+    def __init__(self, tamano: int = 2, max_usos: int = 20, headless: bool = True):
+        self.tamano = max(1, tamano)
+        self.max_usos = max_usos  # Reciclar el driver después de N trabajos
+        self.headless = headless
+
+        self._libres = Queue()
+        self._usos = {}  # id(driver) -> número de trabajos hechos
+        self._creados = 0
+        self._lock = threading.Lock()
+        self._cerrado = False
+
+    def iniciar(self):
+        """Pre-inicia los navegadores hasta completar el tamaño del pool"""
+        logger.info(f"🏊 Calentando pool de {self.tamano} navegadores...")
+        while True:
+            with self._lock:
+                if self._cerrado or self._creados >= self.tamano:
+                    break
+                self._creados += 1
+            self._crear_y_encolar()
+        logger.info(f"✅ Pool listo ({self._libres.qsize()} libres)")
+
+    def _crear_y_encolar(self):
+        """Crea un driver y lo deja libre en el pool (el cupo ya está reservado)"""
+        try:
+            driver = crear_driver(self.headless)
+        except Exception as e:
+            logger.error(f"❌ No se pudo crear navegador para el pool: {e}")
+            with self._lock:
+                self._creados -= 1
+            return
+
+        with self._lock:
+            self._usos[id(driver)] = 0
+        self._libres.put(driver)
+
+    def obtener(self, timeout: float = 300):
+        """Saca un driver sano del pool (checkout)"""
+        while True:
+            try:
+                driver = self._libres.get_nowait()
+            except Empty:
+                # Si aún hay cupo, crear uno nuevo; si no, esperar a que devuelvan uno
+                with self._lock:
+                    hay_cupo = self._creados < self.tamano
+                    if hay_cupo:
+                        self._creados += 1
+                if hay_cupo:
+                    self._crear_y_encolar()
+                try:
+                    driver = self._libres.get(timeout=timeout)
+                except Empty:
+                    raise TimeoutError("No hay navegadores libres en el pool")
+
+            if self._esta_sano(driver):
+                return driver
+
+            logger.warning("⚠️  Navegador del pool no responde, reemplazando...")
+            self._descartar(driver)
+
+    def devolver(self, driver, descartar: bool = False):
+        """Devuelve un driver al pool (checkin), reciclándolo si hace falta"""
+        with self._lock:
+            usos = self._usos.get(id(driver), 0) + 1
+            self._usos[id(driver)] = usos
+
+        if self._cerrado:
+            self._descartar(driver, reponer=False)
+            return
+
+        if descartar or usos >= self.max_usos or not self._resetear_sesion(driver):
+            logger.info(f"♻️  Reciclando navegador ({usos} usos)")
+            self._descartar(driver)
+            return
+
+        self._libres.put(driver)
+
+    @contextmanager
+    def driver(self, timeout: float = 300):
+        """Uso: with pool.driver() as driver: ..."""
+        driver = self.obtener(timeout)
+        descartar = False
+        try:
+            yield driver
+        except Exception:
+            # Tras un error el navegador puede quedar en un estado raro
+            descartar = True
+            raise
+        finally:
+            self.devolver(driver, descartar=descartar)
+
+    def _esta_sano(self, driver) -> bool:
+        """Health check: el navegador responde a un script trivial"""
+        try:
+            return driver.execute_script("return 1;") == 1
+        except Exception:
+            return False
+
+    def _resetear_sesion(self, driver) -> bool:
+        """Deja el navegador limpio para el siguiente trabajo"""
+        try:
+            # Cerrar pestañas extra
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+
+            try:
+                driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+            except Exception:
+                pass
+            driver.delete_all_cookies()
+            driver.get("about:blank")
+            return True
+        except Exception as e:
+            logger.warning(f"⚠️  No se pudo resetear la sesión: {e}")
+            return False
+
+    def _descartar(self, driver, reponer: bool = True):
+        """Cierra un driver y, si corresponde, crea su reemplazo en segundo plano"""
+        with self._lock:
+            self._usos.pop(id(driver), None)
+            self._creados -= 1
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+        if reponer and not self._cerrado:
+            with self._lock:
+                self._creados += 1
+            threading.Thread(target=self._crear_y_encolar, daemon=True).start()
+
+    def estado(self) -> dict:
+        return {
+            "tamano": self.tamano,
+            "creados": self._creados,
+            "libres": self._libres.qsize(),
+            "max_usos": self.max_usos
+        }
+
+    def cerrar(self):
+        """Cierra todos los navegadores libres del pool"""
+        self._cerrado = True
+        while True:
+            try:
+                driver = self._libres.get_nowait()
+            except Empty:
+                break
+            self._descartar(driver, reponer=False)
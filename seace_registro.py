@@ -0,0 +1,175 @@
+
+import re
+import json
+from datetime import datetime
+from decimal import Decimal, InvalidOperation
+
+# Nombre de la moneda en SEACE → código ISO 4217
+MONEDAS = {
+    'SOLES': 'PEN',
+    'NUEVOS SOLES': 'PEN',
+    'S/': 'PEN',
+    'S/.': 'PEN',
+    'PEN': 'PEN',
+    'DOLARES': 'USD',
+    'DOLARES AMERICANOS': 'USD',
+    'US$': 'USD',
+    'USD': 'USD',
+    'EUROS': 'EUR',
+    'EURO': 'EUR',
+    'EUR': 'EUR'
+}
+
+FORMATOS_FECHA = ['%d/%m/%Y %H:%M', '%d/%m/%Y %H:%M:%S', '%d/%m/%Y']
+
+
+def parsear_monto(texto) -> Decimal:
+    """'1,234,567.89' → Decimal('1234567.89') (None si no es un monto, p. ej. 'Reservado')"""
+    if texto is None or texto == '':
+        return None
+    if isinstance(texto, Decimal):
+        return texto
+    try:
+        return Decimal(re.sub(r'[^\d.\-]', '', str(texto))).quantize(Decimal('0.01'))
+    except InvalidOperation:
+        return None
+
+
+def parsear_fecha(texto) -> datetime:
+    """'25/01/2026 10:30' o ISO → datetime (None si no se reconoce)"""
+    if not texto:
+        return None
+    if isinstance(texto, datetime):
+        return texto
+    texto = str(texto).strip()
+    for formato in FORMATOS_FECHA:
+        try:
+            return datetime.strptime(texto, formato)
+        except ValueError:
+            continue
+    try:
+        return datetime.fromisoformat(texto)
+    except ValueError:
+        return None
+
+
+def parsear_cronograma(valor) -> list:
+    """Cronograma de la ficha como [{etapa, inicio, fin}] con fechas datetime; acepta la lista o su JSON"""
+    if not valor:
+        return []
+    if isinstance(valor, str):
+        try:
+            valor = json.loads(valor)
+        except ValueError:
+            return []
+    return [
+        {'etapa': fila.get('etapa') or '', 'inicio': parsear_fecha(fila.get('inicio')),
+         'fin': parsear_fecha(fila.get('fin'))}
+        for fila in valor if isinstance(fila, dict)
+    ]
+
+
+def normalizar_moneda(texto) -> str:
+    """'Soles' → 'PEN', 'Dólares Americanos' → 'USD'; lo desconocido queda en mayúsculas"""
+    if not texto:
+        return ''
+    clave = str(texto).strip().upper().replace('Ó', 'O')
+    return MONEDAS.get(clave, clave)
+
+
+def parsear_numero(texto) -> int:
+    try:
+        return int(texto)
+    except (TypeError, ValueError):
+        return None
+
+
+class Registro:
+    """Un proceso extraído, con campos tipados (monto Decimal, fechas datetime, moneda ISO)"""
+
+    __slots__ = ('numero', 'fecha', 'entidad', 'descripcion', 'nomenclatura', 'objeto', 'region',
+                 'valor_referencial', 'moneda', 'cubso', 'fecha_inicio', 'fecha_fin', 'cronograma')
+
+    # Columna de salida → atributo (en el orden de los archivos)
+    COLUMNAS = {
+        'N°': 'numero',
+        'Fecha': 'fecha',
+        'Entidad Solicitante': 'entidad',
+        'Descripción del Requerimiento': 'descripcion',
+        'Nomenclatura': 'nomenclatura',
+        'Objeto': 'objeto',
+        'Region': 'region',
+        'Valor Referencial': 'valor_referencial',
+        'Moneda': 'moneda',
+        'CUBSO': 'cubso',
+        'Fecha de Inicio': 'fecha_inicio',
+        'Fecha de Fin': 'fecha_fin'
+    }
+
+    def __init__(self, numero: int = None, fecha: datetime = None, entidad: str = '', descripcion: str = '',
+                 nomenclatura: str = '', objeto: str = '', region: str = '', valor_referencial: Decimal = None,
+                 moneda: str = '', cubso: str = '', fecha_inicio: datetime = None, fecha_fin: datetime = None,
+                 cronograma: list = None):
+        self.numero = numero
+        self.fecha = fecha
+        self.entidad = entidad
+        self.descripcion = descripcion
+        self.nomenclatura = nomenclatura
+        self.objeto = objeto
+        self.region = region
+        self.valor_referencial = valor_referencial
+        self.moneda = moneda
+        self.cubso = cubso
+        self.fecha_inicio = fecha_inicio
+        self.fecha_fin = fecha_fin
+        # Todas las etapas de la ficha (no es columna de los archivos tabulares)
+        self.cronograma = cronograma or []
+
+    @classmethod
+    def desde_dict(cls, datos: dict) -> 'Registro':
+        """Arma el registro desde el texto de SEACE (o desde a_dict) con las columnas como claves"""
+        return cls(
+            numero=parsear_numero(datos.get('N°')),
+            fecha=parsear_fecha(datos.get('Fecha')),
+            entidad=datos.get('Entidad Solicitante') or '',
+            descripcion=datos.get('Descripción del Requerimiento') or '',
+            nomenclatura=datos.get('Nomenclatura') or '',
+            objeto=datos.get('Objeto') or '',
+            region=datos.get('Region') or '',
+            valor_referencial=parsear_monto(datos.get('Valor Referencial')),
+            moneda=normalizar_moneda(datos.get('Moneda')),
+            cubso=datos.get('CUBSO') or '',
+            fecha_inicio=parsear_fecha(datos.get('Fecha de Inicio')),
+            fecha_fin=parsear_fecha(datos.get('Fecha de Fin')),
+            cronograma=parsear_cronograma(datos.get('Cronograma'))
+        )
+
+    def a_fila(self) -> list:
+        """Valores tipados en el orden de las columnas (para XLSX/Parquet)"""
+        return [getattr(self, atributo) for atributo in self.COLUMNAS.values()]
+
+    def a_dict(self, con_cronograma: bool = False) -> dict:
+        """Columnas → valores serializables en JSON (fechas ISO, monto como texto exacto).
+
+        con_cronograma agrega 'Cronograma' con todas las etapas (para JSON; los archivos tabulares no lo llevan).
+        """
+        datos = {columna: _a_texto(getattr(self, atributo)) for columna, atributo in self.COLUMNAS.items()}
+        if con_cronograma:
+            datos['Cronograma'] = self.cronograma_a_json()
+        return datos
+
+    def cronograma_a_json(self) -> list:
+        return [{clave: _a_texto(valor) for clave, valor in etapa.items()} for etapa in self.cronograma]
+
+    def __repr__(self):
+        return f"Registro({self.numero}, {self.nomenclatura!r})"
+
+
+def _a_texto(valor):
+    if valor is None:
+        return ''
+    if isinstance(valor, datetime):
+        return valor.isoformat(timespec='minutes')
+    if isinstance(valor, (Decimal, int)):
+        return str(valor)
+    return valor
@@ -1,139 +1,461 @@
 
+import os
 import sys
 import logging
-from datetime import datetime
-from time import sleep
-import re
+from datetime import datetime, timedelta
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
-import pandas as pd
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import NoSuchElementException
+
+from seace_parseo import (
+    URL_BUSCADOR,
+    datos_basicos_desde_celdas,
+    datos_desde_ficha,
+    parsear_ficha,
+    registro_sin_ficha
+)
+from seace_checkpoint import Checkpoint
+from seace_esperas import MotorEsperas
+from seace_export import exportar
+from seace_registro import Registro
+from seace_metricas import medir, FILAS, FICHAS, FALLBACKS, ERRORES, RECICLAJES
+from seace_memoria import VigilanteNavegador
+from seace_bloqueo import EstadisticasBloqueo, activar_bloqueo, configurar_opciones, patrones_configurados
 
 logging.basicConfig(level=logging.INFO, format='%(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 
+class NavegadorPerdido(RuntimeError):
+    """No se pudo reciclar el navegador y volver a la página en curso"""
+
+
+def crear_driver(headless: bool = True, bloquear: list = None):
+    """Crea un Chrome listo para Cloud Run (también lo usa el pool de drivers).
+    
+    bloquear: patrones de URL a bloquear por CDP (por defecto los de SEACE_BLOQUEO; [] desactiva)
+    """
+    patrones = patrones_configurados() if bloquear is None else bloquear
+    options = Options()
+    
+    # CRITICAL: Opciones obligatorias para Cloud Run
+    options.add_argument('--headless=new')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument('--disable-gpu')
+    options.add_argument('--disable-software-rasterizer')
+    options.add_argument('--disable-extensions')
+    
+    # Optimizaciones
+    options.add_argument('--disable-blink-features=AutomationControlled')
+    options.add_argument('--window-size=1920,1080')
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    
+    # Desactivar carga de imágenes
+    prefs = {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.default_content_setting_values.notifications": 2
+    }
+    options.add_experimental_option("prefs", prefs)
+    configurar_opciones(options, patrones)
+    
+    # IMPORTANT: Usar Chrome del sistema (no ChromeDriverManager)
+    try:
+        # Intentar sin service (chromedriver en PATH)
+        driver = webdriver.Chrome(options=options)
+        logger.info("✅ Chrome iniciado desde PATH")
+    except Exception as e:
+        logger.info(f"⚠️ Intentando con ruta explícita: {e}")
+        # Fallback: ruta explícita
+        service = Service('/usr/local/bin/chromedriver')
+        driver = webdriver.Chrome(service=service, options=options)
+        logger.info("✅ Chrome iniciado con ruta explícita")
+    
+    driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+    activar_bloqueo(driver, patrones)
+    return driver
+
+
+# Lee todas las filas de la tabla de resultados en una sola ida y vuelta
+JS_CAPTURAR_TABLA = """
+var cuerpo = document.getElementById('tbBuscador:idFormBuscarProceso:dtProcesos_data');
+if (!cuerpo) { return []; }
+var filas = [];
+for (var i = 0; i < cuerpo.rows.length; i++) {
+    var tr = cuerpo.rows[i];
+    if ((tr.className || '').indexOf('ui-datatable-empty-message') !== -1) { continue; }
+    var celdas = [];
+    for (var j = 0; j < tr.cells.length; j++) {
+        celdas.push((tr.cells[j].innerText || '').trim());
+    }
+    var boton = tr.querySelector('img[id*="grafichaSel"]');
+    filas.push({celdas: celdas, ficha_id: boton ? boton.id : null});
+}
+return filas;
+"""
+
+# Pide la ficha de una fila con fetch (el mismo postback que hace el enlace) sin salir del listado
+JS_FICHA_FETCH = """
+var boton = document.getElementById(arguments[0]), callback = arguments[arguments.length - 1];
+var enlace = boton ? boton.closest('a') : null;
+var form = boton ? boton.closest('form') : null;
+if (!enlace || !enlace.id || !form) { callback({error: 'sin enlace de ficha para ' + arguments[0]}); return; }
+var datos = new URLSearchParams(new FormData(form));
+datos.set(enlace.id, enlace.id);
+fetch(form.action, {method: 'POST', body: datos, credentials: 'same-origin'})
+    .then(function (r) { return r.ok ? r.text() : Promise.reject('HTTP ' + r.status); })
+    .then(function (html) { callback({html: html}); }, function (e) { callback({error: String(e)}); });
+"""
+
+# Abre la ficha de una fila a partir del id de su botón
+JS_ABRIR_FICHA = """
+var boton = document.getElementById(arguments[0]);
+if (!boton) { return false; }
+boton.scrollIntoView(true);
+boton.click();
+return true;
+"""
+
+# Lee toda la ficha en una sola ida y vuelta: {cronograma: [{etapa, inicio, fin}], direccion, items: [{...}]}
+# Usa textContent, así que el listado de ítems se lee aunque esté colapsado (sin clic ni espera)
+JS_EXTRAER_FICHA = """
+function limpio(nodo) { return nodo ? nodo.textContent.replace(/\\s+/g, ' ').trim() : ''; }
+function celdas(tr) { return Array.prototype.filter.call(tr.children, function (c) { return c.tagName === 'TD'; }); }
+function etiqueta(texto) {
+    var spans = document.querySelectorAll('span');
+    for (var i = 0; i < spans.length; i++) {
+        if (limpio(spans[i]).indexOf(texto) === 0) { return spans[i]; }
+    }
+    return null;
+}
+var fecha = /\\d{2}\\/\\d{2}\\/\\d{4}/;
+var tablas = Array.prototype.filter.call(document.querySelectorAll('table'), function (t) {
+    return Array.prototype.some.call(t.querySelectorAll('th'), function (th) { return limpio(th) === 'Etapa'; });
+});
+var cronograma = [];
+(tablas.length ? tablas : [document]).forEach(function (tabla) {
+    tabla.querySelectorAll('tr').forEach(function (tr) {
+        var c = celdas(tr);
+        if (c.length >= 3 && (fecha.test(limpio(c[1])) || fecha.test(limpio(c[2])))) {
+            cronograma.push({etapa: limpio(c[0]), inicio: limpio(c[1]), fin: limpio(c[2])});
+        }
+    });
+});
+var span = etiqueta('Direccion Legal:');
+var celda = span ? span.closest('td') : null;
+var items = [];
+document.querySelectorAll('span').forEach(function (s) {
+    var tabla = s.closest('table');
+    if (!tabla || limpio(s).indexOf('Codigo CUBSO:') !== 0) { return; }
+    var item = {};
+    tabla.querySelectorAll('tr').forEach(function (tr) {
+        var c = celdas(tr), nombre = c.length >= 2 ? limpio(c[0].querySelector('span')) : '';
+        if (nombre.slice(-1) === ':') { item[nombre.slice(0, -1)] = limpio(c[1]); }
+    });
+    items.push(item);
+});
+return {cronograma: cronograma, direccion: celda ? limpio(celda.nextElementSibling) : '', items: items};
+"""
+
+# Paginador de la tabla a través del widget de PrimeFaces (o del DOM si no hay widget).
+#   'estado'         → {widget, exacto, total, actual, filas}
+#   'filas'          → elige la mayor opción de filas por página: {cambio, filas}
+#   'ir', pagina     → salta directo a la página (1-based); false si no hay widget
+JS_PAGINADOR = """
+var accion = arguments[0], valor = arguments[1];
+var tabla = 'tbBuscador:idFormBuscarProceso:dtProcesos', paginador = null;
+if (window.PrimeFaces && PrimeFaces.widgets) {
+    for (var nombre in PrimeFaces.widgets) {
+        var w = PrimeFaces.widgets[nombre];
+        if (w && w.id === tabla && w.paginator) { paginador = w.paginator; break; }
+    }
+}
+var contenedor = document.getElementById(tabla) || document;
+var selector = contenedor.querySelector('select.ui-paginator-rpp-options');
+
+if (accion === 'filas') {
+    var opciones = selector ? Array.prototype.map.call(selector.options, function (o) { return parseInt(o.value, 10); })
+                                  .filter(function (n) { return n > 0; }) : [];
+    if (!opciones.length) { return {cambio: false}; }
+    var maximo = Math.max.apply(null, opciones);
+    var actuales = paginador ? paginador.cfg.rows : parseInt(selector.value, 10);
+    if (maximo <= actuales) { return {cambio: false, filas: actuales}; }
+    if (paginador) {
+        paginador.setRowsPerPage(maximo);
+    } else {
+        selector.value = String(maximo);
+        selector.dispatchEvent(new Event('change', {bubbles: true}));
+    }
+    return {cambio: true, filas: maximo};
+}
+
+if (accion === 'ir') {
+    if (!paginador) { return false; }
+    paginador.setPage(valor - 1);
+    return true;
+}
+
+if (paginador) {
+    return {widget: true, exacto: true, total: paginador.getPageCount(),
+            actual: paginador.getCurrentPage() + 1, filas: paginador.cfg.rows};
+}
+// Sin widget: el reporte "Página X de N" es exacto; los botones solo muestran una ventana de páginas
+var reporte = contenedor.querySelector('.ui-paginator-current');
+var partes = reporte ? (reporte.textContent.match(/(\\d+)\\D+(\\d+)\\s*\\)?\\s*$/) || []) : [];
+if (partes.length) {
+    return {widget: false, exacto: true, total: parseInt(partes[2], 10), actual: parseInt(partes[1], 10), filas: null};
+}
+var total = 0, actual = null;
+contenedor.querySelectorAll('.ui-paginator-page').forEach(function (b) {
+    var n = parseInt(b.textContent, 10);
+    if (n > total) { total = n; }
+    if (b.className.indexOf('ui-state-active') !== -1) { actual = n; }
+});
+return {widget: false, exacto: false, total: total, actual: actual, filas: null};
+"""
+
+
 class SeaceScraperCompleto:
     
-    def __init__(self, headless: bool = True):  # Cambiado de False a True
+    def __init__(self, headless: bool = True, driver=None, workers_fichas: int = 1, pool=None,
+                 url_buscador: str = None, cache_fichas=None, directorio_checkpoints: str = None,
+                 progreso: dict = None, on_registro=None, guardar_resultados: bool = True,
+                 cancelar: threading.Event = None, modo_fichas: str = None):  # Cambiado de False a True
         self.headless = headless
-        self.driver = None
+        self.url_buscador = url_buscador or os.environ.get('SEACE_URL', URL_BUSCADOR)
+        # Si recibe un driver (p. ej. del pool) no es dueño de él y no lo cierra
+        self.driver = driver
+        self._driver_propio = driver is None
         self.resultados = []
+        # Modo paralelo: N navegadores extra visitan las fichas (del pool si se entrega)
+        self.workers_fichas = max(1, workers_fichas)
+        self.pool = pool
+        # Cache de fichas por Nomenclatura (CacheFichas); evita volver a entrar a la ficha
+        self.cache_fichas = cache_fichas
+        # Checkpoints para reanudar scrapings interrumpidos (solo modo secuencial)
+        self.directorio_checkpoints = directorio_checkpoints
+        self.checkpoint = None
+        # Avance para quien lo consulte (jobs): pagina, total_paginas, filas, total_filas
+        self.progreso = progreso if progreso is not None else {}
+        self._lock_progreso = threading.Lock()
+        # Esperas por eventos (AJAX/DOM) en lugar de sleep() fijos
+        self.esperas = MotorEsperas(lambda: self.driver)
+        # Streaming: on_registro(registro) recibe cada registro apenas está listo;
+        # con guardar_resultados=False no se acumulan en memoria
+        self.on_registro = on_registro
+        self.guardar_resultados = guardar_resultados
+        self.total_registros = 0
+        self.cancelar = cancelar
+        # Solicitudes y bytes ahorrados por el bloqueo de recursos en este job
+        self.bloqueo = EstadisticasBloqueo()
+        # 'fetch': la ficha se pide con fetch desde el listado (no se navega ni se vuelve);
+        # 'navegacion': clic en la ficha y "Volver" (también es el respaldo si el fetch falla)
+        self.modo_fichas = modo_fichas or os.environ.get('SEACE_MODO_FICHAS', 'fetch')
+        # Total de páginas de la búsqueda actual (se lee una vez; None = no se conoce con exactitud)
+        self._total_paginas = None
+        # Se marca cuando el listado de la búsqueda actual quedó con huecos (página o fila perdida)
+        self._listado_incompleto = False
+        # Reciclaje del navegador a mitad del scraping (RSS, heap de JS o N fichas); el rango permite rehacer la búsqueda
+        self.vigilante = VigilanteNavegador()
+        self._rango = None
     
     def iniciar(self):
         """Inicia el navegador"""
-        logger.info("🚀 Iniciando navegador...")
-        
-        options = Options()
-        
-        # CRITICAL: Opciones obligatorias para Cloud Run
-        options.add_argument('--headless=new')
-        options.add_argument('--no-sandbox')
-        options.add_argument('--disable-dev-shm-usage')
-        options.add_argument('--disable-gpu')
-        options.add_argument('--disable-software-rasterizer')
-        options.add_argument('--disable-extensions')
-        
-        # Optimizaciones
-        options.add_argument('--disable-blink-features=AutomationControlled')
-        options.add_argument('--window-size=1920,1080')
-        options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        
-        # Desactivar carga de imágenes
-        prefs = {
-            "profile.managed_default_content_settings.images": 2,
-            "profile.default_content_setting_values.notifications": 2
-        }
-        options.add_experimental_option("prefs", prefs)
-        
-        # IMPORTANT: Usar Chrome del sistema (no ChromeDriverManager)
-        try:
-            # Intentar sin service (chromedriver en PATH)
-            self.driver = webdriver.Chrome(options=options)
-            logger.info("✅ Chrome iniciado desde PATH")
-        except Exception as e:
-            logger.info(f"⚠️ Intentando con ruta explícita: {e}")
-            # Fallback: ruta explícita
-            service = Service('/usr/local/bin/chromedriver')
-            self.driver = webdriver.Chrome(service=service, options=options)
-            logger.info("✅ Chrome iniciado con ruta explícita")
+        if self.driver is not None:
+            logger.info("♻️  Usando navegador ya iniciado\n")
+            return
         
-        self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        logger.info("🚀 Iniciando navegador...")
+        self.driver = crear_driver(self.headless)
         logger.info("✅ Navegador iniciado\n")
     
     def cerrar(self):
-        """Cierra el navegador"""
-        if self.driver:
+        """Cierra el navegador (solo si lo inició este scraper)"""
+        if self.driver and self._driver_propio:
             self.driver.quit()
     
-    def click(self, xpath: str, wait_after: float = 0.3):
-        """Hace clic usando JavaScript con espera configurable"""
+    def reciclar_navegador(self, motivo: str, pagina: int):
+        """Cambia el navegador por uno nuevo, rehace la búsqueda y vuelve a la página en curso.
+        
+        Los registros ya extraídos (self.resultados, checkpoint) no se tocan.
+        """
+        logger.warning(f"   ♻️  Reciclando navegador ({motivo}: {self.vigilante.ultima_muestra or self.vigilante.fichas})")
+        RECICLAJES.labels(motivo).inc()
+        self.bloqueo.recolectar(self.driver)
+        
+        if self.pool is not None:
+            self.pool.devolver(self.driver, descartar=True)
+            self.driver = self.pool.obtener()
+        else:
+            if self._driver_propio:
+                try:
+                    self.driver.quit()
+                except Exception:
+                    pass
+            # El nuevo es de este scraper aunque el anterior no lo fuera: cerrar() lo cierra
+            self.driver = crear_driver(self.headless)
+            self._driver_propio = True
+        
+        self.vigilante.reiniciar()
+        self.bloqueo.descartar(self.driver)
+        try:
+            if not self.cargar_busqueda(*self._rango):
+                raise NavegadorPerdido("la búsqueda no devolvió datos tras reciclar")
+            if not self.ir_a_pagina(1, pagina):
+                raise NavegadorPerdido(f"no se pudo volver a la página {pagina} tras reciclar")
+        except NavegadorPerdido:
+            raise
+        except Exception as e:
+            raise NavegadorPerdido(f"no se pudo rehacer la búsqueda tras reciclar: {e}") from e
+        logger.info(f"   ✅ Navegador nuevo en la página {pagina}")
+    
+    def click(self, xpath: str, fase: str = 'click'):
+        """Hace clic usando JavaScript y espera a que termine el AJAX que dispare"""
         elem = self.driver.find_element(By.XPATH, xpath)
-        self.driver.execute_script("arguments[0].scrollIntoView(true);", elem)
-        sleep(0.2)  # Reducido de 0.5
-        self.driver.execute_script("arguments[0].click();", elem)
-        sleep(wait_after)  # Configurable
+        self.driver.execute_script("arguments[0].scrollIntoView(true); arguments[0].click();", elem)
+        self.esperas.esperar(fase)
     
     def escribir(self, xpath: str, texto: str):
         """Escribe en un campo"""
         elem = self.driver.find_element(By.XPATH, xpath)
-        self.driver.execute_script("arguments[0].value = '';", elem)
-        self.driver.execute_script("arguments[0].value = arguments[1];", elem, texto)
-        self.driver.execute_script("arguments[0].dispatchEvent(new Event('change'));", elem)
-        sleep(0.2)  # Reducido de 0.3
+        self.driver.execute_script(
+            "arguments[0].value = arguments[1]; arguments[0].dispatchEvent(new Event('change'));",
+            elem, texto
+        )
+        self.esperas.esperar('escribir')
     
-    def buscar_y_extraer(self, fecha_inicio: datetime, fecha_fin: datetime):
-        """Ejecuta la búsqueda y extrae los datos"""
+    def buscar_y_extraer(self, fecha_inicio: datetime, fecha_fin: datetime) -> bool:
+        """Ejecuta la búsqueda y extrae los datos (una búsqueda por año si el rango cruza años).
+        
+        Retorna True solo si el listado del rango se recorrió completo (sin cancelar, sin páginas ni filas perdidas):
+        solo así se puede dar el rango por cubierto. Una búsqueda sin resultados también es completa.
+        """
+        from seace_shards import dividir_por_anio, extraer_por_anios
+        
+        tramos = dividir_por_anio(fecha_inicio, fecha_fin)
+        if len(tramos) > 1:
+            return extraer_por_anios(self, tramos, self._buscar_anio_aparte)
         
         logger.info(f"📅 Rango: {fecha_inicio.strftime('%d/%m/%Y')} → {fecha_fin.strftime('%d/%m/%Y')}")
         
+        self.esperas.iniciar_medicion()
+        self.bloqueo.descartar(self.driver)
+        self._listado_incompleto = False
+        if not self.cargar_busqueda(fecha_inicio, fecha_fin):
+            return True
+        
+        # Extraer datos de la tabla con paginación
+        logger.info("📊 Extrayendo datos de la tabla...")
+        if self.workers_fichas > 1:
+            self.extraer_fichas_en_paralelo(fecha_inicio, fecha_fin)
+            recorrido = True
+        elif self.directorio_checkpoints and self.guardar_resultados:
+            # El checkpoint guarda los registros, así que no aplica en modo streaming
+            recorrido = self.extraer_con_checkpoint(fecha_inicio, fecha_fin)
+        else:
+            recorrido = self.extraer_datos_con_paginacion()
+        completo = recorrido and not self._listado_incompleto and not self.cancelado()
+        
+        resumen_esperas = self.esperas.resumen()
+        logger.info(f"⏱️  Tiempo esperando: {resumen_esperas['espera_seg']}s de {resumen_esperas['total_seg']}s "
+                    f"({resumen_esperas['porcentaje_espera']}%)")
+        
+        self.bloqueo.recolectar(self.driver)
+        resumen_bloqueo = self.bloqueo.resumen()
+        self.progreso['bloqueo'] = resumen_bloqueo
+        logger.info(f"🚫 Recursos bloqueados: {resumen_bloqueo['solicitudes_bloqueadas']} solicitudes, "
+                    f"~{resumen_bloqueo['bytes_ahorrados_estimados'] // 1024} KB ahorrados")
+        
+        if self.total_registros:
+            logger.info(f"✅ Se extrajeron {self.total_registros} registros en total")
+        else:
+            logger.info("⚠️  No se encontraron datos")
+        if not completo:
+            logger.warning("⚠️  El listado quedó incompleto: el rango no se da por cubierto")
+        return completo
+    
+    def _buscar_anio_aparte(self, fecha_inicio: datetime, fecha_fin: datetime):
+        """Busca un año con otro navegador (en otro hilo). Retorna (registros, completo), o None si no se pudo"""
+        driver = None
+        if self.pool is not None:
+            try:
+                # Sin navegador libre pronto no se espera: ese año lo hará el navegador principal al terminar
+                driver = self.pool.obtener(timeout=10)
+            except TimeoutError:
+                logger.info(f"   ℹ️  Sin navegador libre para el año {fecha_inicio.year}")
+                return None
+        
+        anio = SeaceScraperCompleto(headless=self.headless, driver=driver, pool=self.pool,
+                                    url_buscador=self.url_buscador, cache_fichas=self.cache_fichas,
+                                    directorio_checkpoints=self.directorio_checkpoints,
+                                    cancelar=self.cancelar, modo_fichas=self.modo_fichas)
+        anio.bloqueo = self.bloqueo
+        error = False
+        try:
+            anio.iniciar()
+            completo = anio.buscar_y_extraer(fecha_inicio, fecha_fin)
+            return anio.resultados, completo
+        except Exception as e:
+            error = True
+            ERRORES.labels('navegador', 'anio').inc()
+            logger.warning(f"   ⚠️  Falló la búsqueda del año {fecha_inicio.year}: {e}")
+            return None
+        finally:
+            if self.pool is not None and anio.driver is not None:
+                self.pool.devolver(anio.driver, descartar=error)
+            else:
+                anio.cerrar()
+    
+    def cargar_busqueda(self, fecha_inicio: datetime, fecha_fin: datetime) -> bool:
+        """Abre el buscador, llena el formulario y busca.
+        
+        Retorna False solo si SEACE mostró "No se encontraron"; si la tabla no carga lanza RuntimeError.
+        """
+        self._total_paginas = None
+        self._rango = (fecha_inicio, fecha_fin)
+        
         # Cargar página
-        self.driver.get("https://prod2.seace.gob.pe/seacebus-uiwd-pub/buscadorPublico/buscadorPublico.xhtml")
+        with medir('carga'):
+            self.driver.get(self.url_buscador)
+            self.esperas.esperar('carga', '//a[@href="#tbBuscador:tab1"]')
         logger.info("📄 Página cargada")
-        sleep(2)  # Reducido de 3 a 2
-        
-        # Pestaña correcta
-        logger.info("🔖 Seleccionando pestaña...")
-        self.click('//a[@href="#tbBuscador:tab1"]')
-        sleep(1)  # Reducido de 2 a 1
-        
-        # Búsqueda avanzada
-        logger.info("🔽 Abriendo búsqueda avanzada...")
-        self.click('//fieldset/legend')
-        sleep(1)  # Reducido de 2 a 1
-        
-        # Año
-        logger.info(f"📅 Seleccionando año: {fecha_inicio.year}")
-        self.click('//*[@id="tbBuscador:idFormBuscarProceso:anioConvocatoria_label"]')
-        sleep(0.5)  # Reducido de 1 a 0.5
-        self.click(f'//*[@id="tbBuscador:idFormBuscarProceso:anioConvocatoria_panel"]/div/ul/li[@data-label="{fecha_inicio.year}"]')
-        sleep(0.5)  # Reducido de 1 a 0.5
-        
-        # Fechas
-        logger.info("📝 Llenando fechas...")
-        self.escribir('//*[@id="tbBuscador:idFormBuscarProceso:dfechaInicio_input"]', fecha_inicio.strftime('%d/%m/%Y'))
-        self.escribir('//*[@id="tbBuscador:idFormBuscarProceso:dfechaFin_input"]', fecha_fin.strftime('%d/%m/%Y'))
+        
+        with medir('busqueda'):
+            # Pestaña correcta
+            logger.info("🔖 Seleccionando pestaña...")
+            self.click('//a[@href="#tbBuscador:tab1"]')
+            
+            # Búsqueda avanzada
+            logger.info("🔽 Abriendo búsqueda avanzada...")
+            self.click('//fieldset/legend')
+            
+            # Año
+            logger.info(f"📅 Seleccionando año: {fecha_inicio.year}")
+            self.click('//*[@id="tbBuscador:idFormBuscarProceso:anioConvocatoria_label"]')
+            self.click(f'//*[@id="tbBuscador:idFormBuscarProceso:anioConvocatoria_panel"]/div/ul/li[@data-label="{fecha_inicio.year}"]')
+            
+            # Fechas
+            logger.info("📝 Llenando fechas...")
+            self.escribir('//*[@id="tbBuscador:idFormBuscarProceso:dfechaInicio_input"]', fecha_inicio.strftime('%d/%m/%Y'))
+            self.escribir('//*[@id="tbBuscador:idFormBuscarProceso:dfechaFin_input"]', fecha_fin.strftime('%d/%m/%Y'))
         
         # Buscar
         logger.info("🔎 Buscando...")
-        self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        sleep(0.5)  # Reducido de 1 a 0.5
-        self.click('//*[@id="tbBuscador:idFormBuscarProceso:btnBuscarSelToken"]')
-        logger.info("⏳ Esperando resultados...")
-        
-        # Esperar con WebDriverWait en lugar de sleep fijo
-        try:
-            WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.XPATH, '//*[@id="tbBuscador:idFormBuscarProceso:dtProcesos_data"]'))
-            )
-            sleep(2)  # Pequeña espera adicional para estabilidad
-        except TimeoutException:
-            sleep(5)  # Si falla, esperar un poco más
+        with medir('resultados'):
+            self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+            elem = self.driver.find_element(By.XPATH, '//*[@id="tbBuscador:idFormBuscarProceso:btnBuscarSelToken"]')
+            self.driver.execute_script("arguments[0].scrollIntoView(true); arguments[0].click();", elem)
+            logger.info("⏳ Esperando resultados...")
+            
+            # Esperar a que termine el AJAX de búsqueda y exista la tabla
+            if not self.esperas.esperar('busqueda', '//*[@id="tbBuscador:idFormBuscarProceso:dtProcesos_data"]'):
+                raise RuntimeError("La búsqueda no cargó la tabla de resultados")
         
         # Verificar si hay mensaje de "no hay datos"
         try:
@@ -144,310 +466,469 @@ class SeaceScraperCompleto:
         except NoSuchElementException:
             pass
         
-        # Extraer datos de la tabla con paginación
-        logger.info("📊 Extrayendo datos de la tabla...")
-        self.extraer_datos_con_paginacion()
+        # Menos páginas que recorrer: la mayor cantidad de filas por página que ofrezca el paginador
+        self.maximizar_filas_por_pagina()
+        return True
+    
+    def extraer_con_checkpoint(self, fecha_inicio: datetime, fecha_fin: datetime) -> bool:
+        """Extrae todas las páginas guardando el avance; reanuda si hay un checkpoint del rango"""
+        checkpoint = Checkpoint(self.directorio_checkpoints, fecha_inicio, fecha_fin)
+        if not checkpoint.tomar():
+            logger.info("ℹ️  Otro scraping del mismo rango usa su checkpoint: se sigue sin checkpoint")
+            return self.extraer_datos_con_paginacion()
         
-        if self.resultados:
-            logger.info(f"✅ Se extrajeron {len(self.resultados)} registros en total")
-            return True
-        else:
-            logger.info("⚠️  No se encontraron datos")
-            return False
+        self.checkpoint = checkpoint
+        try:
+            estado = checkpoint.cargar()
+            pagina_inicio, fila_inicio = 1, 0
+            if estado:
+                # El checkpoint solo tiene los registros de este rango: se suman a lo ya acumulado
+                # (en una búsqueda por años, `resultados` trae los años anteriores)
+                for registro in estado['resultados']:
+                    self.entregar(registro)
+                self.progreso['filas'] = self.total_registros
+                pagina_inicio, fila_inicio = estado['pagina'], estado['fila']
+            
+            try:
+                completo = self.extraer_datos_con_paginacion(pagina_inicio, fila_inicio)
+            except BaseException:
+                # Interrupción (SIGTERM, Ctrl+C): no perder las últimas filas
+                checkpoint.guardar_pendiente()
+                raise
+            
+            if completo:
+                checkpoint.borrar()
+            else:
+                checkpoint.guardar_pendiente()
+            return completo
+        finally:
+            checkpoint.cerrar()
+            self.checkpoint = None
     
-    def extraer_datos_con_paginacion(self):
-        """Extrae datos de todas las páginas"""
+    def extraer_datos_con_paginacion(self, pagina_inicio: int = 1, fila_inicio: int = 0) -> bool:
+        """Extrae datos de todas las páginas. Retorna True si llegó al final sin errores"""
         pagina_actual = 1
         
+        # Reanudar: saltar a la página del checkpoint
+        if pagina_inicio > 1:
+            logger.info(f"⏭️  Reanudando desde página {pagina_inicio}, fila {fila_inicio + 1}...")
+            if not self.ir_a_pagina(pagina_actual, pagina_inicio):
+                logger.error(f"❌ No se pudo llegar a la página {pagina_inicio}")
+                return False
+            pagina_actual = pagina_inicio
+        
         while True:
             try:
                 logger.info(f"📄 Procesando página {pagina_actual}...")
                 
-                # Obtener total de páginas solo la primera vez
-                if pagina_actual == 1:
+                # Obtener total de páginas solo la primera vez (también al reanudar)
+                if pagina_actual == max(1, pagina_inicio):
                     total_paginas = self.obtener_total_paginas()
+                    self.progreso['total_paginas'] = total_paginas
+                self.progreso['pagina'] = pagina_actual
                 
                 # Extraer datos de la página actual
-                registros_pagina = self.extraer_datos_pagina_actual(pagina_actual)
+                registros_pagina = self.extraer_datos_pagina_actual(pagina_actual, fila_inicio)
                 
                 logger.info(f"   ✓ Extraídos {registros_pagina} registros de página {pagina_actual}")
                 
-                # Si no hay datos, detener
-                if registros_pagina == 0:
-                    logger.info(f"   ℹ️  Página {pagina_actual} sin datos, deteniendo...")
-                    break
+                # Una página sin filas cuando la búsqueda sí trajo resultados es una tabla que no cargó
+                # (una página reanudada sí puede no tener filas pendientes)
+                if registros_pagina == 0 and fila_inicio == 0:
+                    logger.warning(f"   ⚠️  Página {pagina_actual} sin datos, deteniendo: el listado queda incompleto")
+                    return False
+                
+                if self.cancelado():
+                    logger.info("   ⏹️  Scraping cancelado")
+                    return False
                 
                 # Intentar ir a la siguiente página
                 if not self.ir_siguiente_pagina(pagina_actual):
                     logger.info(f"✅ Completado. Total de páginas procesadas: {pagina_actual}")
-                    break
+                    return True
                 
                 pagina_actual += 1
-                sleep(2)  # Reducido de 3 a 2
+                fila_inicio = 0
+                if self.checkpoint is not None:
+                    self.checkpoint.guardar(pagina_actual, 0)
                 
             except Exception as e:
                 logger.error(f"❌ Error en página {pagina_actual}: {e}")
-                break
+                return False
     
-    def extraer_datos_pagina_actual(self, pagina_num: int) -> int:
-        """Extrae datos de la página actual y entra a cada ficha - SIN STALE ELEMENT"""
+    def capturar_tabla(self) -> list:
+        """Lee toda la tabla de resultados en una sola llamada a WebDriver.
+        
+        Retorna [{'celdas': [...], 'ficha_id': ...}, ...] solo con las filas válidas.
+        """
+        filas = self.driver.execute_script(JS_CAPTURAR_TABLA) or []
+        return [fila for fila in filas if len(fila.get('celdas') or []) >= 11]
+    
+    def extraer_datos_pagina_actual(self, pagina_num: int, fila_inicio: int = 0) -> int:
+        """Extrae datos de la página actual y entra a cada ficha.
+        
+        La tabla se lee una sola vez (snapshot); el DOM vivo solo se toca para abrir cada ficha.
+        Con fila_inicio > 0 se saltan las filas ya procesadas (reanudación).
+        """
         registros_extraidos = 0
         
         try:
-            # Primero contar cuántas filas válidas hay
-            filas = self.driver.find_elements(
-                By.XPATH,
-                '//*[@id="tbBuscador:idFormBuscarProceso:dtProcesos_data"]/tr'
-            )
-            
-            # Filtrar filas válidas (excluir mensajes de error)
-            total_filas = 0
-            for fila in filas:
-                class_attr = fila.get_attribute("class") or ""
-                if "ui-datatable-empty-message" not in class_attr:
-                    try:
-                        celdas = fila.find_elements(By.TAG_NAME, "td")
-                        if len(celdas) >= 11:
-                            total_filas += 1
-                    except:
-                        pass
+            filas = self.capturar_tabla()
+            total_filas = len(filas)
             
             logger.info(f"   📋 Encontradas {total_filas} filas válidas en página {pagina_num}")
             
-            # Iterar por índice (SOLUCIÓN AL STALE ELEMENT)
-            idx_fila = 0
-            while idx_fila < total_filas:
+            for idx_fila, fila in enumerate(filas):
+                if idx_fila < fila_inicio:
+                    continue
+                if self.cancelado():
+                    break
+                
                 try:
-                    # ⚠️ IMPORTANTE: RE-OBTENER todas las filas en cada iteración
-                    filas = self.driver.find_elements(
-                        By.XPATH,
-                        '//*[@id="tbBuscador:idFormBuscarProceso:dtProcesos_data"]/tr'
-                    )
-                    
-                    # Encontrar la fila válida en la posición idx_fila
-                    filas_validas = []
-                    for fila in filas:
-                        class_attr = fila.get_attribute("class") or ""
-                        if "ui-datatable-empty-message" not in class_attr:
-                            celdas = fila.find_elements(By.TAG_NAME, "td")
-                            if len(celdas) >= 11:
-                                filas_validas.append(fila)
-                    
-                    if idx_fila >= len(filas_validas):
-                        break
-                    
-                    fila = filas_validas[idx_fila]
-                    celdas = fila.find_elements(By.TAG_NAME, "td")
-                    
-                    # ⚠️ CRÍTICO: Extraer TODO el texto ANTES de hacer clic
-                    # (para evitar stale elements después de volver)
-                    try:
-                        texto_celdas = [celda.text.strip() for celda in celdas]
-                    except:
-                        idx_fila += 1
-                        continue
-                    
-                    # Extraer datos básicos usando el texto ya obtenido
-                    datos_basicos = {
-                        'N°': texto_celdas[0] if len(texto_celdas) > 0 else '',
-                        'Entidad Solicitante': texto_celdas[1] if len(texto_celdas) > 1 else '',
-                        'Fecha': texto_celdas[2] if len(texto_celdas) > 2 else '',
-                        'Nomenclatura': texto_celdas[3] if len(texto_celdas) > 3 else '',
-                        'Objeto': texto_celdas[5] if len(texto_celdas) > 5 else '',
-                        'Descripción del Requerimiento': texto_celdas[6] if len(texto_celdas) > 6 else '',
-                        'Valor Referencial': texto_celdas[9] if len(texto_celdas) > 9 else '',
-                        'Moneda': texto_celdas[10] if len(texto_celdas) > 10 else ''
-                    }
+                    datos_basicos = datos_basicos_desde_celdas(fila['celdas'])
                     
                     # Verificar que no esté vacío
                     if not datos_basicos['Entidad Solicitante']:
-                        idx_fila += 1
                         continue
                     
                     logger.info(f"      → Procesando fila {idx_fila + 1}/{total_filas}: N°{datos_basicos['N°']} - {datos_basicos['Nomenclatura']}")
                     
-                    # Buscar el botón de ficha en esta fila
-                    try:
-                        boton_ficha = fila.find_element(
-                            By.XPATH,
-                            './/img[contains(@id, "grafichaSel")]'
-                        )
-                        
-                        # Hacer clic en el botón de ficha
-                        self.driver.execute_script("arguments[0].scrollIntoView(true);", boton_ficha)
-                        sleep(0.3)
-                        self.driver.execute_script("arguments[0].click();", boton_ficha)
-                        
-                        # Esperar con WebDriverWait
-                        try:
-                            WebDriverWait(self.driver, 5).until(
-                                EC.presence_of_element_located((By.XPATH, '//legend[contains(text(), "Ver listado de ítem")]'))
-                            )
-                            sleep(1)
-                        except TimeoutException:
-                            sleep(2)
-                        
-                        # Extraer datos de la ficha
-                        datos_ficha = self.extraer_datos_ficha()
-                        
-                        # Combinar datos básicos + datos de ficha
-                        registro_completo = {**datos_basicos, **datos_ficha}
-                        self.resultados.append(registro_completo)
-                        registros_extraidos += 1
-                        
-                        # Volver a la lista
-                        self.volver_a_lista()
-                        
-                        # Esperar a que se recargue
-                        try:
-                            WebDriverWait(self.driver, 5).until(
-                                EC.presence_of_element_located((By.XPATH, '//*[@id="tbBuscador:idFormBuscarProceso:dtProcesos_data"]'))
-                            )
-                            sleep(1)
-                        except TimeoutException:
-                            sleep(2)
-                        
-                    except Exception as e:
-                        logger.warning(f"         ⚠️  No se pudo entrar a la ficha: {e}")
-                        # Si no se puede entrar a la ficha, guardar solo datos básicos
-                        datos_completos = {
-                            **datos_basicos,
-                            'Fecha de Inicio': '',
-                            'Fecha de Fin': '',
-                            'Region': '',
-                            'CUBSO': ''
-                        }
-                        self.resultados.append(datos_completos)
-                        registros_extraidos += 1
+                    registro = self.agregar_registro(self.procesar_ficha(fila['ficha_id'], datos_basicos))
+                    registros_extraidos += 1
+                    self.progreso['filas'] = self.total_registros
                     
-                    idx_fila += 1
+                    if self.checkpoint is not None:
+                        self.checkpoint.registrar(pagina_num, idx_fila + 1, registro)
                     
                 except Exception as e:
+                    ERRORES.labels('navegador', 'fila').inc()
                     logger.warning(f"      ⚠️  Error en fila {idx_fila + 1}: {e}")
-                    idx_fila += 1
+                    self._listado_incompleto = True
                     continue
+                
+                # Navegador hinchado: uno nuevo en la misma página; la tabla ya capturada sigue valiendo
+                motivo = self.vigilante.revisar(self.driver)
+                if motivo:
+                    self.reciclar_navegador(motivo, pagina_num)
             
             return registros_extraidos
-            
+        
+        except NavegadorPerdido:
+            raise
         except Exception as e:
+            ERRORES.labels('navegador', 'pagina').inc()
             logger.error(f"❌ Error extrayendo datos de página: {e}")
+            self._listado_incompleto = True
             return registros_extraidos
+    
+    def agregar_registro(self, datos: dict) -> Registro:
+        """Tipa un registro terminado, lo entrega y lo retorna"""
+        FILAS.labels('navegador').inc()
+        registro = Registro.desde_dict(datos)
+        self.entregar(registro)
+        return registro
+    
+    def entregar(self, registro: Registro):
+        """Entrega un registro al callback de streaming y/o a self.resultados"""
+        self.total_registros += 1
+        if self.guardar_resultados:
+            self.resultados.append(registro)
+        if self.on_registro is not None:
+            self.on_registro(registro)
+    
+    def cancelado(self) -> bool:
+        """True si quien consume el scraping pidió detenerlo (p. ej. el cliente se desconectó)"""
+        return self.cancelar is not None and self.cancelar.is_set()
+    
+    def ficha_en_cache(self, datos_basicos: dict):
+        """Registro completo armado desde la cache, o None si la ficha no está"""
+        if self.cache_fichas is None:
+            return None
+        datos_ficha = self.cache_fichas.obtener(datos_basicos['Nomenclatura'])
+        if datos_ficha is None:
+            return None
+        logger.info("         💾 Ficha desde cache")
+        FICHAS.labels('cache').inc()
+        return {**datos_basicos, **datos_ficha}
+    
+    def procesar_ficha(self, ficha_id: str, datos_basicos: dict) -> dict:
+        """Obtiene los datos de la ficha de la fila (por fetch o entrando y volviendo a la lista)"""
+        registro = self.ficha_en_cache(datos_basicos)
+        if registro is not None:
+            return registro
+        
+        self.vigilante.contar_ficha()
+        try:
+            if not ficha_id:
+                raise NoSuchElementException("fila sin botón de ficha")
             
-            return registros_extraidos
+            datos_ficha = None
+            if self.modo_fichas == 'fetch':
+                datos_ficha = self.ficha_por_fetch(ficha_id)
+            if datos_ficha is None:
+                datos_ficha = self.ficha_navegando(ficha_id)
+            
+            FICHAS.labels('navegador').inc()
+            if self.cache_fichas is not None:
+                self.cache_fichas.guardar(datos_basicos['Nomenclatura'], datos_ficha)
+            
+            # Combinar datos básicos + datos de ficha
+            return {**datos_basicos, **datos_ficha}
             
         except Exception as e:
-            logger.error(f"❌ Error extrayendo datos de página: {e}")
-            return registros_extraidos
+            logger.warning(f"         ⚠️  No se pudo entrar a la ficha: {e}")
+            # Si no se puede entrar a la ficha, guardar solo datos básicos
+            FALLBACKS.labels('navegador').inc()
+            return registro_sin_ficha(datos_basicos)
     
-    def extraer_datos_ficha(self) -> dict:
-        """Extrae los datos adicionales de la ficha de selección - OPTIMIZADO"""
-        datos = {
-            'Fecha de Inicio': '',
-            'Fecha de Fin': '',
-            'Region': '',
-            'CUBSO': ''
-        }
+    def ficha_por_fetch(self, ficha_id: str):
+        """Pide la ficha desde la página del listado y la parsea en Python; el listado no se toca.
         
+        Retorna None si no se pudo (el llamador entra a la ficha navegando).
+        """
         try:
-            # 1. Extraer Fecha Inicio y Fecha Fin del cronograma
-            logger.info("         📅 Extrayendo fechas...")
-            # Intentar primero "Registro de participantes"
-            # Intentar primero "Registro de participantes"
+            with medir('ficha_abrir'):
+                self.driver.set_script_timeout(self.esperas.timeout_max)
+                respuesta = self.driver.execute_async_script(JS_FICHA_FETCH, ficha_id) or {}
+            if respuesta.get('error'):
+                raise RuntimeError(respuesta['error'])
+            
+            with medir('ficha_extraer'):
+                datos_ficha = parsear_ficha(respuesta.get('html') or '')
+            if not any(datos_ficha.values()):
+                raise ValueError("la respuesta no trae datos de ficha")
+            return datos_ficha
+        
+        except Exception as e:
+            logger.warning(f"         ⚠️  Ficha por fetch falló ({e}), entrando a la ficha...")
+            return None
+    
+    def ficha_navegando(self, ficha_id: str) -> dict:
+        """Entra a la ficha, extrae sus datos y vuelve a la lista"""
+        with medir('ficha_abrir'):
+            # Hacer clic en el botón de ficha (una sola llamada)
+            encontrado = self.driver.execute_script(JS_ABRIR_FICHA, ficha_id)
+            if not encontrado:
+                raise NoSuchElementException(f"no existe el botón {ficha_id}")
+            
+            # Esperar a que cargue la ficha
+            self.esperas.esperar('ficha', '//legend[contains(text(), "Ver listado de ítem")]')
+        
+        # Extraer datos de la ficha
+        with medir('ficha_extraer'):
+            datos_ficha = self.extraer_datos_ficha()
+        
+        with medir('volver'):
+            # Volver a la lista
+            self.volver_a_lista()
+            
+            # Esperar a que se recargue
+            self.esperas.esperar('volver', '//*[@id="tbBuscador:idFormBuscarProceso:dtProcesos_data"]')
+        
+        return datos_ficha
+    
+    def recolectar_listado(self) -> list:
+        """Recorre todas las páginas leyendo solo la tabla (sin entrar a fichas).
+        
+        Retorna [(pagina, ficha_id, datos_basicos), ...] en el orden original.
+        """
+        listado = []
+        pagina_actual = 1
+        
+        while True:
+            logger.info(f"📄 Listando página {pagina_actual}...")
+            filas = self.capturar_tabla()
+            
+            if not filas:
+                # La búsqueda trajo resultados: una página vacía es una tabla que no cargó
+                logger.warning(f"   ⚠️  Página {pagina_actual} sin filas: el listado queda incompleto")
+                self._listado_incompleto = True
+                break
+            
+            for fila in filas:
+                datos_basicos = datos_basicos_desde_celdas(fila['celdas'])
+                if datos_basicos['Entidad Solicitante']:
+                    listado.append((pagina_actual, fila['ficha_id'], datos_basicos))
+            
+            if not self.ir_siguiente_pagina(pagina_actual):
+                break
+            
+            pagina_actual += 1
+        
+        logger.info(f"   📋 Listado completo: {len(listado)} filas en {pagina_actual} páginas")
+        return listado
+    
+    def extraer_fichas_en_paralelo(self, fecha_inicio: datetime, fecha_fin: datetime):
+        """Lista todas las filas y reparte las visitas a fichas entre varios navegadores"""
+        listado = self.recolectar_listado()
+        if not listado:
+            return
+        
+        self.progreso.update(filas=0, total_filas=len(listado))
+        
+        # Los registros terminados esperan aquí hasta que les toque salir en orden
+        pendientes = {}
+        self._siguiente_orden = 0
+        
+        # Las fichas en cache se resuelven aquí; a los workers solo van las que faltan
+        ordenados = []
+        for orden, (pagina, ficha_id, datos_basicos) in enumerate(listado):
+            registro = self.ficha_en_cache(datos_basicos)
+            if registro is not None:
+                self.registro_listo(pendientes, orden, registro)
+            else:
+                ordenados.append((orden, (pagina, ficha_id, datos_basicos)))
+        
+        if not ordenados:
+            return
+        
+        # Cola compartida: cada worker saca la siguiente fila, así con menos navegadores
+        # el trabajo tarda más pero ninguna fila se queda sin ficha por esperar un navegador
+        cola = deque(ordenados)
+        reintentadas = set()
+        workers = min(self.workers_fichas, len(ordenados))
+        if self.pool is not None:
+            # El principal ya tiene uno de los navegadores del pool
+            workers = min(workers, self.pool.tamano - 1)
+        
+        if workers < 1:
+            logger.info(f"🧵 Sin navegadores extra en el pool: {len(ordenados)} fichas con el navegador principal")
             try:
-                fila_registro = WebDriverWait(self.driver, 3).until(
-                    EC.presence_of_element_located((By.XPATH, '//td[contains(text(), "Registro de participantes")]/parent::tr'))
-                )
-                
-                celdas_registro = fila_registro.find_elements(By.TAG_NAME, "td")
-                
-                if len(celdas_registro) >= 3:
-                    datos['Fecha de Inicio'] = celdas_registro[1].text.strip()
-                    datos['Fecha de Fin'] = celdas_registro[2].text.strip()
-                    logger.info(f"            ✓ Registro: {datos['Fecha de Inicio']} - {datos['Fecha de Fin']}")
-                    
-            except (NoSuchElementException, TimeoutException):
-                # Si no hay "Registro de participantes", intentar "Presentación de propuestas"
-                logger.info("            ℹ️  Sin 'Registro de participantes', buscando 'Presentación de propuestas'...")
+                self._consumir_cola(self, fecha_inicio, fecha_fin, cola, reintentadas, pendientes)
+            except Exception as e:
+                ERRORES.labels('navegador', 'worker').inc()
+                logger.warning(f"   ⚠️  No se pudieron visitar las fichas: {e}")
+        else:
+            logger.info(f"🧵 Repartiendo {len(ordenados)} fichas entre {workers} workers...")
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futuros = [
+                    executor.submit(self._worker_fichas, fecha_inicio, fecha_fin, cola, reintentadas, pendientes)
+                    for _ in range(workers)
+                ]
+                for futuro in futuros:
+                    futuro.result()
+        
+        # Las filas que ningún worker alcanzó quedan solo con datos básicos
+        if not self.cancelado():
+            while cola:
+                orden, (_, _, datos_basicos) = cola.popleft()
+                FALLBACKS.labels('navegador').inc()
+                self.registro_listo(pendientes, orden, registro_sin_ficha(datos_basicos))
+    
+    def registro_listo(self, pendientes: dict, orden: int, registro: dict):
+        """Marca la fila `orden` como terminada y emite, en orden, todo lo que ya esté listo.
+        
+        Los workers la llaman desde varios hilos.
+        """
+        with self._lock_progreso:
+            pendientes[orden] = registro
+            self.progreso['filas'] = self.progreso.get('filas', 0) + 1
+            while self._siguiente_orden in pendientes:
+                self.agregar_registro(pendientes.pop(self._siguiente_orden))
+                self._siguiente_orden += 1
+    
+    def _worker_fichas(self, fecha_inicio: datetime, fecha_fin: datetime, cola: deque, reintentadas: set,
+                       pendientes: dict):
+        """Visita fichas de la cola compartida [(orden, (pagina, ficha_id, datos_basicos))] con su propio navegador"""
+        driver = None
+        if self.pool is not None:
+            # Esperar un navegador solo mientras quede trabajo: si otro worker vacía la cola, no hace falta
+            while cola and not self.cancelado():
                 try:
-                    fila_presentacion = self.driver.find_element(
-                        By.XPATH,
-                        '//td[contains(text(), "Presentación de propuestas")]/parent::tr'
-                    )
-                    
-                    celdas_presentacion = fila_presentacion.find_elements(By.TAG_NAME, "td")
-                    
-                    if len(celdas_presentacion) >= 3:
-                        datos['Fecha de Inicio'] = celdas_presentacion[1].text.strip()
-                        datos['Fecha de Fin'] = celdas_presentacion[2].text.strip()
-                        logger.info(f"            ✓ Presentación propuestas: {datos['Fecha de Inicio']} - {datos['Fecha de Fin']}")
-                        
-                except (NoSuchElementException, TimeoutException):
-                    # Si no hay "Presentación de propuestas", intentar "Presentación de ofertas"
-                    logger.info("            ℹ️  Sin 'Presentación de propuestas', buscando 'Presentación de ofertas'...")
-                    try:
-                        fila_ofertas = self.driver.find_element(
-                            By.XPATH,
-                            '//td[contains(text(), "Presentación de ofertas")]/parent::tr'
-                        )
-                        
-                        celdas_ofertas = fila_ofertas.find_elements(By.TAG_NAME, "td")
-                        
-                        if len(celdas_ofertas) >= 3:
-                            datos['Fecha de Inicio'] = celdas_ofertas[1].text.strip()
-                            datos['Fecha de Fin'] = celdas_ofertas[2].text.strip()
-                            logger.info(f"            ✓ Presentación ofertas: {datos['Fecha de Inicio']} - {datos['Fecha de Fin']}")
-                            
-                    except (NoSuchElementException, TimeoutException):
-                        logger.warning("            ⚠️  Sin fechas de cronograma")
-            
-            # 2. Extraer Región de la Dirección Legal
-            logger.info("         🗺️  Extrayendo región...")
+                    driver = self.pool.obtener(timeout=10)
+                    break
+                except TimeoutError:
+                    continue
+            if driver is None:
+                return
+        
+        worker = None
+        error_worker = False
+        try:
+            # Sin pool el worker inicia (y cierra) su propio navegador
+            worker = SeaceScraperCompleto(headless=self.headless, url_buscador=self.url_buscador, driver=driver,
+                                          pool=self.pool, cache_fichas=self.cache_fichas,
+                                          modo_fichas=self.modo_fichas)
+            worker.iniciar()
+            worker.bloqueo = self.bloqueo
+            self.bloqueo.descartar(worker.driver)
+            self._consumir_cola(worker, fecha_inicio, fecha_fin, cola, reintentadas, pendientes)
+        
+        except Exception as e:
+            error_worker = True
+            ERRORES.labels('navegador', 'worker').inc()
+            logger.warning(f"   ⚠️  Worker de fichas falló: {e}")
+        
+        finally:
+            if worker is not None and worker.driver is not None:
+                self.bloqueo.recolectar(worker.driver)
+                if self.pool is not None:
+                    self.pool.devolver(worker.driver, descartar=error_worker)
+                else:
+                    worker.cerrar()
+            elif driver is not None:
+                self.pool.devolver(driver, descartar=True)
+    
+    def _consumir_cola(self, worker, fecha_inicio: datetime, fecha_fin: datetime, cola: deque, reintentadas: set,
+                       pendientes: dict):
+        """Saca filas de la cola hasta vaciarla, visitando sus fichas con el navegador de `worker`.
+        
+        Si el navegador falla, la fila en curso vuelve a la cola (una vez) para otro worker.
+        """
+        if not cola:
+            return
+        if not worker.cargar_busqueda(fecha_inicio, fecha_fin):
+            raise RuntimeError("la búsqueda no devolvió datos")
+        
+        pagina_actual = 1
+        while not self.cancelado():
             try:
-                direccion_cell = self.driver.find_element(
-                    By.XPATH,
-                    '//span[contains(text(), "Direccion Legal:")]/parent::td/following-sibling::td'
-                )
-                
-                direccion_text = direccion_cell.text.strip()
-                match = re.search(r'\(([^-]+)-', direccion_text)
-                if match:
-                    datos['Region'] = match.group(1).strip().upper()
-                    logger.info(f"            ✓ {datos['Region']}")
-                    
-            except NoSuchElementException:
-                logger.warning("            ⚠️  Sin dirección")
+                item = cola.popleft()
+            except IndexError:
+                return
+            orden, (pagina, ficha_id, datos_basicos) = item
             
-            # 3. Hacer clic en "Ver listado de ítem" para extraer CUBSO
-            logger.info("         📦 Extrayendo CUBSO...")
             try:
-                legend_items = self.driver.find_element(
-                    By.XPATH,
-                    '//legend[contains(text(), "Ver listado de ítem")]'
-                )
-                
-                self.driver.execute_script("arguments[0].scrollIntoView(true);", legend_items)
-                sleep(0.2)  # Reducido de 0.5
-                self.driver.execute_script("arguments[0].click();", legend_items)
-                sleep(1)  # Reducido de 2 a 1
-                
-                # Extraer Código CUBSO
-                try:
-                    cubso_cell = self.driver.find_element(
-                        By.XPATH,
-                        '//span[contains(text(), "Codigo CUBSO:")]/parent::td/following-sibling::td'
-                    )
-                    datos['CUBSO'] = cubso_cell.text.strip()
-                    logger.info(f"            ✓ {datos['CUBSO']}")
-                    
-                except NoSuchElementException:
-                    logger.warning("            ⚠️  Sin CUBSO")
+                if pagina != pagina_actual:
+                    if not worker.ir_a_pagina(pagina_actual, pagina):
+                        raise RuntimeError(f"no se pudo llegar a la página {pagina}")
+                    pagina_actual = pagina
                 
-            except NoSuchElementException:
-                logger.warning("            ⚠️  Sin listado de ítem")
+                logger.info(f"      → [worker] Página {pagina}: {datos_basicos['Nomenclatura']}")
+                registro = worker.procesar_ficha(ficha_id, datos_basicos)
+            except Exception:
+                if orden in reintentadas:
+                    FALLBACKS.labels('navegador').inc()
+                    self.registro_listo(pendientes, orden, registro_sin_ficha(datos_basicos))
+                else:
+                    reintentadas.add(orden)
+                    cola.appendleft(item)
+                raise
+            self.registro_listo(pendientes, orden, registro)
             
+            motivo = worker.vigilante.revisar(worker.driver)
+            if motivo:
+                worker.reciclar_navegador(motivo, pagina)
+    
+    def extraer_datos_ficha(self) -> dict:
+        """Extrae los datos adicionales de la ficha de selección en una sola llamada al navegador"""
+        try:
+            ficha = self.driver.execute_script(JS_EXTRAER_FICHA) or {}
         except Exception as e:
             logger.warning(f"         ⚠️  Error: {e}")
+            ficha = {}
         
+        datos = datos_desde_ficha(ficha)
+        if datos['Fecha de Inicio']:
+            logger.info(f"            ✓ Fechas: {datos['Fecha de Inicio']} - {datos['Fecha de Fin']}")
+        else:
+            logger.warning(f"            ⚠️  Sin fechas de cronograma ({len(datos['Cronograma'])} etapas)")
+        if datos['Region']:
+            logger.info(f"            ✓ {datos['Region']}")
+        if datos['CUBSO']:
+            logger.info(f"            ✓ {datos['CUBSO']}")
+        else:
+            logger.warning("            ⚠️  Sin CUBSO")
         return datos
     
     def volver_a_lista(self):
@@ -479,6 +960,16 @@ class SeaceScraperCompleto:
     
     def ir_siguiente_pagina(self, pagina_actual: int) -> bool:
         """Intenta ir a la siguiente página"""
+        with medir('paginacion'):
+            avanzo = self._ir_siguiente_pagina(pagina_actual)
+        # Sin avanzar antes de la última página conocida: el resto del listado se perdió
+        if not avanzo and self._total_paginas and pagina_actual < self._total_paginas:
+            self._listado_incompleto = True
+        # Una lectura del log de red por página (no por fila)
+        self.bloqueo.recolectar(self.driver)
+        return avanzo
+    
+    def _ir_siguiente_pagina(self, pagina_actual: int) -> bool:
         try:
             total_paginas = self.obtener_total_paginas()
             if total_paginas and pagina_actual >= total_paginas:
@@ -492,10 +983,8 @@ class SeaceScraperCompleto:
                 boton_siguiente = self.driver.find_element(By.XPATH, xpath_siguiente)
                 if boton_siguiente.is_displayed():
                     logger.info(f"   → Yendo a página {siguiente_pagina}...")
-                    self.driver.execute_script("arguments[0].scrollIntoView(true);", boton_siguiente)
-                    sleep(0.3)  # Reducido de 0.5
-                    self.driver.execute_script("arguments[0].click();", boton_siguiente)
-                    return True
+                    self.driver.execute_script("arguments[0].scrollIntoView(true); arguments[0].click();", boton_siguiente)
+                    return self._esperar_pagina(siguiente_pagina)
             except NoSuchElementException:
                 try:
                     xpath_siguiente_link = '//a[contains(@class, "ui-paginator-next")]'  # Corregido typo "xpathh"
@@ -508,42 +997,84 @@ class SeaceScraperCompleto:
                     
                     logger.info(f"   → Usando botón 'Siguiente'...")
                     self.driver.execute_script("arguments[0].click();", boton_siguiente_link)
-                    return True
+                    return self._esperar_pagina(siguiente_pagina)
                 except NoSuchElementException:
                     logger.info(f"   ℹ️  No hay botón siguiente")
                     return False
                 
         except Exception as e:
+            ERRORES.labels('navegador', 'paginacion').inc()
             logger.warning(f"   ⚠️  No se pudo avanzar: {e}")
+            self._listado_incompleto = True
             return False
     
-    def obtener_total_paginas(self) -> int:
-        """Obtiene el número total de páginas"""
+    def _esperar_pagina(self, pagina: int) -> bool:
+        """Espera la tabla tras un clic del paginador; si vence, el listado queda incompleto (no se lee una tabla a medias)"""
+        if self.esperas.esperar('paginacion', '//*[@id="tbBuscador:idFormBuscarProceso:dtProcesos_data"]'):
+            return True
+        logger.warning(f"   ⚠️  La página {pagina} no terminó de cargar")
+        self._listado_incompleto = True
+        return False
+    
+    def ir_a_pagina(self, pagina_actual: int, pagina_destino: int) -> bool:
+        """Salta directo a pagina_destino con el widget del paginador; si no se puede, avanza página por página"""
+        if pagina_destino == pagina_actual:
+            return True
+        
         try:
-            botones_pagina = self.driver.find_elements(
-                By.XPATH,
-                '//span[@class="ui-paginator-page ui-state-default ui-corner-all"]'
-            )
-            
-            if not botones_pagina:
-                return 0
-            
-            numeros = []
-            for boton in botones_pagina:
-                try:
-                    num = int(boton.text.strip())
-                    numeros.append(num)
-                except (ValueError, AttributeError):
-                    continue
-            
-            if numeros:
-                total = max(numeros)
-                logger.info(f"   📊 Total de páginas: {total}")
-                return total
-            
-            return 0
-        except:
-            return 0
+            with medir('paginacion'):
+                if self.driver.execute_script(JS_PAGINADOR, 'ir', pagina_destino):
+                    logger.info(f"   ⏩ Saltando a página {pagina_destino}...")
+                    listo = self.esperas.esperar('paginacion', '//*[@id="tbBuscador:idFormBuscarProceso:dtProcesos_data"]')
+                    estado = self.estado_paginador()
+                    if listo and estado.get('actual') == pagina_destino:
+                        return True
+                    logger.warning(f"   ⚠️  El salto quedó en la página {estado.get('actual')}, avanzando de a una")
+                    pagina_actual = estado.get('actual') or pagina_actual
+        except Exception as e:
+            ERRORES.labels('navegador', 'paginacion').inc()
+            logger.warning(f"   ⚠️  No se pudo saltar a la página {pagina_destino}: {e}")
+        finally:
+            self.bloqueo.recolectar(self.driver)
+        
+        while pagina_actual < pagina_destino:
+            if not self.ir_siguiente_pagina(pagina_actual):
+                return False
+            pagina_actual += 1
+        return pagina_actual == pagina_destino
+    
+    def estado_paginador(self) -> dict:
+        """Estado del paginador en una sola llamada: {widget, exacto, total, actual, filas}"""
+        try:
+            return self.driver.execute_script(JS_PAGINADOR, 'estado') or {}
+        except Exception as e:
+            logger.warning(f"   ⚠️  No se pudo leer el paginador: {e}")
+            return {}
+    
+    def maximizar_filas_por_pagina(self):
+        """Elige la mayor opción de filas por página del paginador (si la tabla ofrece el selector)"""
+        try:
+            with medir('paginacion'):
+                cambio = self.driver.execute_script(JS_PAGINADOR, 'filas') or {}
+                if cambio.get('cambio'):
+                    logger.info(f"   📏 {cambio['filas']} filas por página")
+                    self._esperar_pagina(1)
+        except Exception as e:
+            ERRORES.labels('navegador', 'paginacion').inc()
+            logger.warning(f"   ⚠️  No se pudo cambiar las filas por página: {e}")
+    
+    def obtener_total_paginas(self) -> int:
+        """Obtiene el número total de páginas (una sola lectura por búsqueda cuando el dato es exacto)"""
+        if self._total_paginas is not None:
+            return self._total_paginas
+        
+        estado = self.estado_paginador()
+        total = int(estado.get('total') or 0)
+        # Sin widget ni reporte de páginas, los botones solo muestran una ventana: no se cachea
+        if total and estado.get('exacto'):
+            self._total_paginas = total
+            logger.info(f"   📊 Total de páginas: {total}")
+        return total
     
     def guardar_excel(self, fecha_inicio: datetime, nombre_archivo: str = None):
         """Guarda los resultados en Excel"""
@@ -557,30 +1088,7 @@ class SeaceScraperCompleto:
                 fecha_formato = fecha_inicio.strftime('%y%m%d')  # AAMMDD
                 nombre_archivo = f"LICIT_PROD2_{fecha_formato}.xlsx"
             
-            df = pd.DataFrame(self.resultados)
-            
-            # Ordenar columnas
-            columnas_orden = [
-                'N°',
-                'Fecha',
-                'Entidad Solicitante',
-                'Descripción del Requerimiento',
-                'Nomenclatura',
-                'Objeto',
-                'Region',
-                'Valor Referencial',
-                'Moneda',
-                'CUBSO',
-                'Fecha de Inicio',
-                'Fecha de Fin'
-            ]
-            
-            # Reordenar si existen todas las columnas
-            columnas_existentes = [col for col in columnas_orden if col in df.columns]
-            df = df[columnas_existentes]
-            
-            df.to_excel(nombre_archivo, index=False, engine='openpyxl')
-            logger.info(f"💾 Archivo guardado: {nombre_archivo}")
+            exportar(self.resultados, nombre_archivo, 'xlsx')
             return nombre_archivo  # Retornar el nombre del archivo
         except Exception as e:
             logger.error(f"❌ Error guardando archivo: {e}")
@@ -604,6 +1112,40 @@ def pedir_fecha(texto: str) -> datetime:
             print(f"❌ Error: {e}")
 
 
+def sincronizar_cli(scraper: SeaceScraperCompleto, fecha_inicio: datetime, fecha_fin: datetime):
+    """Sync incremental del CLI: el almacén local guarda la marca de agua y el delta va a un JSON"""
+    from seace_store import AlmacenProcesos
+    from seace_sync import guardar_delta, sincronizar
+    
+    almacen = AlmacenProcesos(os.environ.get('SEACE_ALMACEN', 'seace_procesos.db'))
+    
+    def extraer(fuente_fichas):
+        scraper.cache_fichas = fuente_fichas
+        scraper.iniciar()
+        completo = scraper.buscar_y_extraer(fecha_inicio, fecha_fin)
+        return scraper.resultados, completo
+    
+    try:
+        resultado = sincronizar(almacen, fecha_inicio, fecha_fin, extraer)
+        ruta = guardar_delta(resultado, f"sync_{fecha_inicio.strftime('%Y%m%d')}_{fecha_fin.strftime('%Y%m%d')}.json")
+        print("\n" + "=" * 70)
+        print("✅ ¡SYNC COMPLETADO!")
+        print("=" * 70)
+        print(f"\n🆕 Nuevos:     {len(resultado['nuevos'])}")
+        print(f"✏️  Cambiados:  {len(resultado['cambiados'])}")
+        print(f"🗑️  Eliminados: {len(resultado['eliminados'])}")
+        if not resultado['completo']:
+            print("⚠️  Listado incompleto: no se borró nada ni se avanzó la marca de agua")
+        print(f"💾 Delta: {ruta}\n")
+    except Exception as e:
+        print(f"\n❌ ERROR: {e}\n")
+        import traceback
+        traceback.print_exc()
+    finally:
+        scraper.cerrar()
+        almacen.cerrar()
+
+
 def main():
     print("\n" + "=" * 70)
     print("🚀 SEACE SCRAPER COMPLETO - MODO INVISIBLE")
@@ -620,8 +1162,39 @@ def main():
         sys.argv.remove('--visible')
         print("\n⚠️  Modo VISIBLE activado (verás el navegador)")
     
+    # Workers para visitar fichas en paralelo: --workers=N
+    workers_fichas = 1
+    for arg in list(sys.argv):
+        if arg.startswith('--workers='):
+            workers_fichas = int(arg.split('=', 1)[1])
+            sys.argv.remove(arg)
+            print(f"\n🧵 Fichas en paralelo con {workers_fichas} navegadores")
+    
+    # Sub-rangos de N días en procesos separados: --shards=N
+    dias_por_shard = None
+    for arg in list(sys.argv):
+        if arg.startswith('--shards='):
+            dias_por_shard = int(arg.split('=', 1)[1])
+            sys.argv.remove(arg)
+            print(f"\n🧩 Rango dividido en sub-rangos de {dias_por_shard} día(s)")
+    
+    # Sync incremental contra el almacén local: --sync [--dias=N] (sin fechas, los últimos N días hasta hoy)
+    modo_sync = '--sync' in sys.argv
+    dias_sync = int(os.environ.get('SEACE_SYNC_DIAS', 3))
+    if modo_sync:
+        sys.argv.remove('--sync')
+        for arg in list(sys.argv):
+            if arg.startswith('--dias='):
+                dias_sync = max(1, int(arg.split('=', 1)[1]))
+                sys.argv.remove(arg)
+        print("\n🔁 Modo sync: solo se entra a las fichas de procesos nuevos")
+    
     # Verificar si hay argumentos de línea de comandos
-    if len(sys.argv) >= 3:
+    if modo_sync and len(sys.argv) < 3:
+        fecha_fin = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        fecha_inicio = fecha_fin - timedelta(days=dias_sync - 1)
+        print(f"\n📅 Últimos {dias_sync} día(s):")
+    elif len(sys.argv) >= 3:
         try:
             fecha_inicio = datetime.strptime(sys.argv[1], '%Y-%m-%d')
             fecha_fin = datetime.strptime(sys.argv[2], '%Y-%m-%d')
@@ -648,7 +1221,7 @@ def main():
     nombre_archivo = f"licitaciones_completo_{fecha_inicio.strftime('%Y%m%d')}_{fecha_fin.strftime('%Y%m%d')}.xlsx"
     print(f"📄 Archivo: {nombre_archivo}")
     
-    if len(sys.argv) < 3:
+    if len(sys.argv) < 3 and not modo_sync:
         conf = input("\n¿Continuar? (s/n): ").strip().lower()
         if conf not in ['s', 'si', 'sí', 'yes', 'y']:
             print("\n❌ Cancelado")
@@ -658,21 +1231,29 @@ def main():
     print("🚀 INICIANDO EXTRACCIÓN COMPLETA...")
     print("=" * 70 + "\n")
     
-    scraper = SeaceScraperCompleto(headless=modo_headless)
+    scraper = SeaceScraperCompleto(headless=modo_headless, workers_fichas=workers_fichas,
+                                   directorio_checkpoints='checkpoints')
+    
+    if modo_sync:
+        sincronizar_cli(scraper, fecha_inicio, fecha_fin)
+        return
     
     try:
-        scraper.iniciar()
-        exito = scraper.buscar_y_extraer(fecha_inicio, fecha_fin)
+        if dias_por_shard:
+            from seace_shards import buscar_por_shards
+            scraper.resultados, completo = buscar_por_shards(fecha_inicio, fecha_fin, dias_por_shard,
+                                                             headless=modo_headless)
+        else:
+            scraper.iniciar()
+            completo = scraper.buscar_y_extraer(fecha_inicio, fecha_fin)
+        exito = bool(scraper.resultados)
         
         if exito:
             scraper.guardar_excel(fecha_inicio)
         
-        logger.info("⏳ Esperando antes de cerrar...")
-        sleep(5)
-        
         print("\n" + "=" * 70)
-        if exito and scraper.resultados:
-            print("✅ ¡EXTRACCIÓN COMPLETADA!")
+        if exito:
+            print("✅ ¡EXTRACCIÓN COMPLETADA!" if completo else "⚠️  EXTRACCIÓN INCOMPLETA (faltan páginas o filas)")
             print("=" * 70)
             print(f"\n📊 Total de registros: {len(scraper.resultados)}")
             print(f"💾 Archivo: {nombre_archivo}")
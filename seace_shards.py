@@ -0,0 +1,147 @@
+
+import os
+import logging
+import multiprocessing
+from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from seace_cache import CacheFichas
+
+logger = logging.getLogger(__name__)
+
+# Búsquedas por año de convocatoria que corren a la vez cuando el rango cruza años
+MAX_ANIOS_PARALELO = int(os.environ.get('SEACE_MAX_ANIOS_PARALELO', 3))
+
+
+def dividir_rango(fecha_inicio: datetime, fecha_fin: datetime, dias_por_shard: int = 1) -> list:
+    """Divide el rango en sub-rangos consecutivos de N días: [(inicio, fin), ...].
+
+    Ningún sub-rango cruza de año: el buscador filtra por un solo año de convocatoria.
+    """
+    dias_por_shard = max(1, dias_por_shard)
+    shards = []
+    inicio = fecha_inicio
+    while inicio <= fecha_fin:
+        fin = min(inicio + timedelta(days=dias_por_shard - 1), fecha_fin, fin_de_anio(inicio))
+        shards.append((inicio, fin))
+        inicio = fin + timedelta(days=1)
+    return shards
+
+
+def fin_de_anio(fecha: datetime) -> datetime:
+    return datetime(fecha.year, 12, 31)
+
+
+def dividir_por_anio(fecha_inicio: datetime, fecha_fin: datetime) -> list:
+    """Parte el rango en un tramo por año de convocatoria: [(inicio, fin), ...]"""
+    tramos = []
+    inicio = fecha_inicio
+    while inicio <= fecha_fin:
+        fin = min(fecha_fin, fin_de_anio(inicio))
+        tramos.append((inicio, fin))
+        inicio = datetime(inicio.year + 1, 1, 1)
+    return tramos
+
+
+def extraer_por_anios(principal, tramos: list, buscar_aparte, max_paralelo: int = MAX_ANIOS_PARALELO) -> bool:
+    """Una búsqueda por año: el primero lo hace `principal` (entrega en vivo) y el resto en paralelo.
+
+    buscar_aparte(inicio, fin) corre en otro hilo con su propio navegador/sesión y retorna (registros, completo),
+    o None si no pudo (sin navegador libre, error): ese año lo busca después `principal`.
+    Todo se entrega por principal.entregar en orden de fecha.
+    Retorna True solo si el listado de todos los años quedó completo.
+    """
+    logger.info(f"📆 El rango cruza {len(tramos)} años de convocatoria: una búsqueda por año")
+    with ThreadPoolExecutor(max_workers=max(1, min(max_paralelo, len(tramos) - 1))) as executor:
+        futuros = [executor.submit(buscar_aparte, inicio, fin) for inicio, fin in tramos[1:]]
+        completo = principal.buscar_y_extraer(*tramos[0])
+
+        for (inicio, fin), futuro in zip(tramos[1:], futuros):
+            if principal.cancelado():
+                completo = False
+                break
+            aparte = futuro.result()
+            if aparte is None:
+                logger.info(f"🔁 Año {inicio.year} se busca con el navegador principal")
+                completo = principal.buscar_y_extraer(inicio, fin) and completo
+                continue
+            registros, completo_anio = aparte
+            completo = completo and completo_anio
+            for registro in registros:
+                principal.entregar(registro)
+
+    # Cada búsqueda numera desde 1: N° correlativo en lo acumulado (en streaming lo asigna quien consume)
+    for numero, registro in enumerate(principal.resultados, start=1):
+        registro.numero = numero
+
+    logger.info(f"✅ {principal.total_registros} registros en {len(tramos)} años")
+    return completo
+
+
+def _scrapear_shard(args) -> tuple:
+    """Ejecuta un sub-rango en su propio proceso y navegador. Retorna (registros, completo)"""
+    from seace_scraper import SeaceScraperCompleto
+
+    fecha_inicio, fecha_fin, headless, ruta_cache = args
+    # La conexión SQLite no se comparte entre procesos: cada shard abre la suya
+    cache_fichas = CacheFichas(ruta_cache) if ruta_cache else None
+    scraper = SeaceScraperCompleto(headless=headless, cache_fichas=cache_fichas)
+    try:
+        scraper.iniciar()
+        completo = scraper.buscar_y_extraer(fecha_inicio, fecha_fin)
+        return scraper.resultados, completo
+    except Exception as e:
+        logger.error(f"❌ Error en shard {fecha_inicio.strftime('%d/%m/%Y')} → {fecha_fin.strftime('%d/%m/%Y')}: {e}")
+        return scraper.resultados, False
+    finally:
+        try:
+            scraper.cerrar()
+        except Exception:
+            pass
+        if cache_fichas is not None:
+            cache_fichas.cerrar()
+
+
+def unir_resultados(listas: list) -> list:
+    """Une resultados parciales en orden, sin Nomenclaturas repetidas, y renumera N°"""
+    resultados = []
+    vistos = set()
+    for registros in listas:
+        for registro in registros:
+            clave = registro.nomenclatura
+            if clave and clave in vistos:
+                continue
+            vistos.add(clave)
+            resultados.append(registro)
+
+    for numero, registro in enumerate(resultados, start=1):
+        registro.numero = numero
+
+    return resultados
+
+
+def buscar_por_shards(fecha_inicio: datetime, fecha_fin: datetime, dias_por_shard: int = 1,
+                      procesos: int = None, headless: bool = True, ruta_cache: str = None) -> tuple:
+    """Busca el rango dividido en sub-rangos, en paralelo con un pool de procesos.
+
+    Retorna (registros, completo): completo solo si todos los sub-rangos recorrieron su listado entero.
+    """
+    shards = dividir_rango(fecha_inicio, fecha_fin, dias_por_shard)
+    procesos = max(1, min(procesos or os.cpu_count() or 1, len(shards)))
+
+    logger.info(f"🧩 {len(shards)} sub-rangos de {dias_por_shard} día(s) en {procesos} procesos")
+
+    # spawn y no fork: el proceso padre (gunicorn gthread) tiene hilos, navegadores y conexiones SQLite vivas
+    with ProcessPoolExecutor(max_workers=procesos, mp_context=multiprocessing.get_context('spawn')) as executor:
+        # map conserva el orden de los sub-rangos
+        parciales = list(executor.map(
+            _scrapear_shard,
+            [(inicio, fin, headless, ruta_cache) for inicio, fin in shards]
+        ))
+
+    resultados = unir_resultados([registros for registros, _ in parciales])
+    completo = all(completo_shard for _, completo_shard in parciales)
+    logger.info(f"✅ {len(resultados)} registros únicos de {len(shards)} sub-rangos")
+    if not completo:
+        logger.warning("⚠️  Algún sub-rango quedó incompleto")
+    return resultados, completo
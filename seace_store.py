@@ -0,0 +1,188 @@
+
+import json
+import logging
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from time import time
+
+from seace_registro import Registro
+
+logger = logging.getLogger(__name__)
+
+# Columna del registro → columna de la tabla
+COLUMNAS = Registro.COLUMNAS
+
+
+class AlmacenProcesos:
+    """Almacén local (SQLite) de procesos ya extraídos y de los días que cubren por completo"""
+
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+        self._lock = threading.Lock()
+        self._conexion = sqlite3.connect(ruta, timeout=30, check_same_thread=False)
+        self._conexion.execute("PRAGMA journal_mode=WAL")
+        self._conexion.execute(f"""
+            CREATE TABLE IF NOT EXISTS procesos (
+                nomenclatura TEXT PRIMARY KEY,
+                dia TEXT,
+                {', '.join(f'{col} TEXT' for col in COLUMNAS.values() if col != 'nomenclatura')},
+                cronograma TEXT,
+                actualizado REAL NOT NULL
+            )
+        """)
+        # Almacenes creados antes de guardar el cronograma completo
+        existentes = {fila[1] for fila in self._conexion.execute("PRAGMA table_info(procesos)")}
+        if 'cronograma' not in existentes:
+            self._conexion.execute("ALTER TABLE procesos ADD COLUMN cronograma TEXT")
+        self._conexion.execute("CREATE INDEX IF NOT EXISTS idx_procesos_dia ON procesos (dia)")
+        self._conexion.execute("CREATE INDEX IF NOT EXISTS idx_procesos_region ON procesos (region)")
+        self._conexion.execute("CREATE INDEX IF NOT EXISTS idx_procesos_cubso ON procesos (cubso)")
+        self._conexion.execute("""
+            CREATE TABLE IF NOT EXISTS dias_cubiertos (
+                dia TEXT PRIMARY KEY,
+                actualizado REAL NOT NULL
+            )
+        """)
+        # Marca de agua del sync: cuándo se sincronizó cada día y cuántos procesos tenía
+        self._conexion.execute("""
+            CREATE TABLE IF NOT EXISTS marcas_sync (
+                dia TEXT PRIMARY KEY,
+                procesos INTEGER NOT NULL,
+                sincronizado REAL NOT NULL
+            )
+        """)
+        self._conexion.commit()
+
+    def guardar(self, registros: list) -> list:
+        """Inserta o actualiza registros (por Nomenclatura). Fechas y montos se guardan en ISO/texto exacto.
+
+        Retorna los que no se pueden guardar: sin Nomenclatura (no tienen clave) o sin Fecha legible
+        (ninguna consulta por día los encontraría). Quien llama decide qué hacer con ellos.
+        """
+        filas, rechazados = [], []
+        for registro in registros:
+            if not registro.nomenclatura or not registro.fecha:
+                rechazados.append(registro)
+                continue
+            filas.append((registro.fecha.strftime('%Y-%m-%d'),
+                          *registro.a_dict().values(),
+                          json.dumps(registro.cronograma_a_json(), ensure_ascii=False),
+                          time()))
+        if not filas:
+            return rechazados
+
+        with self._lock:
+            self._conexion.executemany(
+                f"INSERT OR REPLACE INTO procesos (dia, {', '.join(COLUMNAS.values())}, cronograma, actualizado) "
+                f"VALUES ({', '.join('?' * (len(COLUMNAS) + 3))})",
+                filas
+            )
+            self._conexion.commit()
+        return rechazados
+
+    def eliminar(self, nomenclaturas: list):
+        """Borra procesos que ya no aparecen en SEACE"""
+        with self._lock:
+            self._conexion.executemany("DELETE FROM procesos WHERE nomenclatura = ?",
+                                       [(nomenclatura,) for nomenclatura in nomenclaturas])
+            self._conexion.commit()
+
+    def marcas_sync(self, fecha_inicio: datetime, fecha_fin: datetime) -> dict:
+        """Marca de agua de cada día sincronizado del rango: {dia: {'procesos', 'sincronizado'}}"""
+        with self._lock:
+            filas = self._conexion.execute(
+                "SELECT dia, procesos, sincronizado FROM marcas_sync WHERE dia BETWEEN ? AND ?",
+                (fecha_inicio.strftime('%Y-%m-%d'), fecha_fin.strftime('%Y-%m-%d'))
+            ).fetchall()
+        return {dia: {'procesos': procesos, 'sincronizado': sincronizado} for dia, procesos, sincronizado in filas}
+
+    def marcar_sync(self, fecha_inicio: datetime, fecha_fin: datetime, procesos_por_dia: dict, omitir=()):
+        """Avanza la marca de agua de los días del rango, menos los de `omitir` (los que no tienen procesos quedan en 0)"""
+        ahora = time()
+        marcas = [
+            (dia.strftime('%Y-%m-%d'), procesos_por_dia.get(dia.strftime('%Y-%m-%d'), 0), ahora)
+            for dia in self._dias(fecha_inicio, fecha_fin)
+            if dia.strftime('%Y-%m-%d') not in omitir
+        ]
+        with self._lock:
+            self._conexion.executemany("INSERT OR REPLACE INTO marcas_sync VALUES (?, ?, ?)", marcas)
+            self._conexion.commit()
+
+    def marcar_cubiertos(self, fecha_inicio: datetime, fecha_fin: datetime, omitir=()):
+        """Registra que esos días (menos los de `omitir`) ya se extrajeron completos.
+
+        El día de hoy (y posteriores) nunca se marca: aún pueden publicarse procesos.
+        """
+        hoy = datetime.now().date()
+        dias = [
+            (dia.strftime('%Y-%m-%d'), time())
+            for dia in self._dias(fecha_inicio, fecha_fin)
+            if dia.date() < hoy and dia.strftime('%Y-%m-%d') not in omitir
+        ]
+        with self._lock:
+            self._conexion.executemany("INSERT OR REPLACE INTO dias_cubiertos VALUES (?, ?)", dias)
+            self._conexion.commit()
+
+    def segmentos(self, fecha_inicio: datetime, fecha_fin: datetime) -> list:
+        """Parte el rango en tramos contiguos: [(inicio, fin, cubierto), ...] en orden de fecha"""
+        with self._lock:
+            cubiertos = {
+                fila[0] for fila in self._conexion.execute(
+                    "SELECT dia FROM dias_cubiertos WHERE dia BETWEEN ? AND ?",
+                    (fecha_inicio.strftime('%Y-%m-%d'), fecha_fin.strftime('%Y-%m-%d'))
+                )
+            }
+
+        tramos = []
+        for dia in self._dias(fecha_inicio, fecha_fin):
+            cubierto = dia.strftime('%Y-%m-%d') in cubiertos
+            if tramos and tramos[-1][2] == cubierto:
+                tramos[-1] = (tramos[-1][0], dia, cubierto)
+            else:
+                tramos.append((dia, dia, cubierto))
+        return tramos
+
+    def consultar(self, fecha_inicio: datetime, fecha_fin: datetime) -> list:
+        """Registros publicados en el rango, en orden de publicación"""
+        with self._lock:
+            filas = self._conexion.execute(
+                f"SELECT {', '.join(COLUMNAS.values())}, cronograma FROM procesos "
+                f"WHERE dia BETWEEN ? AND ? ORDER BY dia, fecha, rowid",
+                (fecha_inicio.strftime('%Y-%m-%d'), fecha_fin.strftime('%Y-%m-%d'))
+            ).fetchall()
+        return [Registro.desde_dict(dict(zip([*COLUMNAS, 'Cronograma'], fila))) for fila in filas]
+
+    def iterar(self, fecha_inicio: datetime, fecha_fin: datetime, lote: int = 1000):
+        """Igual que consultar, pero entrega los registros de a lotes sin cargarlos todos en memoria"""
+        # Conexión de lectura propia: con WAL no bloquea a quienes escriben mientras se exporta
+        conexion = sqlite3.connect(self.ruta, timeout=30)
+        try:
+            cursor = conexion.execute(
+                f"SELECT {', '.join(COLUMNAS.values())}, cronograma FROM procesos "
+                f"WHERE dia BETWEEN ? AND ? ORDER BY dia, fecha, rowid",
+                (fecha_inicio.strftime('%Y-%m-%d'), fecha_fin.strftime('%Y-%m-%d'))
+            )
+            while True:
+                filas = cursor.fetchmany(lote)
+                if not filas:
+                    break
+                for fila in filas:
+                    yield Registro.desde_dict(dict(zip([*COLUMNAS, 'Cronograma'], fila)))
+        finally:
+            conexion.close()
+
+    def estado(self) -> dict:
+        with self._lock:
+            procesos = self._conexion.execute("SELECT COUNT(*) FROM procesos").fetchone()[0]
+            dias = self._conexion.execute("SELECT COUNT(*) FROM dias_cubiertos").fetchone()[0]
+        return {"procesos": procesos, "dias_cubiertos": dias}
+
+    def cerrar(self):
+        with self._lock:
+            self._conexion.close()
+
+    @staticmethod
+    def _dias(fecha_inicio: datetime, fecha_fin: datetime) -> list:
+        inicio = datetime(fecha_inicio.year, fecha_inicio.month, fecha_inicio.day)
+        return [inicio + timedelta(days=n) for n in range((fecha_fin - inicio).days + 1)]
@@ -0,0 +1,184 @@
+
+import os
+import json
+import logging
+import threading
+from datetime import datetime
+
+from seace_cache import CAMPOS_FICHA
+from seace_registro import Registro
+
+logger = logging.getLogger(__name__)
+
+# Columnas que se comparan para decidir si un proceso conocido cambió (el N° depende de la búsqueda)
+COLUMNAS_COMPARADAS = [columna for columna in Registro.COLUMNAS if columna != 'N°']
+
+# Un día con marca de agua cuyo listado trae menos de esta fracción de los procesos de la marca se trata
+# como truncado: no se borran sus procesos ni se avanza su marca (en SEACE un proceso rara vez desaparece)
+FRACCION_MINIMA = float(os.environ.get('SEACE_SYNC_FRACCION_MINIMA', 0.5))
+
+
+class FichasConocidas:
+    """Fuente de fichas para el sync: las de procesos ya conocidos salen del almacén y el resto de la cache.
+
+    Tiene la misma interfaz que CacheFichas (obtener/guardar), así los motores no cambian:
+    solo entran a la ficha de lo que no está en ninguna de las dos.
+    """
+
+    def __init__(self, conocidos: dict, cache=None):
+        self._fichas = {}
+        for nomenclatura, registro in conocidos.items():
+            datos = registro.a_dict(con_cronograma=True)
+            # Un conocido que quedó sin ficha (fallback) se vuelve a visitar
+            if any(datos.get(campo) for campo in CAMPOS_FICHA):
+                self._fichas[nomenclatura] = {campo: datos[campo] for campo in [*CAMPOS_FICHA, 'Cronograma']}
+        self.cache = cache
+        self.reutilizadas = 0
+        self._lock = threading.Lock()
+
+    def obtener(self, nomenclatura: str):
+        datos = self._fichas.get(nomenclatura)
+        if datos is not None:
+            with self._lock:
+                self.reutilizadas += 1
+            return dict(datos)
+        return self.cache.obtener(nomenclatura) if self.cache is not None else None
+
+    def guardar(self, nomenclatura: str, datos_ficha: dict):
+        if self.cache is not None:
+            self.cache.guardar(nomenclatura, datos_ficha)
+
+
+def campos_cambiados(anterior: Registro, actual: Registro) -> list:
+    """Columnas cuyo valor cambió entre dos versiones del mismo proceso"""
+    antes, ahora = anterior.a_dict(), actual.a_dict()
+    cambios = [columna for columna in COLUMNAS_COMPARADAS if antes[columna] != ahora[columna]]
+    if anterior.cronograma_a_json() != actual.cronograma_a_json():
+        cambios.append('Cronograma')
+    return cambios
+
+
+def comparar(conocidos: dict, actuales: list) -> dict:
+    """Delta entre lo conocido ({nomenclatura: Registro}) y el listado actual.
+
+    Retorna {'nuevos': [Registro], 'cambiados': [(Registro, [columnas])], 'eliminados': [Registro]}.
+    """
+    nuevos, cambiados, vistos = [], [], set()
+    for registro in actuales:
+        if not registro.nomenclatura or registro.nomenclatura in vistos:
+            continue
+        vistos.add(registro.nomenclatura)
+        anterior = conocidos.get(registro.nomenclatura)
+        if anterior is None:
+            nuevos.append(registro)
+            continue
+        cambios = campos_cambiados(anterior, registro)
+        if cambios:
+            cambiados.append((registro, cambios))
+    eliminados = [registro for nomenclatura, registro in conocidos.items() if nomenclatura not in vistos]
+    return {'nuevos': nuevos, 'cambiados': cambiados, 'eliminados': eliminados}
+
+
+def procesos_por_dia(registros: list) -> dict:
+    """Cantidad de procesos del listado por día de publicación: {'AAAA-MM-DD': n}"""
+    conteo = {}
+    for registro in registros:
+        if registro.fecha:
+            dia = registro.fecha.strftime('%Y-%m-%d')
+            conteo[dia] = conteo.get(dia, 0) + 1
+    return conteo
+
+
+def dias_truncados(marcas: dict, conteo: dict) -> set:
+    """Días cuyo listado trae bastante menos procesos que su marca de agua (ver FRACCION_MINIMA)"""
+    return {dia for dia, marca in marcas.items()
+            if marca['procesos'] and conteo.get(dia, 0) < marca['procesos'] * FRACCION_MINIMA}
+
+
+def sincronizar(almacen, fecha_inicio: datetime, fecha_fin: datetime, extraer, cache_fichas=None) -> dict:
+    """Sync incremental del rango contra el almacén.
+
+    extraer(fuente_fichas) corre el motor con esa fuente como cache de fichas y retorna (registros, completo):
+    el listado se lee entero, pero solo se entra a las fichas de procesos nuevos.
+    Nuevos y cambiados siempre se guardan. Los eliminados solo se borran, y los días solo se dan por
+    cubiertos y avanzan su marca de agua, si el listado fue completo; aun así, los días que quedaron muy
+    por debajo de su marca anterior no se tocan.
+    """
+    marcas = almacen.marcas_sync(fecha_inicio, fecha_fin)
+    conocidos = {registro.nomenclatura: registro for registro in almacen.consultar(fecha_inicio, fecha_fin)}
+    logger.info(f"🔁 Sync: {len(conocidos)} procesos conocidos, {len(marcas)} días con marca de agua")
+
+    fuente = FichasConocidas(conocidos, cache_fichas)
+    actuales, completo = extraer(fuente)
+
+    delta = comparar(conocidos, actuales)
+    rechazados = almacen.guardar(delta['nuevos'] + [registro for registro, _ in delta['cambiados']])
+    if rechazados:
+        logger.warning(f"⚠️  {len(rechazados)} procesos sin Fecha legible no entran al almacén")
+
+    conteo = procesos_por_dia(actuales)
+    truncados = set()
+    if not completo:
+        logger.warning("⚠️  El listado quedó incompleto: no se marcan eliminados ni se avanza la marca de agua")
+        delta['eliminados'] = []
+    elif not actuales and conocidos:
+        # Un listado vacío con procesos conocidos es más probable un fallo que una baja masiva
+        logger.warning("⚠️  El listado vino vacío: no se marcan eliminados ni se avanza la marca de agua")
+        delta['eliminados'] = []
+    else:
+        truncados = dias_truncados(marcas, conteo)
+        if truncados:
+            logger.warning(f"⚠️  {len(truncados)} días con muchos menos procesos que su marca de agua "
+                           f"({', '.join(sorted(truncados))}): no se borra nada de esos días ni se avanza su marca")
+            delta['eliminados'] = [registro for registro in delta['eliminados']
+                                   if registro.fecha.strftime('%Y-%m-%d') not in truncados]
+        almacen.eliminar([registro.nomenclatura for registro in delta['eliminados']])
+        if not rechazados:
+            almacen.marcar_cubiertos(fecha_inicio, fecha_fin, omitir=truncados)
+        almacen.marcar_sync(fecha_inicio, fecha_fin, conteo, omitir=truncados)
+
+    logger.info(f"✅ Sync: {len(delta['nuevos'])} nuevos, {len(delta['cambiados'])} cambiados, "
+                f"{len(delta['eliminados'])} eliminados ({fuente.reutilizadas} fichas reutilizadas)")
+    return {
+        **delta,
+        'fecha_inicio': fecha_inicio,
+        'fecha_fin': fecha_fin,
+        'listado': len(actuales),
+        'completo': completo,
+        'dias_truncados': sorted(truncados),
+        'fichas_reutilizadas': fuente.reutilizadas,
+        'marcas_anteriores': marcas
+    }
+
+
+def delta_a_json(resultado: dict) -> dict:
+    """Resultado de sincronizar() serializable en JSON"""
+    return {
+        "fecha_inicio": resultado['fecha_inicio'].strftime('%Y-%m-%d'),
+        "fecha_fin": resultado['fecha_fin'].strftime('%Y-%m-%d'),
+        "resumen": {
+            "listado": resultado['listado'],
+            "nuevos": len(resultado['nuevos']),
+            "cambiados": len(resultado['cambiados']),
+            "eliminados": len(resultado['eliminados']),
+            "fichas_reutilizadas": resultado['fichas_reutilizadas'],
+            "completo": resultado['completo']
+        },
+        "dias_truncados": resultado['dias_truncados'],
+        "marcas_anteriores": {
+            dia: {"procesos": marca['procesos'],
+                  "sincronizado": datetime.fromtimestamp(marca['sincronizado']).isoformat(timespec='seconds')}
+            for dia, marca in resultado['marcas_anteriores'].items()
+        },
+        "nuevos": [registro.a_dict(con_cronograma=True) for registro in resultado['nuevos']],
+        "cambiados": [{**registro.a_dict(con_cronograma=True), "Cambios": cambios}
+                      for registro, cambios in resultado['cambiados']],
+        "eliminados": [registro.a_dict(con_cronograma=True) for registro in resultado['eliminados']]
+    }
+
+
+def guardar_delta(resultado: dict, ruta: str) -> str:
+    """Escribe el delta como JSON y retorna la ruta"""
+    with open(ruta, 'w', encoding='utf-8') as archivo:
+        json.dump(delta_a_json(resultado), archivo, ensure_ascii=False, indent=2)
+    return ruta